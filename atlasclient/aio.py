@@ -0,0 +1,498 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Defines the asyncio flavour of the Atlas client.
+
+AsyncAtlas exposes the same entry points as atlasclient.client.Atlas, but it
+talks to the server through aiohttp, so a single process can keep many
+requests in flight without threads.  The model classes in atlasclient.models
+are reused for parsing the responses; only the methods which hit the server
+(inflate, refresh, create, update, delete, wait) become coroutines.
+"""
+
+import asyncio
+import io
+import logging
+import tarfile
+
+from atlasclient import base, codec, exceptions, models, utils
+from atlasclient.client import ENTRY_POINTS, HTTP_METHODS, generate_auth_header
+from atlasclient.glossary import data_types as glossary_data_types
+from atlasclient.glossary import models as glossary_models
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+LOG = logging.getLogger('pyatlasclient')
+
+_ASYNC_MODEL_CLASSES = {}
+
+# the collection methods reading or writing with blocking I/O, without a coroutine version
+SYNC_ONLY_METHODS = ('stream', 'iter_entities', 'write')
+
+
+class AsyncAtlas(object):
+    """The asyncio Atlas client
+
+    This is the entry point to the Atlas API for asyncio applications. It
+    is used just like the Atlas client, except that loading data has to be
+    awaited:
+
+        async with AsyncAtlas(host, username='admin', password='admin') as atlas:
+            entity = await atlas.entity_guid(guid).inflate()
+            async for search in atlas.search_basic(typeName='hive_table'):
+                for e in search.entities:
+                    print(e.guid)
+
+    Attributes which have not been loaded yet are never fetched implicitly,
+    since that would require blocking I/O.  Await inflate() first instead.
+    """
+
+    def __init__(self, host, port=None, username=None, password=None, oidc_token=None,
+                 identifier=None, protocol=None, validate_ssl=True,
+                 timeout=10, max_connections=100, json_codec=None):
+        self.base_url = utils.generate_base_url(host, port=port, protocol=protocol)
+        if identifier is None:
+            identifier = 'python-atlasclient'
+        self.client = AsyncHttpClient(host=self.base_url, username=username,
+                                      password=password, identifier=identifier, oidc_token=oidc_token,
+                                      validate_ssl=validate_ssl, timeout=timeout,
+                                      max_connections=max_connections, json_codec=json_codec)
+        self._version = None
+
+    def __dir__(self):
+        d1 = {}
+        d1.update(self.__dict__)
+        d1.update(ENTRY_POINTS)
+        return d1.keys()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close the underlying HTTP session and its connections."""
+        await self.client.close()
+
+    def batcher(self):
+        """Inflations are awaited explicitly here, gather them instead of batching them."""
+        return None
+
+    def __getattr__(self, attr):
+        if attr in ENTRY_POINTS:
+            rel_class = async_model_class(ENTRY_POINTS[attr])
+            return rel_class.collection_class(self, rel_class)
+
+        if attr == 'request' or attr in HTTP_METHODS:
+            # forward get/post/put/head/delete to the http client
+            return getattr(self.client, attr)
+
+        raise AttributeError(attr)
+
+
+class AsyncHttpClient(object):
+    """Our asyncio HTTP based REST client.
+
+    This mirrors HttpClient: request bodies are serialized to JSON, error
+    responses are converted to the same exceptions, and instead of a response
+    object you get a dictionary.  The aiohttp session is created lazily, since
+    it has to be bound to a running event loop.
+    """
+
+    def __init__(self, host, identifier, username=None, password=None, oidc_token=None, validate_ssl=True,
+                 timeout=10, max_connections=100, json_codec=None):
+        self.host = host
+        self.json_codec = codec.get_codec(json_codec)
+        self.headers = {'X-Requested-By': identifier,
+                        'Authorization': generate_auth_header(username=username, password=password,
+                                                              oidc_token=oidc_token)}
+        self.validate_ssl = validate_ssl
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._session = None
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            if aiohttp is None:
+                raise exceptions.ClientError("The asyncio client requires aiohttp, "
+                                             "install it with 'pip install pyatlasclient[async]'")
+            connector = aiohttp.TCPConnector(limit=self.max_connections,
+                                             ssl=None if self.validate_ssl else False)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def request(self, method, url, content_type=None, **kwargs):
+        headers = dict(self.headers)
+        headers['Content-type'] = content_type or 'application/json'
+
+        if 'data' in kwargs:
+            kwargs['data'] = codec.encode_body(kwargs['data'], self.json_codec)
+        if kwargs.get('params'):
+            kwargs['params'] = flatten_params(kwargs['params'])
+
+        LOG.debug("Requesting Atlas with the '%s' method.", method)
+        async with self.session.request(method.upper(), url, headers=headers, **kwargs) as response:
+            body = await response.read()
+            # any error responses will generate exceptions here
+            exceptions.raise_for_status(response.status, method=method.upper(), url=str(response.url),
+                                        details=body.decode('utf-8', 'replace'),
+                                        headers=response.headers)
+            response_type = response.headers.get('content-type') or ''
+
+        if not body:
+            return {}
+
+        if response_type == 'application/x-ustar':
+            return tarfile.open(fileobj=io.BytesIO(body))
+        elif 'application/json' not in response_type:
+            # Log bad methods so we can report them
+            LOG.debug("Wrong response content-type for %s %s: %s", method, url, response_type)
+        return self.json_codec.loads(body)
+
+    def __getattr__(self, attr):
+        if attr in HTTP_METHODS:
+            async def method(url, **kwargs):
+                return await self.request(attr, url, **kwargs)
+            return method
+        raise AttributeError(attr)
+
+
+def flatten_params(params):
+    """Expand list values into repeated query parameters, the way requests does.
+
+    aiohttp only accepts scalar query values, so {'guid': ['a', 'b']} becomes
+    [('guid', 'a'), ('guid', 'b')].  None values are dropped.
+    """
+    flat = []
+    for key, value in params.items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        for item in values:
+            if item is not None:
+                flat.append((key, str(item)))
+    return flat
+
+
+def async_model_class(model_class):
+    """Return the asyncio variant of a QueryableModel class.
+
+    The variant is a subclass of the original model (and its collection), so
+    fields, relationships and the load() parsing logic are all shared; only
+    the I/O methods are replaced by coroutines, including those of the models
+    with their own, like Glossary.detailed().
+    """
+    if model_class not in _ASYNC_MODEL_CLASSES:
+        sync_collection_class = model_class.collection_class
+        namespace = {'_sync_class': sync_collection_class}
+        for name in SYNC_ONLY_METHODS:
+            if hasattr(sync_collection_class, name):
+                namespace[name] = _sync_only(name)
+        mixins = tuple(mixin for collection_base, mixin in _ASYNC_COLLECTION_MIXINS
+                       if issubclass(sync_collection_class, collection_base))
+        collection_class = type('Async' + sync_collection_class.__name__,
+                                mixins + (AsyncQueryableModelCollectionMixin, sync_collection_class),
+                                namespace)
+        model_mixins = tuple(mixin for model_base, mixin in _ASYNC_MODEL_MIXINS
+                             if issubclass(model_class, model_base))
+        _ASYNC_MODEL_CLASSES[model_class] = type('Async' + model_class.__name__,
+                                                 model_mixins + (AsyncQueryableModelMixin, model_class),
+                                                 {'collection_class': collection_class})
+    return _ASYNC_MODEL_CLASSES[model_class]
+
+
+def _sync_only(name):
+    """Return a method replacing a synchronous one, which would block the event loop."""
+    def method(self, *args, **kwargs):
+        raise exceptions.ClientError(f"{name}() does blocking I/O and is not available with AsyncAtlas, "
+                                     "use the Atlas client")
+    method.__name__ = name
+    return method
+
+
+class AsyncQueryableModelCollectionMixin(object):
+    """Coroutine versions of the QueryableModelCollection I/O methods.
+
+    Collections which post a ready-made body in the synchronous client, like
+    entity_post.create(data=...) or the bulk collections, keep that behaviour.
+    """
+    _sync_class = base.QueryableModelCollection
+
+    def __iter__(self):
+        if not self._is_inflated:
+            raise exceptions.ClientError("This collection is not loaded yet, "
+                                         "use 'async for' or await inflate() first")
+        return iter(list(self._models))
+
+    async def __aiter__(self):
+        await self.inflate()
+        for model in list(self._models):
+            yield model
+
+    async def inflate(self):
+        """Load the collection from the server, if necessary."""
+        if not self._is_inflated:
+            self.check_version()
+            self._prepare_filter()
+            self.load(await self.client.get(self.url, params=self._filter))
+
+        self._is_inflated = True
+        return self
+
+    async def refresh(self):
+        self._is_inflated = False
+        return await self.inflate()
+
+    async def wait(self, **kwargs):  # pylint: disable=unused-argument
+        return await self.inflate()
+
+    def _overrides(self, method):
+        return getattr(self._sync_class, method) is not getattr(base.QueryableModelCollection, method)
+
+    async def _send(self, method, data):
+        if isinstance(self, base.QueryableModelCollectionBulk):
+            self.load(await self.client.request(method, self.url,
+                                                data=self._bulk_payload(data, method=method.upper())))
+            return self._models
+        return await self.client.request(method, self.url, data=data)
+
+    async def create(self, *args, **kwargs):
+        """Add a resource to this collection."""
+        if self._overrides('create'):
+            return await self._send('post', args[0] if args else kwargs['data'])
+
+        href = self.url
+        if args and isinstance(args[0], dict):
+            # the body of the models created with create(data), i.e. search_basic.create({...})
+            kwargs['data'] = args[0]
+        elif len(args) == 1:
+            kwargs[self.model_class.primary_key] = args[0]
+            href = '/'.join([href, args[0]])
+        model = self.model_class(self,
+                                 href=href.replace('classifications/', 'classification/'),
+                                 data=kwargs)
+        await model.create(**kwargs)
+        self._models.append(model)
+        return model
+
+    async def update(self, *args, **kwargs):
+        """Update all resources in this collection."""
+        if self._overrides('update') and (args or 'data' in kwargs):
+            return await self._send('put', args[0] if args else kwargs['data'])
+
+        await self.inflate()
+        for model in self._models:
+            await model.update(**kwargs)
+        return self
+
+    async def delete(self, *args, **kwargs):
+        """Delete all resources in this collection."""
+        if self._overrides('delete'):
+            if args or 'data' in kwargs:
+                return await self._send('delete', args[0] if args else kwargs['data'])
+            return await self.client.delete(self.url, params=kwargs)
+
+        await self.inflate()
+        for model in list(self._models):
+            await model.delete(**kwargs)
+
+
+class AsyncEntityGuidCollectionMixin(object):
+    """The coroutine version of EntityGuidCollection.fetch_many()."""
+
+    async def fetch_many(self, guids, max_workers=4, chunk_size=100, max_url_length=4096, **params):
+        """Fetch many entities by GUID, with up to max_workers requests in flight.
+
+            entities, not_found = await atlas.entity_guid.fetch_many(guids, max_workers=8)
+
+        See EntityGuidCollection.fetch_many().
+        """
+        unique = list(dict.fromkeys(guids))
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def get(url, query):
+            async with semaphore:
+                try:
+                    return await self.client.get(url, params=query)
+                except exceptions.NotFound:
+                    return None
+
+        responses = {}
+        if len(unique) == 1:
+            remaining = unique
+        else:
+            bulk_url, chunks = self._bulk_chunks(unique, chunk_size, max_url_length)
+            remaining = []
+            fetched = await asyncio.gather(*[get(bulk_url, dict(params, guid=chunk)) for chunk in chunks])
+            for chunk, response in zip(chunks, fetched):
+                remaining.extend(self._add_bulk_response(responses, chunk, response))
+        fetched = await asyncio.gather(*[get('/'.join([self.url, guid]), params) for guid in remaining])
+        responses.update((guid, response) for guid, response in zip(remaining, fetched) if response is not None)
+        return self._fetched(guids, responses)
+
+
+# the coroutine versions of the methods of some collection classes, and their subclasses
+_ASYNC_COLLECTION_MIXINS = ((models.EntityGuidCollection, AsyncEntityGuidCollectionMixin),)
+
+
+class AsyncQueryableModelMixin(object):
+    """Coroutine versions of the QueryableModel I/O methods.
+
+    Passing data=... (or the body as the only argument) to create() or
+    update() sends that body as-is, which is what the models overriding those
+    methods in the synchronous client do.
+    """
+
+    def __getattr__(self, attr):
+        """Return related objects or object data without doing any I/O."""
+        if attr in self.relationships:
+            rel_class = self.relationships[attr]
+            if issubclass(rel_class, base.QueryableModel):
+                rel_class = async_model_class(rel_class)
+            if attr not in self._relationship_cache:
+                self._relationship_cache[attr] = rel_class.collection_class(
+                    self.client, rel_class,
+                    parent=self,
+                )
+            return self._relationship_cache[attr]
+
+        if attr in self.fields:
+            if attr not in self._data and not self._is_inflated:
+                raise exceptions.ClientError(f"'{attr}' is not loaded yet, await inflate() first")
+            return self._data.get(attr)
+
+        if isinstance(self, base.QueryableModelV2) and hasattr(self.data_class, attr):
+            if self.data_class_data is None:
+                raise exceptions.ClientError(f"'{attr}' is not loaded yet, await inflate() first")
+            return getattr(self.data_class_data, attr)
+
+        raise AttributeError(attr)
+
+    @property
+    def identifier(self):
+        if self.primary_key is None or self.primary_key not in self._data:
+            return None
+        return str(self._data[self.primary_key])
+
+    def to_dict(self):
+        if isinstance(self, base.QueryableModelV2):
+            return self.data_class_data.to_dict() if self.data_class_data else {}
+        return self._data
+
+    def _load(self, response):
+        if isinstance(response, dict):
+            self.load(response)
+
+    async def inflate(self, url=None):
+        """Load the resource from the server, if not already loaded."""
+        if not self._is_inflated:
+            self._load(await self.client.request(self.method, url or self.url))
+            self._is_inflated = True
+        return self
+
+    async def refresh(self):
+        self._is_inflated = False
+        return await self.inflate()
+
+    async def wait(self, **kwargs):  # pylint: disable=unused-argument
+        return await self.inflate()
+
+    async def create(self, *args, **kwargs):
+        """Create a new instance of this resource type."""
+        if args or 'data' in kwargs:
+            data = args[0] if args else kwargs['data']
+        else:
+            kwargs.pop(self.primary_key, None)
+            data = self._generate_input_dict(**kwargs)
+        self._load(await self.client.post(self.url, data=data))
+        return self
+
+    async def update(self, *args, **kwargs):
+        """Update a resource by passing in modifications via keyword arguments."""
+        if args or 'data' in kwargs:
+            data = args[0] if args else kwargs['data']
+        elif isinstance(self, base.QueryableModelV2):
+            data = self.to_dict()
+            data.update(kwargs)
+        else:
+            data = self._generate_input_dict(**kwargs)
+        self._load(await self.client.put(self.url, data=data))
+        return self
+
+    async def delete(self, **kwargs):
+        """Delete a resource by issuing a DELETE http request against it."""
+        if len(kwargs) > 0:
+            self._load(await self.client.delete(self.url, params=kwargs))
+        else:
+            self._load(await self.client.delete(self.url))
+        self.parent.remove(self)
+
+
+class AsyncQueryableModelV2Mixin(object):
+    """The coroutine version of QueryableModelV2.partial_update()."""
+
+    async def partial_update(self, **kwargs):
+        """Partially update a resource by passing in modifications via keyword arguments."""
+        self._load(await self.client.put(self._partial_url(), data=kwargs))
+        return self
+
+
+class AsyncEntityGuidMixin(object):
+    """The coroutine version of EntityGuid.update()."""
+
+    async def update(self, attribute):
+        """Write the current value of an attribute of the entity, which has to be loaded."""
+        entity = self.entity
+        if attribute not in entity['attributes']:
+            raise exceptions.BadRequest(method=self.update,
+                                        details='The attribute {} does not exist for {}'.format(attribute,
+                                                                                                entity['typeName']))
+        self._load(await self.client.put(self.url + '?name={}'.format(attribute),
+                                         data=entity['attributes'][attribute]))
+        return self._data
+
+
+class AsyncSearchSavedMixin(object):
+    """The coroutine version of SearchSaved.update(), which puts to the collection URL."""
+
+    async def update(self, *args, **kwargs):
+        self._load(await self.client.put(self.parent.url, data=args[0] if args else kwargs['data']))
+        return self
+
+
+class AsyncGlossaryMixin(object):
+    """The coroutine version of Glossary.detailed()."""
+
+    async def detailed(self):
+        """Load the glossary with the headers of its terms and categories."""
+        response = await self.client.get(f'{self.parent.url}/{self.primary_key_value}/detailed')
+        self.data_class = glossary_data_types.AtlasGlossaryExtInfo
+        self.load(response)
+        self._is_inflated = True
+        return self
+
+
+# the coroutine versions of the methods of some model classes, and their subclasses
+_ASYNC_MODEL_MIXINS = ((base.QueryableModelV2, AsyncQueryableModelV2Mixin),
+                       (models.EntityGuid, AsyncEntityGuidMixin),
+                       (models.SearchSaved, AsyncSearchSavedMixin),
+                       (glossary_models.Glossary, AsyncGlossaryMixin))
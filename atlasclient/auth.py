@@ -0,0 +1,119 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Keeps an OIDC bearer token fresh for long-running clients.
+
+A token provider is any callable returning a new token, either as a string
+or as a (token, expires_at) tuple where expires_at is a UNIX timestamp.
+When the expiry is not given it is read from the 'exp' claim of the token,
+if the token is a JWT.
+
+A single background thread fetches the next token some time before the
+current one expires, so requests never wait for a refresh, and at most one
+refresh runs at a time, however many threads share the client.
+"""
+
+import base64
+import json
+import logging
+import threading
+import time
+
+LOG = logging.getLogger('pyatlasclient')
+
+
+def token_expiry(token):
+    """Return the 'exp' claim of a JWT, or None if the token is not a JWT."""
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return float(claims['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenRefresher(object):
+    """Fetch tokens from a provider and refresh them ahead of their expiry.
+
+    on_refresh is called with every new token.  The token is refreshed
+    refresh_margin seconds before it expires, but never more often than every
+    retry_interval seconds, which is also the delay between failed attempts.
+    """
+
+    def __init__(self, token_provider, on_refresh, refresh_margin=60, retry_interval=5):
+        self.token_provider = token_provider
+        self.on_refresh = on_refresh
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.token = None
+        self.expires_at = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        # the first token is needed right away, fetch it synchronously
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, name='pyatlasclient-token-refresh')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _fetch(self):
+        result = self.token_provider()
+        if isinstance(result, tuple):
+            token, expires_at = result
+        else:
+            token, expires_at = result, None
+        if expires_at is None:
+            expires_at = token_expiry(token)
+        return token, expires_at
+
+    def refresh(self, stale_token=None):
+        """Fetch a new token and return it.
+
+        When stale_token is given and the current token is already a
+        different one, another thread did the refresh in the meantime and
+        the current token is returned as is.
+        """
+        with self._lock:
+            if stale_token is not None and stale_token != self.token:
+                return self.token
+            token, expires_at = self._fetch()
+            self.token, self.expires_at = token, expires_at
+            self.on_refresh(token)
+            LOG.debug("Refreshed the OIDC token, expires at %s", expires_at)
+        # reschedule the background refresh for the new expiry
+        self._wakeup.set()
+        return token
+
+    def _delay(self):
+        if self.expires_at is None:
+            # no known expiry, only refreshed on demand
+            return None
+        return max(self.expires_at - self.refresh_margin - time.time(), self.retry_interval)
+
+    def _run(self):
+        while not self._closed:
+            if self._wakeup.wait(self._delay()):
+                self._wakeup.clear()
+                continue
+            if self._closed:
+                break
+            try:
+                self.refresh(stale_token=self.token)
+            except Exception:  # pylint: disable=broad-except
+                LOG.warning("Failed to refresh the OIDC token, retrying in %s seconds",
+                            self.retry_interval, exc_info=True)
+
+    def close(self):
+        """Stop the background refresh."""
+        self._closed = True
+        self._wakeup.set()
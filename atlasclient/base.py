@@ -19,17 +19,42 @@ import json
 import logging
 
 import six
+import threading
 import time
+import weakref
 from datetime import datetime, timedelta
 
 from atlasclient import events, exceptions, utils
+from atlasclient.data_types import construct
 from atlasclient.exceptions import BadRequest
+from atlasclient.relationships import RelationshipResolver
 
 LOG = logging.getLogger('pyatlasclient')
 
 OLDEST_SUPPORTED_VERSION = (1, 7, 0)
 
 
+class LoadLock(object):
+    """The reentrant lock held while loading a model or a collection.
+
+    It pickles, and so deep-copies, as a new lock: a copy of a model gets its
+    data, never the loading state of the original.
+    """
+    __slots__ = ('_lock',)
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+    def __enter__(self):
+        return self._lock.acquire()
+
+    def __exit__(self, *exc_info):
+        self._lock.release()
+
+    def __reduce__(self):
+        return self.__class__, ()
+
+
 class PollableMixin(object):
     """A mixin class that allows for polling for status updates automatically.
 
@@ -132,10 +157,11 @@ class ModelCollection(object):
 
     def __iter__(self):
         self.inflate()
-        self._iter_marker = 0
-        return self
+        # a new iterator for each loop, threads iterating the same collection do not interfere
+        return iter(self._models)
 
     def next(self):
+        """Return the next model, for next(collection) without a loop; not thread-safe."""
         self.inflate()
         if self._iter_marker >= len(self._models):
             raise StopIteration
@@ -149,6 +175,14 @@ class ModelCollection(object):
     def __call__(self, *args, **kwargs):
         raise NotImplementedError("'__call__' must be defined by subclasses")
 
+    def _model(self, data, model_class=None, **kwargs):
+        """Create a model of this collection, or reuse the canonical one of the client's identity map."""
+        model_class = model_class or self.model_class
+        identity_map = getattr(self.client, 'identity_map', None)
+        if identity_map is None:
+            return model_class(self, data=data, **kwargs)
+        return identity_map.model(model_class, self, data, **kwargs)
+
     def inflate(self):
         raise NotImplementedError("'inflate' must be defined by subclasses")
 
@@ -185,6 +219,11 @@ class QueryableModelCollection(ModelCollection):
         super(QueryableModelCollection, self).__init__(*args, **kwargs)
         self.request = None
         self._filter = {}
+        # only one thread loads the collection, the others wait for it
+        self._lock = LoadLock()
+        # the endpoint of the collection, those of the model class unless set by _endpoint()
+        self.path = self.model_class.path
+        self.data_class = getattr(self.model_class, 'data_class', None)
 
     def __call__(self, *args, **kwargs):
         if len(args) == 1:
@@ -193,8 +232,8 @@ class QueryableModelCollection(ModelCollection):
                 items = args[0]
             else:
                 identifier = str(args[0])
-                return self.model_class(self, href='/'.join([self.url, identifier]),
-                                        data={self.model_class.primary_key: identifier})
+                return self._model({self.model_class.primary_key: identifier},
+                                   href='/'.join([self.url, identifier]))
         else:
             items = args
 
@@ -229,6 +268,19 @@ class QueryableModelCollection(ModelCollection):
 
         return self
 
+    def _endpoint(self, path, data_class=None):
+        """Return a new collection of the same model class, for another endpoint.
+
+        Some endpoints list other objects than the model class, i.e. the terms
+        of a glossary: their path and data class are kept by the collection,
+        the model class is shared by all threads and never modified.
+        """
+        collection = self.__class__(self.client, self.model_class, parent=self.parent)
+        collection.path = path
+        if data_class is not None:
+            collection.data_class = data_class
+        return collection
+
     @property
     def is_admin_api(self):
         return False
@@ -244,27 +296,32 @@ class QueryableModelCollection(ModelCollection):
         else:
             pieces = [self.parent.url]
 
-        pieces.append(self.model_class.path)
+        pieces.append(self.path)
         return '/'.join(pieces)
 
     def inflate(self):
         """Load the collection from the server, if necessary."""
         if not self._is_inflated:
-            self.check_version()
-            for k, v in self._filter.items():
-                if '[' in v:
-                    try:
-                        self._filter[k] = ast.literal_eval(v)
-                    except SyntaxError:
-                        # In case of DSL Queries, we can specify the list in a query
-                        # but this will try to evaluate this as a list and failed as syntax error.
-                        self._filter[k] = v
-            LOG.debug("Trying to fetch collection from server - ".format(self.model_class.__class__.__name__))
-            self.load(self.client.get(self.url, params=self._filter))
-
-        self._is_inflated = True
+            with self._lock:
+                if not self._is_inflated:
+                    self.check_version()
+                    self._prepare_filter()
+                    LOG.debug("Trying to fetch collection from server - %s", self.model_class.__name__)
+                    self.load(self.client.get(self.url, params=self._filter))
+                    self._is_inflated = True
         return self
 
+    def _prepare_filter(self):
+        """Turn list-like filter values back into lists before sending them."""
+        for k, v in self._filter.items():
+            if '[' in v:
+                try:
+                    self._filter[k] = ast.literal_eval(v)
+                except SyntaxError:
+                    # In case of DSL Queries, we can specify the list in a query
+                    # but this will try to evaluate this as a list and failed as syntax error.
+                    self._filter[k] = v
+
     @events.evented
     def load(self, response):
         """Parse the GET response for the collection.
@@ -276,23 +333,25 @@ class QueryableModelCollection(ModelCollection):
         In some rare cases, a collection can have an asynchronous request
         triggered.  For those cases, we handle it here.
         """
-        LOG.debug("Parsing the GET response for the collection - {}".format(self.model_class.__class__.__name__))
-        self._models = []
+        LOG.debug("Parsing the GET response for the collection - %s", self.model_class.__name__)
+        # built aside, the collection may be iterated meanwhile
+        models = []
         if isinstance(response, dict):
             for key in response.keys():
                 model = self.model_class(self, href='')
                 model.load(response[key])
-                self._models.append(model)
+                models.append(model)
         else:
             for item in response:
                 model = self.model_class(self,
                                          href=item.get('href'))
                 model.load(item)
-                self._models.append(model)
+                models.append(model)
+        self._models = models
 
     def create(self, *args, **kwargs):
         """Add a resource to this collection."""
-        LOG.debug(f"Adding a new resource to the collection {self.__class__.__name__} with the data {kwargs}")
+        LOG.debug("Adding a new resource to the collection %s with the data %s", self.__class__.__name__, kwargs)
         href = self.url
         if len(args) == 1:
             kwargs[self.model_class.primary_key] = args[0]
@@ -306,9 +365,8 @@ class QueryableModelCollection(ModelCollection):
 
     def update(self, **kwargs):
         """Update all resources in this collection."""
-        LOG.debug(f"Updating all resources in the collection "
-                  f"{self.model_class.__class__.__name__} "
-                  f"with the following arguments {kwargs}")
+        LOG.debug("Updating all resources in the collection %s with the following arguments %s",
+                  self.model_class.__name__, kwargs)
         self.inflate()
         for model in self._models:
             model.update(**kwargs)
@@ -316,7 +374,7 @@ class QueryableModelCollection(ModelCollection):
 
     def delete(self, **kwargs):
         """Delete all resources in this collection."""
-        LOG.debug("Deleting all resources in this collection:  ".format(self.model_class.__class__.__name__))
+        LOG.debug("Deleting all resources in this collection: %s", self.model_class.__name__)
         self.inflate()
         for model in self._models:
             model.delete(**kwargs)
@@ -340,6 +398,40 @@ class QueryableModelCollection(ModelCollection):
                                                                  min_version))
 
 
+class LazyModelList(object):
+    """A read-only sequence of models, built on access from a list of raw items.
+
+    Models are only referenced weakly: the same instance is returned for an
+    index as long as the application holds on to it, and it is built again
+    otherwise.  Iterating over a large list therefore keeps a single model
+    alive at a time.
+    """
+
+    def __init__(self, items, factory):
+        self.items = items
+        self._factory = factory
+        self._cache = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.items)))]
+        if index < 0:
+            index += len(self.items)
+        if not 0 <= index < len(self.items):
+            raise IndexError("model index out of range")
+        model = self._cache.get(index)
+        if model is None:
+            model = self._cache[index] = self._factory(self.items[index])
+        return model
+
+    def __iter__(self):
+        for index in range(len(self.items)):
+            yield self[index]
+
+
 class DependentModelCollection(ModelCollection):
     """A collection of DependentModel objects.
 
@@ -364,7 +456,7 @@ class DependentModelCollection(ModelCollection):
         What you start with is all you ever get.  If the parent resource is
         reloaded, it should create new collections for these resources.
         """
-        LOG.debug("Generating the models for this collection:  ".format(self.model_class.__class__.__name__))
+        LOG.debug("Generating the models for this collection: %s", self.model_class.__name__)
         items = []
         if len(args) == 1:
             if isinstance(args[0], list):
@@ -401,6 +493,28 @@ class DependentModelCollection(ModelCollection):
             return len(self._models)
 
 
+class ModelMeta(type):
+    """Compile the schema of a model class when it is created.
+
+    The field names are turned into a frozenset once per class, instead of
+    being scanned for every key of every loaded item.  Classes which do not
+    define __slots__ get empty ones, so that the models only carry the
+    attributes declared by their base classes: no per-instance __dict__
+    unless a base class asks for one.
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        namespace.setdefault('__slots__', ())
+        cls = super(ModelMeta, mcs).__new__(mcs, name, bases, namespace)
+        fields = cls.fields
+        if isinstance(fields, six.string_types):
+            # i.e. fields = ('name') instead of ('name',)
+            fields = (fields,)
+        cls._field_set = frozenset(fields)
+        return cls
+
+
+@six.add_metaclass(ModelMeta)
 class Model(object):
     """An Atlas model represents a resource in the Atlas API.
 
@@ -422,18 +536,20 @@ class Model(object):
     model.entity will return a ModelCollection of Entity objects.
 
     """
+    __slots__ = ('_data', 'parent', 'client', '_is_inflated', '_relationship_cache', '__weakref__')
     primary_key = None
     fields = []
     relationships = {}
     min_version = OLDEST_SUPPORTED_VERSION
 
     def __init__(self, parent, data=None):
-        LOG.debug("Generating new model class: {} with the data: {}".format(self.__class__.__name__, data))
-        if data is None:
-            data = {}
-
-        self._data = dict((key, value) for key, value in six.iteritems(data)
-                          if key in set(self.fields))
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("Generating new model class: %s with the data: %s", self.__class__.__name__, data)
+        if data:
+            field_set = self._field_set
+            self._data = {key: value for key, value in data.items() if key in field_set}
+        else:
+            self._data = {}
         self.parent = parent
         self.client = parent.client
         self._is_inflated = False
@@ -444,10 +560,27 @@ class Model(object):
         for field in self.fields:
             fields_dict[field] = field
         d1 = {}
-        for item in [self.__dict__, fields_dict, self.relationships]:
+        for item in [self._instance_attributes(), fields_dict, self.relationships]:
             d1.update(item)
         return d1.keys()
 
+    def _instance_attributes(self):
+        """The attributes set on the instance, whether they are slots or in __dict__."""
+        attributes = {}
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                if name == '__weakref__':
+                    continue
+                try:
+                    value = object.__getattribute__(self, name)
+                except AttributeError:
+                    continue
+                if name == '__dict__':
+                    attributes.update(value)
+                else:
+                    attributes[name] = value
+        return attributes
+
     @property
     def identifier(self):
         """A model's identifier is the value of its primary key."""
@@ -468,10 +601,6 @@ class Model(object):
         """
         if attr in self.relationships:
             rel_class = self.relationships[attr]
-            # we can't lazy-load DependentModel types
-            if issubclass(rel_class, DependentModel):
-                rel_class(parent=self).inflate()
-
             if attr not in self._relationship_cache:
                 self._relationship_cache[attr] = rel_class.collection_class(
                     self.client, rel_class,
@@ -479,14 +608,15 @@ class Model(object):
                 )
             return self._relationship_cache[attr]
 
-        if attr in self.fields:
+        if attr in self._field_set:
             # if it came from a parent inflation, we might only have partial data
             if attr not in self._data:
-                LOG.debug(f"Lazy-loading the relationship attribute: '{attr}'.")
+                LOG.debug("Lazy-loading the relationship attribute: '%s'.", attr)
                 self.inflate()
             return self._data.get(attr)
 
-        LOG.error("Missing attr %s: %s", self.__class__.__name__, attr)
+        # not an error in itself, hasattr() and getattr() with a default end up here
+        LOG.debug("Missing attr %s: %s", self.__class__.__name__, attr)
 
         raise AttributeError(attr)
 
@@ -580,12 +710,14 @@ class QueryableModel(Model):
     get the latest data from the server, the refresh() method will do that for
     you.
     """
+    # queryable models keep arbitrary attributes (request, href, ...)
+    __slots__ = ('__dict__',)
     collection_class = QueryableModelCollection
     use_key_prefix = False
     path = None
     data_key = None
     relationships = {}
-    method = "get"  # To keep track of the method type of each request
+    method = "get"  # the HTTP method loading the model
     _url = None     # This is to handle the getter/setter of the property
 
     def __init__(self, *args, **kwargs):
@@ -629,44 +761,56 @@ class QueryableModel(Model):
     def inflate(self, url=None):
         """Load the resource from the server, if not already loaded."""
         if not self._is_inflated:
-            if self._is_inflating:
-                #  catch infinite recursion when attempting to inflate
-                #  an object that doesn't have enough data to inflate
-                msg = ("There is not enough data to inflate this object.  "
-                       "Need either an href: {} or a {}: {}")
-                msg = msg.format(self._href, self.primary_key, self._data.get(self.primary_key))
-                LOG.error(msg)
-                raise exceptions.ClientError(msg)
-
-            self._is_inflating = True
-
-            try:
-                params = self.searchParameters if hasattr(self, 'searchParameters') else {}
-                # To keep the method same as the original request. The default is GET
-                self.load(self.client.request(self.method, url or self.url, **params))
-            except Exception:
-                self.load(self._data)
-
-            self._is_inflated = True
-            self._is_inflating = False
+            with self._inflate_lock():
+                if not self._is_inflated:
+                    self._inflate(url)
         return self
 
+    def _inflate_lock(self):
+        """Return the lock held while inflating, so that other threads wait instead of loading too."""
+        # created on first use, most models come with their data and are never inflated
+        lock = self.__dict__.get('_lock')
+        if lock is None:
+            lock = self.__dict__.setdefault('_lock', LoadLock())
+        return lock
+
+    def _inflate(self, url=None):
+        if self._is_inflating:
+            #  catch infinite recursion when attempting to inflate
+            #  an object that doesn't have enough data to inflate
+            msg = ("There is not enough data to inflate this object.  "
+                   "Need either an href: {} or a {}: {}")
+            msg = msg.format(self._href, self.primary_key, self._data.get(self.primary_key))
+            LOG.error(msg)
+            raise exceptions.ClientError(msg)
+
+        self._is_inflating = True
+
+        try:
+            params = self.searchParameters if hasattr(self, 'searchParameters') else {}
+            self.load(self.client.request(self.method, url or self.url, **params))
+        except Exception:
+            self.load(self._data)
+
+        self._is_inflated = True
+        self._is_inflating = False
+
     def _generate_input_dict(self, **kwargs):
         if self.data_key:
             data = {self.data_key: {}}
             if len(kwargs) == 0:
                 data = self._data
-                LOG.info(f"Input data generated: {data}")
+                LOG.info("Input data generated: %s", data)
                 return data
             for field in kwargs:
                 if field in self.fields:
                     data[self.data_key][field] = kwargs[field]
                 else:
                     data[field] = kwargs[field]
-            LOG.info(f"Input data generated: {data}")
+            LOG.info("Input data generated: %s", data)
             return data
         else:
-            LOG.info(f"No data key specified - Using kwargs: {kwargs}")
+            LOG.info("No data key specified - Using kwargs: %s", kwargs)
             return kwargs
 
     @events.evented
@@ -705,12 +849,10 @@ class QueryableModel(Model):
         some subclasses the identifier is server-side-generated.  Those classes
         have to overload this method to deal with that scenario.
         """
-        self.method = 'post'
         if self.primary_key in kwargs:
             del kwargs[self.primary_key]
         data = self._generate_input_dict(**kwargs)
-        LOG.info(f"Creating a new instance of the resource "
-                 f"{self.__class__.__name__}, with data: {data}")
+        LOG.info("Creating a new instance of the resource %s, with data: %s", self.__class__.__name__, data)
         self.load(self.client.post(self.url, data=data))
         return self
 
@@ -729,22 +871,19 @@ class QueryableModel(Model):
         If the request body doesn't follow that pattern, you'll need to overload
         this method to handle your particular case.
         """
-        self.method = 'put'
         data = self._generate_input_dict(**kwargs)
-        LOG.info(f"Updating an instance of the resource "
-                 f"{self.__class__.__name__}, with data: {data}")
+        LOG.info("Updating an instance of the resource %s, with data: %s", self.__class__.__name__, data)
         self.load(self.client.put(self.url, data=data))
         return self
 
     @events.evented
     def delete(self, **kwargs):
         """Delete a resource by issuing a DELETE http request against it."""
-        self.method = 'delete'
         if len(kwargs) > 0:
             self.load(self.client.delete(self.url, params=kwargs))
         else:
             self.load(self.client.delete(self.url))
-        LOG.info(f"Deleting the resource {self.__class__.__name__} using url: {self.url}")
+        LOG.info("Deleting the resource %s using url: %s", self.__class__.__name__, self.url)
         self.parent.remove(self)
         return
 
@@ -756,59 +895,21 @@ class QueryableModel(Model):
             self.request = None
         return self.inflate()
 
-    def entities_with_relationships(self, attributes=None):
+    def entities_with_relationships(self, attributes=None, depth=1, resolver=None):
         """
         In some cases Atlas does not provide the relationship attributes in
         referredEntities dictionary. To handle all those corner cases (like searching
         on the parent type etc. this function verifies if attribute is under referredEntities,
         otherwise fetch it and store it for further use.
         :param attributes: A list of relationship attributes.
+        :param depth: The number of levels of relationships to resolve.
+        :param resolver: A RelationshipResolver, to share the fetched entities between calls.
         :return: A list of entities, with detailed relationship attributes.
         """
-
-        def _fix_relationships(client, entities, ref_entities, attrs):
-            rel_attribute_ids = set()
-            for entity in entities:
-                relationship_attrs = entity.relationshipAttributes
-
-                # Only fix the attributes if specified in parameter, else fix all.
-                attrs = attrs or relationship_attrs.keys()
-
-                for attribute in attrs:
-                    rel_attr = relationship_attrs.get(attribute)
-                    if isinstance(rel_attr, list):
-                        for index, item in enumerate(rel_attr):
-                            guid = item.guid if hasattr(item, 'guid') else item.get('guid')
-                            # A check to be on the safe side / and for test cases
-                            if guid:
-                                if guid in ref_entities:
-                                    entity.relationshipAttributes[attribute][index] = ref_entities[guid]
-                                else:
-                                    rel_attribute_ids.add(guid)
-                    if isinstance(rel_attr, dict):
-                        guid = rel_attr.get('guid')
-                        # A check to be on the safe side / and for test cases
-                        if guid:
-                            if guid in ref_entities:
-                                entity.relationshipAttributes[attribute] = ref_entities[guid]
-                            else:
-                                rel_attribute_ids.add(guid)
-
-            if rel_attribute_ids:
-                _rel_attr_collection = client.entity_bulk(guid=list(rel_attribute_ids))
-                # noinspection PyTypeChecker
-                for rel_entities in _rel_attr_collection:
-                    ref_entities.update(dict((rel_entity.guid, rel_entity._data)
-                                             for rel_entity in rel_entities.entities))
-
-                    # Fix remaining entities recursively
-                    entities = _fix_relationships(client, entities, ref_entities, attrs)
-
-            return entities
-
         if self.entities and isinstance(self.entities, DependentModelCollection):
-            referred_entities = self.referredEntities or dict()
-            return _fix_relationships(self.client, self.entities, referred_entities, attributes)
+            resolver = resolver or RelationshipResolver(self.client)
+            return resolver.resolve(self.entities, attributes=attributes, depth=depth,
+                                    referred_entities=self.referredEntities)
 
 
 class QueryableModelCollectionBulk(QueryableModelCollection):
@@ -816,70 +917,36 @@ class QueryableModelCollectionBulk(QueryableModelCollection):
         """
         Create entities in bulk amount. Data must be a list of instances
         """
-        LOG.debug(f"Trying to create {self.__class__.__name__} with the data {data}")
-        if not isinstance(data, list):
-            raise BadRequest(
-                url=self.model_class.path,
-                method="POST",
-                message=f'Data should be a list of "{self.model_class.data_class}"'
-            )
-        _data = list()
-        for item in data:
-            # noinspection PyProtectedMember
-            _data.append(
-                self.model_class.data_class(**item).to_dict(
-                    data_key=self.model_class.data_key,
-                    ignore_falsy=True)
-            )
-
-        self.load(self.client.post(self.url, data=_data))
+        LOG.debug("Trying to create %s with the data %s", self.__class__.__name__, data)
+        self.load(self.client.post(self.url, data=self._bulk_payload(data, method="POST")))
         return self._models
 
     def delete(self, data):
         """
         Deletes entities in bulk amount. Data must be a list of instances
         """
-        LOG.debug(f"Trying to delete {self.__class__.__name__} with the data {data}")
-        if not isinstance(data, list):
-            raise BadRequest(
-                url=self.model_class.path,
-                method="DELETE",
-                message=f'Data should be a list of "{self.model_class.data_class}"'
-            )
-        _data = list()
-        for item in data:
-            # noinspection PyProtectedMember
-            _data.append(
-                self.model_class.data_class(**item).to_dict(
-                    data_key=self.model_class.data_key,
-                    ignore_falsy=True)
-            )
-
-        self.load(self.client.delete(self.url, data=_data))
+        LOG.debug("Trying to delete %s with the data %s", self.__class__.__name__, data)
+        self.load(self.client.delete(self.url, data=self._bulk_payload(data, method="DELETE")))
         return self._models
 
     def update(self, data):
         """
         Updates entities in bulk amount. Data must be a list of instances
         """
-        LOG.debug(f"Trying to update {self.__class__.__name__} with the data {data}")
+        LOG.debug("Trying to update %s with the data %s", self.__class__.__name__, data)
+        self.load(self.client.put(self.url, data=self._bulk_payload(data, method="PUT")))
+        return self._models
+
+    def _bulk_payload(self, data, method):
+        """Validate a list of items against the data class and serialize it."""
         if not isinstance(data, list):
             raise BadRequest(
-                url=self.model_class.path,
-                method="PUT",
-                message=f'Data should be a list of "{self.model_class.data_class}"'
-            )
-        _data = list()
-        for item in data:
-            # noinspection PyProtectedMember
-            _data.append(
-                self.model_class.data_class(**item).to_dict(
-                    data_key=self.model_class.data_key,
-                    ignore_falsy=True)
+                url=self.path,
+                method=method,
+                message=f'Data should be a list of "{self.data_class}"'
             )
-
-        self.load(self.client.put(self.url, data=_data))
-        return self._models
+        return [self.data_class(**item).to_dict(data_key=self.model_class.data_key, ignore_falsy=True)
+                for item in data]
 
 
 class QueryableModelV2(QueryableModel):
@@ -892,6 +959,10 @@ class QueryableModelV2(QueryableModel):
 
     def __init__(self, *args, **kwargs):
         self.primary_key_value = kwargs.get("data", {}).get(self.primary_key)
+        parent = args[0] if args else kwargs.get('parent')
+        if isinstance(parent, QueryableModelCollection) and parent.model_class is self.__class__:
+            # the data class of the endpoint the model comes from, i.e. glossary term headers
+            self.data_class = parent.data_class
         super(QueryableModelV2, self).__init__(*args, **kwargs)
 
     def __dir__(self):
@@ -943,7 +1014,6 @@ class QueryableModelV2(QueryableModel):
         """
         data = self.to_dict()
         data.update(kwargs)
-        self.method = 'put'
         self.load(self.client.put(self.url, data=data))
         return self
 
@@ -952,14 +1022,19 @@ class QueryableModelV2(QueryableModel):
         """
         Partially Update a resource by passing in modifications via keyword arguments.
         """
-        self.method = 'put'
-        self.load(self.client.put(self.url, data=kwargs))
+        self.load(self.client.put(self._partial_url(), data=kwargs))
         return self
 
+    def _partial_url(self):
+        return self.url
+
     @events.evented
     def load(self, response):
         if 'href' in response:
             self._href = response.pop('href')
-        self.data_class_data = self.data_class(**response)
+        if getattr(self.client, 'validate_responses', True):
+            self.data_class_data = self.data_class(**response)
+        else:
+            self.data_class_data = construct(self.data_class, response)
 
 
@@ -0,0 +1,141 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Gather the entities inflated one by one into 'entity/bulk' requests.
+
+Touching a lazy field of an entity model loads it with its own request, so
+code going over many models makes one request per model.  An EntityBatcher
+collects the GUIDs of these inflations and loads them together, the
+response of each entity then being handed back to the model waiting for it.
+
+GUIDs are gathered in two ways: within a `with client.batch():` block, the
+models created by `client.entity_guid(guid)` are queued and all of them are
+fetched by the first inflation; with `Atlas(batch_window=...)`, an inflation
+waits that many seconds for the inflations of other threads to join it.
+"""
+
+import collections
+import logging
+import threading
+
+from atlasclient import utils
+
+LOG = logging.getLogger('pyatlasclient')
+
+
+class _Request(object):
+    """An entity waited for, with its response once its batch is fetched."""
+    __slots__ = ('guid', 'done', 'response', 'error')
+
+    def __init__(self, guid):
+        self.guid = guid
+        self.done = threading.Event()
+        # the entity/guid response, None when the entity was not found
+        self.response = None
+        self.error = None
+
+
+class EntityBatcher(object):
+    """Fetch the entities requested within a window of time together.
+
+    The first load() of a batch waits up to window seconds, or until
+    max_size GUIDs are requested, and then fetches the batch with up to
+    max_workers requests at a time (see utils.worker_count()); the other
+    loads of the batch wait for it.  With scoped, the responses are kept, and queued GUIDs (see defer())
+    are fetched along with the next batch.  A batcher is thread-safe.
+    """
+
+    def __init__(self, client, window=0.005, max_size=100, max_workers=None, scoped=False):
+        self.client = client
+        self.window = window
+        self.max_size = max_size
+        self.max_workers = utils.worker_count(client, max_workers)
+        self.scoped = scoped
+        self._init_state()
+
+    def _init_state(self):
+        # the requests of the next batch, by guid
+        self._pending = collections.OrderedDict()
+        # the requests sent, by guid, until their batch is fetched unless scoped
+        self._sent = {}
+        self._collecting = False
+        self._condition = threading.Condition()
+
+    def __len__(self):
+        return len(self._pending) + len(self._sent)
+
+    def __getstate__(self):
+        # a copy starts without the GUIDs waited for by the threads of the original
+        return {'client': self.client, 'window': self.window, 'max_size': self.max_size,
+                'max_workers': self.max_workers, 'scoped': self.scoped}
+
+    def __setstate__(self, state):
+        # the client may not be unpickled yet, its settings are not checked again
+        self.__dict__.update(state)
+        self._init_state()
+
+    def defer(self, guid):
+        """Queue a GUID to be fetched with the next batch, without waiting for it."""
+        with self._condition:
+            if guid not in self._sent and guid not in self._pending:
+                self._pending[guid] = _Request(guid)
+
+    def load(self, guid):
+        """Return the entity/guid response of a GUID, None when the entity does not exist.
+
+        :raise: the error of the requests of the batch, i.e. a ClientError.
+        """
+        with self._condition:
+            request = self._sent.get(guid) or self._pending.get(guid)
+            if request is None:
+                request = self._pending[guid] = _Request(guid)
+                if len(self._pending) >= self.max_size:
+                    self._condition.notify_all()
+            batch = None
+            if not request.done.is_set() and guid in self._pending and not self._collecting:
+                # the first thread of the batch waits for the others, and then fetches it
+                self._collecting = True
+                try:
+                    if self.window:
+                        self._condition.wait_for(lambda: len(self._pending) >= self.max_size, self.window)
+                finally:
+                    self._collecting = False
+                batch = self._pending
+                self._pending = collections.OrderedDict()
+                self._sent.update(batch)
+        if batch:
+            self._fetch(batch)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.response
+
+    def _fetch(self, batch):
+        LOG.debug("Fetching a batch of %s entities", len(batch))
+        responses = {}
+        try:
+            responses = self.client.entity_guid._fetch_responses(
+                list(batch), max_workers=self.max_workers, chunk_size=self.max_size)
+        except Exception as error:
+            for request in batch.values():
+                request.error = error
+        finally:
+            for request in batch.values():
+                request.response = responses.get(request.guid)
+                request.done.set()
+            if not self.scoped:
+                # the threads waiting hold their request, the next loads start a new batch
+                with self._condition:
+                    for guid, request in batch.items():
+                        if self._sent.get(guid) is request:
+                            del self._sent[guid]
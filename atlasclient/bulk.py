@@ -0,0 +1,154 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Write any number of entities with 'entity/bulk', several requests at a time.
+
+The entities are read from an iterable as chunks are needed, each entity
+being encoded once: its size decides the chunk it goes to, and the encoded
+entities of a chunk are then joined into the request body.  Only a bounded
+number of chunks is waiting to be sent, so that a large or endless input
+never sits in memory.  The mutation responses are merged into one result.
+"""
+
+import inspect
+import logging
+from concurrent import futures
+
+import requests
+
+from atlasclient import exceptions, utils
+
+LOG = logging.getLogger('pyatlasclient')
+
+_BODY_PREFIX = b'{"entities":['
+_BODY_SUFFIX = b']}'
+
+# the responses telling that a chunk is too large for the server, which then
+# gets it again in two halves: 413 Payload Too Large and 504 Gateway Timeout
+SPLIT_STATUS_CODES = (413, 504)
+
+
+class BulkWriteResult(object):
+    """The merged EntityMutationResponses of the requests of an EntityBulkWriter."""
+
+    def __init__(self):
+        # the entity headers by operation, i.e. 'CREATE' or 'UPDATE'
+        self.mutatedEntities = {}
+        # the GUIDs assigned to the entities sent with a temporary (negative) GUID
+        self.guidAssignments = {}
+        # (entities, error) for each chunk which could not be written
+        self.failed = []
+        self.requests = 0
+        self.entities = 0
+
+    def add(self, response, count):
+        self.requests += 1
+        self.entities += count
+        for operation, headers in (response.get('mutatedEntities') or {}).items():
+            self.mutatedEntities.setdefault(operation, []).extend(headers)
+        self.guidAssignments.update(response.get('guidAssignments') or {})
+
+    def to_dict(self):
+        return {'mutatedEntities': self.mutatedEntities, 'guidAssignments': self.guidAssignments}
+
+
+class EntityBulkWriter(object):
+    """Create or update entities with chunks of at most max_entities entities and max_bytes bytes.
+
+    Up to max_workers chunks are sent at a time, and the iterable is read
+    ahead by at most max_pending chunks.  An entity larger than max_bytes is
+    sent on its own.  When Atlas rejects a chunk as too large or times out,
+    the chunk is sent again in two halves; the chunks failing otherwise are
+    kept in the failed list of the result, and the writing goes on.
+
+    Entities are only resolved by temporary GUIDs within a request: entities
+    referring to each other that way must be written by the same chunk.
+
+    Several workers require a client created with thread_safe=True: by
+    default there are then 4 of them, and a single one otherwise.
+
+    :param params: the query parameters of the requests, i.e. replaceClassifications.
+    """
+
+    def __init__(self, client, max_entities=200, max_bytes=2 * 1024 * 1024, max_workers=None, max_pending=None,
+                 **params):
+        if inspect.iscoroutinefunction(client.post):
+            raise exceptions.ClientError("EntityBulkWriter does blocking I/O, use it with the Atlas client")
+        max_workers = utils.worker_count(client, max_workers)
+        self.client = client
+        self.max_entities = max_entities
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+        self.max_pending = max_pending or 2 * max_workers
+        self.params = params
+        self.url = client.entity_bulk.url
+
+    def write(self, entities):
+        """Write the entities of an iterable, i.e. dictionaries of AtlasEntity, and return a BulkWriteResult."""
+        result = BulkWriteResult()
+        pending = set()
+        with futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for chunk in self._chunks(entities):
+                pending.add(executor.submit(self._post, chunk))
+                if len(pending) >= self.max_pending:
+                    # back-pressure: read no more entities until a chunk is written
+                    done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                    self._collect(done, result)
+            self._collect(futures.wait(pending).done, result)
+        LOG.debug("Wrote %s entities with %s requests, %s chunks failed",
+                  result.entities, result.requests, len(result.failed))
+        return result
+
+    def _chunks(self, entities):
+        """Yield lists of (entity, encoded entity) within the limits."""
+        json_codec = self.client.json_codec
+        overhead = len(_BODY_PREFIX) + len(_BODY_SUFFIX)
+        chunk, size = [], overhead
+        for entity in entities:
+            encoded = json_codec.dumps(entity)
+            if isinstance(encoded, str):
+                encoded = encoded.encode('utf-8')
+            # with the comma separating it from the previous entity
+            if chunk and (len(chunk) >= self.max_entities or size + len(encoded) + 1 > self.max_bytes):
+                yield chunk
+                chunk, size = [], overhead
+            chunk.append((entity, encoded))
+            size += len(encoded) + 1
+        if chunk:
+            yield chunk
+
+    def _post(self, chunk):
+        """Write a chunk, return a list of (chunk, response, error) for it or its parts."""
+        body = b''.join((_BODY_PREFIX, b','.join(encoded for entity, encoded in chunk), _BODY_SUFFIX))
+        try:
+            return [(chunk, self.client.post(self.url, data=body, params=self.params), None)]
+        except Exception as error:
+            if len(chunk) > 1 and _too_large(error):
+                LOG.debug("Splitting a chunk of %s entities (%s bytes): %s", len(chunk), len(body), error)
+                middle = len(chunk) // 2
+                return self._post(chunk[:middle]) + self._post(chunk[middle:])
+            return [(chunk, None, error)]
+
+    def _collect(self, done, result):
+        for future in done:
+            for chunk, response, error in future.result():
+                if error is None:
+                    result.add(response, len(chunk))
+                else:
+                    result.failed.append(([entity for entity, encoded in chunk], error))
+
+
+def _too_large(error):
+    if isinstance(error, exceptions.HttpError):
+        return error.code in SPLIT_STATUS_CODES
+    return isinstance(error, requests.exceptions.Timeout)
@@ -0,0 +1,143 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+An in-memory cache for the responses of GET requests.
+
+Responses are kept as the raw bytes returned by Atlas, and decoded again on
+every hit, so callers modifying the returned dictionaries never alter the
+cache.  Entries expire after a TTL which can be set per endpoint, and the
+least recently used ones are evicted once the cache holds more than
+max_bytes of response bodies.
+
+Writing to a resource (POST, PUT or DELETE) invalidates the cached responses
+of the whole resource family, i.e. updating an entity drops every cached
+'entity/...' response, but keeps the cached type definitions.
+"""
+
+import collections
+import re
+import threading
+import time
+
+# the resource family of an URL: 'http://host/api/atlas/v2/entity/guid/1234' -> 'http://host/api/atlas/v2/entity'
+RESOURCE_FAMILY = re.compile(r'^(.*?/api/atlas/(?:v2/)?[^/?]+)')
+
+CacheEntry = collections.namedtuple('CacheEntry', ['url', 'content', 'content_type', 'expires_at'])
+
+
+def resource_family(url):
+    match = RESOURCE_FAMILY.match(url)
+    return match.group(1) if match else url
+
+
+def freeze_params(params):
+    """Turn query parameters into a hashable, order independent value."""
+    if not params:
+        return ()
+    items = params.items() if isinstance(params, dict) else params
+    return tuple(sorted((key, tuple(value) if isinstance(value, (list, tuple)) else value)
+                        for key, value in items))
+
+
+class ResponseCache(object):
+    """A thread-safe TTL and LRU cache of GET responses.
+
+    ttl is the default time to live in seconds.  ttls maps URL fragments to
+    their own TTL, the longest fragment found in the URL wins, and a TTL of 0
+    disables caching for those URLs, i.e. {'types/': 3600, 'search/': 0}.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=60, ttls=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.ttls = sorted((ttls or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        # bumped by every invalidation, so that a response read before a
+        # write but received after it is not cached
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getstate__(self):
+        # a copy starts empty, as the expiry times come from the monotonic clock of this process
+        return {'max_bytes': self.max_bytes, 'ttl': self.ttl, 'ttls': dict(self.ttls)}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def ttl_for(self, url):
+        for fragment, ttl in self.ttls:
+            if fragment in url:
+                return ttl
+        return self.ttl
+
+    @staticmethod
+    def key(method, url, params=None):
+        return method, url, freeze_params(params)
+
+    def get(self, key):
+        """Return the cached (content, content_type) for a key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.content, entry.content_type
+
+    def put(self, key, url, content, content_type, generation=None):
+        """Cache a response, unless the cache was invalidated since generation."""
+        ttl = self.ttl_for(url)
+        if ttl <= 0 or len(content) > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CacheEntry(url, content, content_type, time.monotonic() + ttl)
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._size -= len(entry.content)
+
+    def invalidate(self, url=None):
+        """Drop the cached responses of an URL and the URLs below it, or everything."""
+        with self._lock:
+            self.generation += 1
+            if url is None:
+                self._entries.clear()
+                self._size = 0
+                return
+            for key in [key for key, entry in self._entries.items() if entry.url.startswith(url)]:
+                self._remove(key)
+
+    def invalidate_written(self, url):
+        """Drop the cached responses which a write to url may have made stale."""
+        self.invalidate(resource_family(url))
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'entries': len(self._entries), 'bytes': self._size}
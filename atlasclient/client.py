@@ -10,21 +10,38 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import copy
 import json
 import logging
 import tarfile
 
+import contextlib
 import functools
 import io
+import threading
+import weakref
+
 import requests
 
-from atlasclient import models, utils, base, exceptions
+from atlasclient import models, utils, base, codec, exceptions
+from atlasclient.auth import TokenRefresher
+from atlasclient.batch import EntityBatcher
+from atlasclient.identity import IdentityMap
+from atlasclient.cache import ResponseCache
+from atlasclient.ratelimit import AdaptiveRateLimiter
+from atlasclient.typecache import TypeDefCache
+from atlasclient.pool import AtlasHTTPAdapter
 from atlasclient.exceptions import handle_response, BadHttpAuthArg
 from atlasclient.glossary import models as glossary_models
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 LOG = logging.getLogger('pyatlasclient')
 
+SESSION_COOKIE = 'ATLASSESSIONID'
+
 # this defines where the Atlas client delegates to for actual logic
 ENTRY_POINTS = {'entity_guid': models.EntityGuid,
                 'typedefs': models.TypeDef,
@@ -61,6 +78,11 @@ ENTRY_POINTS = {'entity_guid': models.EntityGuid,
                 'glossary_terms': glossary_models.GlossaryTerms,
                 }
 
+HTTP_METHODS = ('get', 'post', 'put', 'delete', 'head', 'patch', 'options')
+
+# the attributes of the http client which are also those of the Atlas client
+FORWARDED_ATTRIBUTES = HTTP_METHODS + ('request', 'iter_items', 'pool_stats', 'close', 'cache', 'json_codec')
+
 
 class Atlas(object):
     """The Atlas client
@@ -71,14 +93,41 @@ class Atlas(object):
 
     def __init__(self, host, port=None, username=None, password=None, oidc_token=None,
                  identifier=None, protocol=None, validate_ssl=True,
-                 timeout=10, max_retries=5, auth=None):
+                 timeout=10, max_retries=5, auth=None, json_codec=None,
+                 pool_connections=10, pool_maxsize=10, pool_block=False, pool_idle_timeout=None,
+                 session_auth=False, token_provider=None, token_refresh_margin=60,
+                 rate_limit=None, rate_limit_retries=3,
+                 cache=None, typedef_cache=None, identity_map=False, validate_responses=True,
+                 thread_safe=False, batch_window=None, batch_size=100):
         self.base_url = utils.generate_base_url(host, port=port, protocol=protocol)
         if identifier is None:
             identifier = 'python-atlasclient'
         self.client = HttpClient(host=self.base_url, username=username,
                                  password=password, identifier=identifier, oidc_token=oidc_token,
                                  validate_ssl=validate_ssl, timeout=timeout,
-                                 max_retries=max_retries, auth=auth)
+                                 max_retries=max_retries, auth=auth, json_codec=json_codec,
+                                 pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                 pool_block=pool_block, pool_idle_timeout=pool_idle_timeout,
+                                 session_auth=session_auth, token_provider=token_provider,
+                                 token_refresh_margin=token_refresh_margin,
+                                 rate_limit=rate_limit, rate_limit_retries=rate_limit_retries,
+                                 cache=cache, thread_safe=thread_safe)
+        # a TypeDefCache, or the path of its database
+        if isinstance(typedef_cache, str):
+            typedef_cache = TypeDefCache(typedef_cache)
+        self.typedef_cache = typedef_cache
+        self._type_registry = None
+        # one canonical model per GUID, True for a map of this client only
+        if identity_map is True:
+            identity_map = IdentityMap()
+        self.identity_map = identity_map if isinstance(identity_map, IdentityMap) else None
+        # with False, glossary responses are trusted and their data classes built without validation
+        self.validate_responses = validate_responses
+        # the entities inflated by all threads within batch_window seconds are fetched together
+        self._window_batcher = None
+        if batch_window is not None:
+            self._window_batcher = EntityBatcher(self, window=batch_window, max_size=batch_size)
+        self._batch_scopes = threading.local()
         self._version = None
 
     def __dir__(self):
@@ -87,6 +136,48 @@ class Atlas(object):
         d1.update(ENTRY_POINTS)
         return d1.keys()
 
+    def __getstate__(self):
+        # the batch() blocks belong to the threads running them
+        state = dict(self.__dict__)
+        del state['_batch_scopes']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._batch_scopes = threading.local()
+
+    def type_registry(self, refresh=False):
+        """Return a TypeRegistry of all the type definitions, loaded once and then kept."""
+        if refresh or self._type_registry is None:
+            typedefs = self.typedefs.inflate()
+            self._type_registry = typedefs._models[0].registry
+        return self._type_registry
+
+    @contextlib.contextmanager
+    def batch(self, max_size=100, max_workers=None):
+        """Fetch the entities used within the block together, from entity/bulk.
+
+        The models created by entity_guid(guid) in the block, by this thread,
+        are loaded by the first of them to be inflated, along with any other
+        entity inflated in the block::
+
+            with client.batch():
+                entities = [client.entity_guid(guid) for guid in guids]
+                names = [entity.entity['attributes']['name'] for entity in entities]
+        """
+        batcher = EntityBatcher(self, window=0, max_size=max_size, max_workers=max_workers, scoped=True)
+        scopes = self._batch_scopes.__dict__.setdefault('scopes', [])
+        scopes.append(batcher)
+        try:
+            yield batcher
+        finally:
+            scopes.pop()
+
+    def batcher(self):
+        """Return the EntityBatcher of the current batch() block, or else of batch_window, if any."""
+        scopes = getattr(self._batch_scopes, 'scopes', None)
+        return scopes[-1] if scopes else self._window_batcher
+
     def check_version(self):
         if self.version < base.OLDEST_SUPPORTED_VERSION:
             raise exceptions.ClientError(
@@ -100,8 +191,8 @@ class Atlas(object):
             rel_class = ENTRY_POINTS[attr]
             return rel_class.collection_class(self, rel_class)
 
-        if getattr(requests, attr):
-            # forward get/post/put/head/delete to the http client
+        if attr in FORWARDED_ATTRIBUTES and 'client' in self.__dict__:
+            # forward get/post/put/head/delete, iter_items and a few more to the http client
             return getattr(self.client, attr)
 
         raise AttributeError(attr)
@@ -120,99 +211,363 @@ class HttpClient(object):
     """
 
     def __init__(self, host, identifier, username=None, password=None, oidc_token=None, validate_ssl=True,
-                 timeout=10, max_retries=5, auth=None):
-        if oidc_token:
-            auth_header = f'Bearer {oidc_token}'
-        elif username and password:
-            basic_token = utils.generate_http_basic_token(username=username, password=password)
-            auth_header = f'Basic {basic_token}'
+                 timeout=10, max_retries=5, auth=None, json_codec=None,
+                 pool_connections=10, pool_maxsize=10, pool_block=False, pool_idle_timeout=None,
+                 session_auth=False, token_provider=None, token_refresh_margin=60,
+                 rate_limit=None, rate_limit_retries=3,
+                 cache=None, thread_safe=False):
+        self.json_codec = codec.get_codec(json_codec)
+        if token_provider is None:
+            auth_header = generate_auth_header(username=username, password=password, oidc_token=oidc_token)
         else:
-            raise BadHttpAuthArg
+            # set by the token refresher below
+            auth_header = None
         self.request_params = {
             'headers': {'X-Requested-By': identifier,
                         'Authorization': auth_header},
             'verify': validate_ssl,
             'timeout': timeout,
         }
+        # headers per content type, built once instead of on every request
+        self._header_templates = {}
+        # with session_auth, the credentials are only sent until Atlas hands
+        # out a session cookie, which then authenticates the following requests
+        self.session_auth = session_auth
+        self._session_id = None
+        self._session_lock = threading.Lock()
+        self.host = host
         # automatically retry requests on connection errors
-        self.session = requests.Session()
-        self.session.auth = auth
-        adapter = requests.adapters.HTTPAdapter(max_retries=max_retries)
-        self.session.mount(host, adapter)
+        self._session = requests.Session()
+        self._session.auth = auth
+        # size the pool for the number of threads sharing this client, so that
+        # keep-alive connections are reused instead of discarded and re-handshaked
+        self.adapter = AtlasHTTPAdapter(max_retries=max_retries, pool_connections=pool_connections,
+                                        pool_maxsize=pool_maxsize, pool_block=pool_block,
+                                        idle_timeout=pool_idle_timeout)
+        self._session.mount(host, self.adapter)
+        # requests does not guarantee that a session can be shared between threads: in
+        # thread-safe mode each thread gets its own, using the same connection pool
+        self.thread_safe = thread_safe
+        self._local = threading.local() if thread_safe else None
+        self._thread_sessions = weakref.WeakSet()
+        self._thread_sessions_lock = threading.Lock()
+        # the refresher swaps the Authorization header in the background, ahead of the token expiry
+        self.token_refresher = None
+        if token_provider is not None:
+            self.token_refresher = TokenRefresher(token_provider, self._set_token,
+                                                  refresh_margin=token_refresh_margin)
+        # a number is the initial rate, a limiter can be shared between clients
+        if rate_limit is None or isinstance(rate_limit, AdaptiveRateLimiter):
+            self.rate_limiter = rate_limit
+        else:
+            self.rate_limiter = AdaptiveRateLimiter(rate=rate_limit, max_rate=max(rate_limit, 1000.0))
+        self.rate_limit_retries = rate_limit_retries
+        # opt-in cache of GET responses, True uses the default settings
+        self.cache = ResponseCache() if cache is True else cache
+
+    def __getstate__(self):
+        """Pickle without the locks and the sessions of the threads, i.e. for copy.deepcopy() of a model."""
+        state = dict(self.__dict__)
+        for attr in ('_session_lock', '_local', '_thread_sessions', '_thread_sessions_lock'):
+            del state[attr]
+        refresher = state.pop('token_refresher')
+        if refresher is not None:
+            # the copy refreshes its token with a thread of its own
+            state['_token_refresh'] = (refresher.token_provider, refresher.refresh_margin, refresher.retry_interval)
+        return state
+
+    def __setstate__(self, state):
+        token_refresh = state.pop('_token_refresh', None)
+        self.__dict__.update(state)
+        self._session_lock = threading.Lock()
+        self._local = threading.local() if self.thread_safe else None
+        self._thread_sessions = weakref.WeakSet()
+        self._thread_sessions_lock = threading.Lock()
+        self.token_refresher = None
+        if token_refresh is not None:
+            token_provider, refresh_margin, retry_interval = token_refresh
+            self.token_refresher = TokenRefresher(token_provider, self._set_token, refresh_margin=refresh_margin,
+                                                  retry_interval=retry_interval)
+
+    @property
+    def session(self):
+        """The requests session of the calling thread."""
+        if self._local is None:
+            return self._session
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self._thread_session()
+        return session
+
+    @session.setter
+    def session(self, session):
+        """Replace the requests session, the threads then copy the settings of the new one."""
+        self._session = session
+        if self._local is not None:
+            self._local = threading.local()
+        with self._thread_sessions_lock:
+            self._thread_sessions = weakref.WeakSet()
+
+    def _thread_session(self):
+        """Create the session of a thread, with the settings and the connection pool of the first one."""
+        session = requests.Session()
+        for attr in ('auth', 'proxies', 'verify', 'cert', 'trust_env', 'max_redirects'):
+            setattr(session, attr, getattr(self._session, attr))
+        session.headers = requests.structures.CaseInsensitiveDict(self._session.headers)
+        session.mount(self.host, self.adapter)
+        with self._thread_sessions_lock:
+            self._thread_sessions.add(session)
+        return session
+
+    def close(self):
+        """Stop the token refresh and close the pooled connections."""
+        if self.token_refresher is not None:
+            self.token_refresher.close()
+        with self._thread_sessions_lock:
+            sessions = [self._session] + list(self._thread_sessions)
+        for session in sessions:
+            session.close()
+
+    def pool_stats(self):
+        """Return the connection pool counters (created, reused, waits, discarded, evicted)."""
+        return self.adapter.stats.as_dict()
+
+    def set_header(self, name, value):
+        """Set a header sent with every request, i.e. a refreshed Authorization."""
+        with self._session_lock:
+            # copy-on-write, a template may be built from the headers at the same time
+            self.request_params['headers'] = dict(self.request_params['headers'], **{name: value})
+            self._header_templates = {}
+
+    def _set_token(self, token):
+        self.set_header('Authorization', generate_auth_header(oidc_token=token))
+
+    def _headers(self, content_type):
+        """Return the precomputed headers for a content type.
+
+        The returned dictionary is shared between requests and must not be
+        modified; per-request headers are merged into a copy instead.
+        """
+        headers = self._header_templates.get(content_type)
+        if headers is None:
+            # the headers, session and templates are swapped together under the lock: a
+            # template is built from one state and only kept by the templates of that state
+            with self._session_lock:
+                templates = self._header_templates
+                headers = templates.get(content_type)
+                if headers is None:
+                    headers = dict(self.request_params['headers'])
+                    headers['Content-type'] = content_type
+                    if self._session_id is not None:
+                        # the session cookie authenticates us, no need to bind again
+                        headers.pop('Authorization', None)
+                    templates[content_type] = headers
+        return headers
+
+    def _start_session(self):
+        """Switch to the session cookie once Atlas has set one."""
+        session_id = self.session.cookies.get(SESSION_COOKIE)
+        if session_id is not None:
+            with self._session_lock:
+                self._session_id = session_id
+                self._header_templates = {}
+            LOG.debug("Authenticated, reusing the %s cookie from now on", SESSION_COOKIE)
+
+    def _expire_session(self, session_id):
+        """Drop an expired session cookie, so the next request authenticates again.
+
+        Other threads may have hit the same 401 and already started a new
+        session, in which case there is nothing left to do.
+        """
+        with self._session_lock:
+            if self._session_id != session_id:
+                return
+            LOG.debug("The %s cookie was rejected, authenticating again", SESSION_COOKIE)
+            for cookie in list(self.session.cookies):
+                if cookie.name == SESSION_COOKIE:
+                    self.session.cookies.clear(cookie.domain, cookie.path, cookie.name)
+            self._session_id = None
+            self._header_templates = {}
+
+    def _request_params(self, content_type, kwargs):
+        headers = self._headers(content_type or 'application/json')
+        if kwargs.get('headers'):
+            # copy-on-write, the templates are shared between requests
+            headers = dict(headers, **kwargs['headers'])
+
+        params = dict(self.request_params)
+        params.update(kwargs)
+        params['headers'] = headers
+        session_id = self._session_id
+        if self._local is not None and session_id is not None and 'cookies' not in kwargs:
+            # the sessions of the threads have their own cookie jars, the session cookie is shared
+            params['cookies'] = {SESSION_COOKIE: session_id}
+
+        if 'data' in params:
+            params['data'] = codec.encode_body(params['data'], self.json_codec)
+        return params
+
+    def _reauthenticate(self, session_id, token):
+        """Renew the credentials rejected with a 401, return whether to retry."""
+        if session_id is not None:
+            # the session expired on the server, go back to the credentials
+            self._expire_session(session_id)
+            return True
+        if self.token_refresher is not None:
+            # the token was revoked or expired before its refresh was due,
+            # only the first thread to notice it fetches a new one
+            self.token_refresher.refresh(stale_token=token)
+            return True
+        return False
+
+    def _handle_response(self, response):
+        """Raise the exception matching an error response, and feed the rate limiter."""
+        try:
+            handle_response(response)
+        except (exceptions.RateLimitExceeded, exceptions.ServerUnavailable) as error:
+            if self.rate_limiter is not None:
+                self.rate_limiter.overloaded(error.retry_after)
+            raise
+        if self.rate_limiter is not None:
+            self.rate_limiter.success()
 
     def request(self, method, url, content_type=None, **kwargs):
-        # doing it this way keeps the magic for following redirects intact
-        requests_method = getattr(self.session, method)
-        params = copy.deepcopy(self.request_params)
-        params.update(kwargs)
+        # checked once, so that nothing is formatted when DEBUG is off
+        debug = LOG.isEnabledFor(logging.DEBUG)
+        cache = self.cache if method == 'get' else None
+        if cache is not None:
+            key = cache.key(method, url, kwargs.get('params'))
+            cached = cache.get(key)
+            if cached is not None:
+                if debug:
+                    LOG.debug("Using the cached response of %s %s", method, url)
+                return self._decode(method, url, cached[0], cached[1], debug)
+            generation = cache.generation
+
+        try:
+            response = self._send(method, url, content_type, kwargs, debug, reauthenticate=True,
+                                  overload_retries=self.rate_limit_retries)
+        finally:
+            if self.cache is not None and cache is None:
+                # the write may have changed what the cached responses describe
+                self.cache.invalidate_written(url)
+
+        if debug:
+            LOG.debug("Response headers: %s", response.headers)
+            if response.headers.get('content-length') is None:
+                # Log bad methods so we can report them
+                LOG.debug("Missing content-length for %s %s: %s", method,
+                          url, response.headers.get('content-type'))
 
-        if content_type is not None:
-            params['headers']['Content-type'] = content_type
-        else:
-            params['headers']['Content-type'] = 'application/json'
-        LOG.debug("Request headers: %s", params['headers'])
+        content = response.content
+        response_type = response.headers.get('content-type') or ''
+        if cache is not None and content:
+            cache.put(key, url, content, response_type, generation=generation)
+        return self._decode(method, url, content, response_type, debug)
 
-        if 'data' in params and isinstance(params['data'], dict):
-            params['data'] = json.dumps(params['data'], cls=AtlasJsonEncoder)
-            LOG.debug("Request body: %s", params['data'])
-        elif 'data' in params and isinstance(params['data'], str):
-            params['data'] = json.dumps(params['data'])
-        elif 'data' in params and isinstance(params['data'], list):
-            params['data'] = json.dumps(params['data'])
+    def _send(self, method, url, content_type, kwargs, debug, reauthenticate, overload_retries):
+        # doing it this way keeps the magic for following redirects intact
+        requests_method = getattr(self.session, method)
+        session_id = self._session_id
+        token = self.token_refresher.token if self.token_refresher is not None else None
+        params = self._request_params(content_type, kwargs)
 
-        LOG.debug(f"Requesting Atlas with the '{method}' method.")
-        if params.get('data'):
-            LOG.debug(f"With the following data: {params['data']}")
+        if debug:
+            LOG.debug("Requesting Atlas with the '%s' method, headers: %s", method, params['headers'])
+            if params.get('data'):
+                LOG.debug("With the following data: %s", params['data'])
 
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
         response = requests_method(url, **params)
 
         # any error responses will generate exceptions here
-        handle_response(response)
-
-        LOG.debug("Response headers: %s", response.headers)
-        if response.status_code != 204 and len(response.content):
-            LOG.debug("Response: %s", response.json())
-
-        if response.headers.get('content-length') is None:
-            # Log bad methods so we can report them
-            LOG.debug("Missing content-length for %s %s: %s", method,
-                      url, response.headers.get('content-type'))
-
+        try:
+            self._handle_response(response)
+        except exceptions.Unauthorized:
+            if not (reauthenticate and self._reauthenticate(session_id, token)):
+                raise
+            return self._send(method, url, content_type, kwargs, debug, False, overload_retries)
+        except (exceptions.RateLimitExceeded, exceptions.ServerUnavailable):
+            # Atlas rejected the request before handling it, the limiter
+            # holds it back for the Retry-After delay
+            if self.rate_limiter is None or overload_retries <= 0:
+                raise
+            return self._send(method, url, content_type, kwargs, debug, reauthenticate, overload_retries - 1)
+
+        if self.session_auth and session_id is None:
+            self._start_session()
+        return response
+
+    def _decode(self, method, url, content, response_type, debug):
         # there is no consistent way to determine response type
-        # so assume json if it's not an empty string
-        if response.text:
-            if response.headers.get('content-type') == 'application/x-ustar':
-                tarstream = io.BytesIO(response.content)
+        # so assume json if it's not an empty body
+        if content:
+            if response_type == 'application/x-ustar':
+                tarstream = io.BytesIO(content)
                 tarstream.seek(0)
                 return tarfile.open(fileobj=tarstream)
-            elif 'application/json' not in response.headers.get('content-type'):
+            elif debug and 'application/json' not in response_type:
                 # Log bad methods so we can report them
                 LOG.debug("Wrong response content-type for %s %s: %s", method,
-                          url, response.headers.get('content-type'))
-            return response.json()
+                          url, response_type)
+            # the body is parsed once, straight from bytes
+            data = self.json_codec.loads(content)
+            if debug:
+                LOG.debug("Response: %s", data)
+            return data
 
         return {}
 
+    def iter_items(self, method, url, prefix='entities.item', content_type=None, **kwargs):
+        """Yield the items found under `prefix` in a JSON response, as they are parsed.
+
+        The response is streamed off the socket and parsed incrementally, so
+        memory use is proportional to a single item rather than to the whole
+        body.  The prefix uses the ijson syntax, i.e. 'entities.item' yields the
+        elements of the top-level 'entities' list.  This requires ijson.
+        """
+        if ijson is None:
+            raise exceptions.ClientError(message="Incremental parsing requires ijson, "
+                                                 "install it with 'pip install pyatlasclient[stream]'")
+        requests_method = getattr(self.session, method)
+        params = self._request_params(content_type, kwargs)
+        params['stream'] = True
+
+        LOG.debug("Streaming the Atlas response of the '%s' method.", method)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        with requests_method(url, **params) as response:
+            # any error responses will generate exceptions here
+            self._handle_response(response)
+            if response.status_code == 204:
+                return
+            response.raw.decode_content = True
+            for item in ijson.items(response.raw, prefix, use_float=True):
+                yield item
+
     def __getattr__(self, attr):
         if getattr(requests, attr):
             return functools.partial(self.request, attr)
         raise AttributeError(attr)
 
 
+def generate_auth_header(username=None, password=None, oidc_token=None):
+    """Build the value of the Authorization header from the given credentials."""
+    if oidc_token:
+        return f'Bearer {oidc_token}'
+    elif username and password:
+        basic_token = utils.generate_http_basic_token(username=username, password=password)
+        return f'Basic {basic_token}'
+    raise BadHttpAuthArg
+
+
 class AtlasJsonEncoder(json.JSONEncoder):
     """Converts Atlas model objects into dictionaries that can be JSON-encoded
 
-    This allows for passing in models and ModelCollections into related objects'
-    create/update methods and having it handle the conversion automatically.
+    Kept for json.dumps(..., cls=AtlasJsonEncoder), the conversion is that of
+    codec.default(), which the client uses.
     """
 
     def default(self, obj):  # pylint: disable=method-hidden
-        if isinstance(obj, base.ModelCollection):
-            dicts = []
-            for model in obj:
-                dicts.append(model.to_json_dict())
-            return dicts
-        elif isinstance(obj, base.Model):
-            return obj.to_json_dict()
-        # Let the base class default method raise the TypeError
-        return super(AtlasJsonEncoder, self).default(obj)
+        return codec.default(obj)
@@ -0,0 +1,119 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Defines the JSON codecs used for request and response bodies.
+
+orjson or ujson are used when they are installed, since bulk and search
+responses can be several megabytes and the standard library json module is
+noticeably slower on those.  The standard library is the fallback.
+"""
+
+import json
+
+from atlasclient import base, exceptions
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def default(obj):
+    """Convert Atlas models and model collections into JSON-encodable values.
+
+    This allows for passing in models and ModelCollections into related objects'
+    create/update methods and having it handle the conversion automatically.
+    """
+    if isinstance(obj, base.ModelCollection):
+        return [model.to_json_dict() for model in obj]
+    elif isinstance(obj, base.Model):
+        return obj.to_json_dict()
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+class JsonCodec(object):
+    """Encodes and decodes JSON with the standard library."""
+    name = 'json'
+
+    def dumps(self, obj):
+        return json.dumps(obj, default=default)
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """Encodes and decodes JSON with orjson, straight from and to bytes."""
+    name = 'orjson'
+
+    def dumps(self, obj):
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+class UjsonCodec(JsonCodec):
+    """Encodes and decodes JSON with ujson."""
+    name = 'ujson'
+
+    def dumps(self, obj):
+        return ujson.dumps(obj, default=default)
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+
+CODECS = {'orjson': (OrjsonCodec, orjson),
+          'ujson': (UjsonCodec, ujson),
+          'json': (JsonCodec, json),
+          }
+
+
+def get_codec(codec=None):
+    """Return a codec instance.
+
+    `codec` can be None, to pick the fastest installed library, the name of a
+    codec ('orjson', 'ujson' or 'json'), or any object with dumps() and
+    loads() methods, which is returned as-is.
+    """
+    if codec is None:
+        for codec_class, library in CODECS.values():
+            if library is not None:
+                return codec_class()
+
+    if isinstance(codec, str):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown JSON codec '{codec}', use one of {', '.join(CODECS)}")
+        codec_class, library = CODECS[codec]
+        if library is None:
+            raise exceptions.ClientError(message=f"The JSON codec '{codec}' is not installed")
+        return codec_class()
+
+    return codec
+
+
+def encode_body(data, json_codec):
+    """Serialize a request body to the JSON Atlas expects.
+
+    Dictionaries, lists and plain strings are encoded with the given codec.
+    Pre-encoded bytes, and anything else, are passed through untouched.
+    """
+    if isinstance(data, (dict, list, str)):
+        return json_codec.dumps(data)
+    return data
@@ -1,8 +1,124 @@
-from dataclasses import asdict
-from typing import Optional, Dict, Any
+import collections.abc
+import copy
+import dataclasses
+from typing import Optional, Dict, Any, Union
 
 from pydantic.dataclasses import dataclass
 
+# how to build the fields of each data class without validation, see construct()
+_CONSTRUCTION_PLANS = {}
+# the field names of each data class, in order, see serialize()
+_FIELD_NAMES = {}
+# values which are serialized as they are
+_ATOMIC_TYPES = frozenset([str, int, float, bool, type(None)])
+
+
+def construct(data_class, data):
+    """Build a data class instance from trusted data, i.e. a response of the Atlas server.
+
+    Unlike calling the data class, nothing is validated nor coerced: the
+    values are used as they are, except for the dictionaries and lists of
+    dictionaries which become the nested data classes declared by the
+    fields.  Missing fields get their defaults and unknown keys are ignored.
+    """
+    plan = _CONSTRUCTION_PLANS.get(data_class)
+    if plan is None:
+        plan = _CONSTRUCTION_PLANS[data_class] = _construction_plan(data_class)
+    values = {}
+    for name, default, default_factory, converter in plan:
+        if name in data:
+            value = data[name]
+            if converter is not None and value is not None:
+                value = converter(value)
+        elif default_factory is not None:
+            value = default_factory()
+        else:
+            value = default
+        values[name] = value
+    instance = data_class.__new__(data_class)
+    # what the pydantic __post_init__ leaves behind after validating
+    object.__setattr__(instance, '__dict__', values)
+    object.__setattr__(instance, '__initialised__', True)
+    return instance
+
+
+def _construction_plan(data_class):
+    plan = []
+    for field in dataclasses.fields(data_class):
+        default = None if field.default is dataclasses.MISSING else field.default
+        default_factory = None if field.default_factory is dataclasses.MISSING else field.default_factory
+        plan.append((field.name, default, default_factory, _converter(field.type)))
+    return tuple(plan)
+
+
+def _converter(field_type):
+    """Return a function building the nested data classes of a field type, or None if there are none."""
+    origin = getattr(field_type, '__origin__', None)
+    args = getattr(field_type, '__args__', None) or ()
+    if origin is Union:
+        types = [arg for arg in args if arg is not type(None)]
+        return _converter(types[0]) if len(types) == 1 else None
+    if dataclasses.is_dataclass(field_type):
+        return lambda value: construct(field_type, value) if isinstance(value, dict) else value
+    if origin is list and args:
+        item = _converter(args[0])
+        if item is not None:
+            return lambda value: [item(x) if x is not None else x for x in value] if isinstance(value, list) else value
+    if origin in (dict, collections.abc.Mapping) and len(args) == 2:
+        item = _converter(args[1])
+        if item is not None:
+            return lambda value: ({key: item(x) if x is not None else x for key, x in value.items()}
+                                  if isinstance(value, dict) else value)
+    return None
+
+
+def serialize(instance, ignore_falsy=False):
+    """Convert a data class instance into a dictionary, in a single pass.
+
+    The result is the one of dataclasses.asdict(): nested data classes become
+    dictionaries, and the dictionaries, lists and tuples are copies.  With
+    ignore_falsy, the falsy values of the data classes and of their nested
+    dictionaries are dropped, except for dictionaries; those of lists are kept.
+    """
+    return _serialize_items(_items(instance), ignore_falsy)
+
+
+def _items(instance):
+    cls = instance.__class__
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = _FIELD_NAMES[cls] = tuple(field.name for field in dataclasses.fields(cls))
+    values = instance.__dict__
+    return [(name, values[name]) for name in names]
+
+
+def _serialize_items(items, ignore_falsy):
+    data = {}
+    for key, value in items:
+        if value.__class__ not in _ATOMIC_TYPES:
+            value = _serialize(value, ignore_falsy)
+            if isinstance(value, dict):
+                data[key] = value
+                continue
+        if value or not ignore_falsy:
+            data[key] = value
+    return data
+
+
+def _serialize(value, ignore_falsy):
+    cls = value.__class__
+    if cls in _ATOMIC_TYPES:
+        return value
+    if cls in _FIELD_NAMES or dataclasses.is_dataclass(cls):
+        return _serialize_items(_items(value), ignore_falsy)
+    if isinstance(value, dict):
+        return _serialize_items(value.items(), ignore_falsy)
+    if isinstance(value, list):
+        return [_serialize(item, False) for item in value]
+    if isinstance(value, tuple) and not hasattr(value, '_fields'):
+        return tuple(_serialize(item, False) for item in value)
+    return copy.deepcopy(value)
+
 
 class Status:
     ACTIVE = "ACTIVE"
@@ -17,18 +133,8 @@ class AtlasBaseModelObject:
     """
     guid: Optional[str] = None
 
-    def _to_dict(self, data_dict, _ignore_falsy):
-        _data = dict()
-        for key, value in data_dict.items():
-            if isinstance(value, dict):
-                _data.update({key: self._to_dict(value, _ignore_falsy)})
-            elif not _ignore_falsy or (_ignore_falsy and value):
-                _data.update({key: value})
-        return _data
-
     def to_dict(self, data_key: str = None, ignore_falsy: str = False) -> Dict[str, Any]:
-        data_dict = asdict(self)
-        items = self._to_dict(data_dict, ignore_falsy)
+        items = serialize(self, ignore_falsy)
 
         if data_key:
             items = {data_key: items}
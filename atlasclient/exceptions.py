@@ -195,17 +195,32 @@ def handle_response(response):
     if response.status_code < 400:
         return
 
-    cls = _status_to_exception_type.get(response.status_code, HttpError)
+    raise_for_status(response.status_code, method=response.request.method,
+                     url=response.request.url, details=response.text,
+                     headers=response.headers)
+
+
+def raise_for_status(status_code, method=None, url=None, details=None, headers=None):
+    """
+    Throw the exception matching an HTTP status code, if applicable.
+
+    This is the transport-agnostic half of handle_response(), so that clients
+    which are not built on requests can map errors the same way.
+    """
+    if status_code < 400:
+        return
+
+    cls = _status_to_exception_type.get(status_code, HttpError)
 
     kwargs = {
-        'code': response.status_code,
-        'method': response.request.method,
-        'url': response.request.url,
-        'details': response.text,
+        'code': status_code,
+        'method': method,
+        'url': url,
+        'details': details,
     }
 
-    if response.headers and 'retry-after' in response.headers:
-        kwargs['retry_after'] = response.headers.get('retry-after')
+    if headers and 'retry-after' in headers:
+        kwargs['retry_after'] = headers.get('retry-after')
 
     raise cls(**kwargs)
 
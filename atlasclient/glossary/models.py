@@ -2,7 +2,6 @@ import logging
 
 from atlasclient import base, events
 from atlasclient.data_types import AtlasRelatedCategoryHeader, AtlasRelatedTermHeader, AtlasRelatedObjectId
-from atlasclient.events import keep_path_and_url
 from atlasclient.glossary.data_types import (AtlasGlossary, AtlasGlossaryCategory,
                                              AtlasGlossaryTerm, AtlasGlossaryExtInfo)
 
@@ -13,48 +12,36 @@ BASE_URL_GLOSSARY = "glossary"
 
 class GlossaryCollection(base.QueryableModelCollection):
     @events.evented
-    @keep_path_and_url
     def fetch_categories(self, glossary_guid):
         """
         GET /v2/glossary/{glossaryGuid}/categories: Get the categories belonging to a specific glossary
         """
-        self.model_class.path = f'{BASE_URL_GLOSSARY}/{glossary_guid}/categories'
-        self.model_class.data_class = AtlasGlossaryCategory
-        self.inflate()
-        return self
+        path = f'{BASE_URL_GLOSSARY}/{glossary_guid}/categories'
+        return self._endpoint(path, AtlasGlossaryCategory).inflate()
 
     @events.evented
-    @keep_path_and_url
     def fetch_categories_headers(self, glossary_guid):
         """
         GET /v2/glossary/{glossaryGuid}/categories/headers: Get the categories headers belonging to a specific glossary
         """
-        self.model_class.path = f'{BASE_URL_GLOSSARY}/{glossary_guid}/categories/headers'
-        self.model_class.data_class = AtlasRelatedCategoryHeader
-        self.inflate()
-        return self
+        path = f'{BASE_URL_GLOSSARY}/{glossary_guid}/categories/headers'
+        return self._endpoint(path, AtlasRelatedCategoryHeader).inflate()
 
     @events.evented
-    @keep_path_and_url
     def fetch_terms(self, glossary_guid):
         """
         GET /v2/glossary/{glossaryGuid}/terms: Get terms belonging to a specific glossary
         """
-        self.model_class.path = f'{BASE_URL_GLOSSARY}/{glossary_guid}/terms'
-        self.model_class.data_class = AtlasGlossaryTerm
-        self.inflate()
-        return self
+        path = f'{BASE_URL_GLOSSARY}/{glossary_guid}/terms'
+        return self._endpoint(path, AtlasGlossaryTerm).inflate()
 
     @events.evented
-    @keep_path_and_url
     def fetch_terms_headers(self, glossary_guid):
         """
         GET /v2/glossary/{glossaryGuid}/terms/headers: Get the terms headers belonging to a specific glossary
         """
-        self.model_class.path = f'{BASE_URL_GLOSSARY}/{glossary_guid}/terms/headers'
-        self.model_class.data_class = AtlasRelatedTermHeader
-        self.inflate()
-        return self
+        path = f'{BASE_URL_GLOSSARY}/{glossary_guid}/terms/headers'
+        return self._endpoint(path, AtlasRelatedTermHeader).inflate()
 
 
 class Glossary(base.QueryableModelV2):
@@ -72,48 +59,39 @@ class Glossary(base.QueryableModelV2):
     primary_key = 'guid'
 
     @events.evented
-    @keep_path_and_url
     def detailed(self):
         """
         GET /v2/glossary/{glossaryGuid}/detailed: Get a specific Glossary
         """
-        self.url = f'{self.parent.url}/{self.primary_key_value}/detailed'
+        response = self.client.get(f'{self.parent.url}/{self.primary_key_value}/detailed')
         self.data_class = AtlasGlossaryExtInfo
-        self.inflate()
+        self.load(response)
+        self._is_inflated = True
         return self
 
-    @events.evented
-    @keep_path_and_url
-    def partial_update(self, **kwargs):
+    def _partial_url(self):
         """
         PUT /v2/glossary/{glossaryGuid}/partial: Partially update the glossary
         """
-        self.url = f'{self.parent.url}/{self.primary_key_value}/partial'
-        return super(Glossary, self).partial_update(**kwargs)
+        return f'{self.parent.url}/{self.primary_key_value}/partial'
 
 
 class GlossaryCategoryCollection(base.QueryableModelCollection):
     @events.evented
-    @keep_path_and_url
     def fetch_related(self, category_guid):
         """
         GET /v2/glossary/category/{categoryGuid}/related: Get all related categories (parent and children)
         """
-        self.model_class.path = f'{BASE_URL_GLOSSARY}/category/{category_guid}/related'
-        self.model_class.data_class = AtlasRelatedCategoryHeader
-        self.inflate()
-        return self
+        path = f'{BASE_URL_GLOSSARY}/category/{category_guid}/related'
+        return self._endpoint(path, AtlasRelatedCategoryHeader).inflate()
 
     @events.evented
-    @keep_path_and_url
     def fetch_terms(self, category_guid):
         """
         GET /v2/glossary/category/{categoryGuid}/terms: Get all terms associated with the specific category
         """
-        self.model_class.path = f'{BASE_URL_GLOSSARY}/category/{category_guid}/terms'
-        self.model_class.data_class = AtlasRelatedTermHeader
-        self.inflate()
-        return self
+        path = f'{BASE_URL_GLOSSARY}/category/{category_guid}/terms'
+        return self._endpoint(path, AtlasRelatedTermHeader).inflate()
 
 
 class GlossaryCategory(base.QueryableModelV2):
@@ -128,14 +106,11 @@ class GlossaryCategory(base.QueryableModelV2):
     path = f'{BASE_URL_GLOSSARY}/category'
     primary_key = 'guid'
 
-    @events.evented
-    @keep_path_and_url
-    def partial_update(self, **kwargs):
+    def _partial_url(self):
         """
         PUT /v2/glossary/category/{categoryGuid}/partial: Partially update the glossary category
         """
-        self.url = f'{self.parent.url}/{self.primary_key_value}/partial'
-        return super(GlossaryCategory, self).partial_update(**kwargs)
+        return f'{self.parent.url}/{self.primary_key_value}/partial'
 
 
 class GlossaryCategories(base.QueryableModelV2):
@@ -150,15 +125,12 @@ class GlossaryCategories(base.QueryableModelV2):
 
 class GlossaryTermCollection(base.QueryableModelCollection):
     @events.evented
-    @keep_path_and_url
     def fetch_related(self, term_guid):
         """
         GET /v2/glossary/terms/{termGuid}/related: Get all related terms for a specific term
         """
-        self.model_class.path = f'{BASE_URL_GLOSSARY}/terms/{term_guid}/related'
-        self.model_class.data_class = AtlasRelatedTermHeader
-        self.inflate()
-        return self
+        path = f'{BASE_URL_GLOSSARY}/terms/{term_guid}/related'
+        return self._endpoint(path, AtlasRelatedTermHeader).inflate()
 
 
 class GlossaryTerm(base.QueryableModelV2):
@@ -176,58 +148,46 @@ class GlossaryTerm(base.QueryableModelV2):
     path = f'{BASE_URL_GLOSSARY}/term'
     primary_key = 'guid'
 
-    @events.evented
-    @keep_path_and_url
-    def partial_update(self, **kwargs):
+    def _partial_url(self):
         """
         PUT /v2/glossary/term/{termGuid}/partial: Partially update the glossary term
         """
-        self.url = f'{self.parent.url}/{self.primary_key_value}/partial'
-        return super(GlossaryTerm, self).partial_update(**kwargs)
+        return f'{self.parent.url}/{self.primary_key_value}/partial'
 
 
 class GlossaryTermsCollection(base.QueryableModelCollectionBulk):
 
     @events.evented
-    @keep_path_and_url
     def fetch_assigned_entities(self, term_guid):
         """
         GET /v2/glossary/terms/{termGuid}/assignedEntities: Get all entity headers assigned with the specified term
         """
-        self.model_class.path = f'{BASE_URL_GLOSSARY}/terms/{term_guid}/assignedEntities'
-        self.model_class.data_class = AtlasRelatedObjectId
-        self.inflate()
-        return self
+        path = f'{BASE_URL_GLOSSARY}/terms/{term_guid}/assignedEntities'
+        return self._endpoint(path, AtlasRelatedObjectId).inflate()
 
     @events.evented
-    @keep_path_and_url
     def assign_entities(self, term_guid, data):
         """
         POST /v2/glossary/terms/{termGuid}/assignedEntities: Assign the given term to the provided list of entity headers
         """
-        self.model_class.path = f'{BASE_URL_GLOSSARY}/terms/{term_guid}/assignedEntities'
-        self.model_class.data_class = AtlasRelatedObjectId
-        return self.create(data)
+        path = f'{BASE_URL_GLOSSARY}/terms/{term_guid}/assignedEntities'
+        return self._endpoint(path, AtlasRelatedObjectId).create(data)
 
     @events.evented
-    @keep_path_and_url
     def delete_assigned_entities(self, term_guid, data):
         """
         DELETE /v2/glossary/terms/{termGuid}/assignedEntities: Remove the term assignment for the given list of entity headers
         """
-        self.model_class.path = f'{BASE_URL_GLOSSARY}/terms/{term_guid}/assignedEntities'
-        self.model_class.data_class = AtlasRelatedObjectId
-        return self.delete(data=data)
+        path = f'{BASE_URL_GLOSSARY}/terms/{term_guid}/assignedEntities'
+        return self._endpoint(path, AtlasRelatedObjectId).delete(data=data)
 
     @events.evented
-    @keep_path_and_url
     def update_assigned_entities(self, term_guid, data):
         """
         PUT /v2/glossary/terms/{termGuid}/assignedEntities: Updates the term assignment for the given list of entity headers
         """
-        self.model_class.path = f'{BASE_URL_GLOSSARY}/terms/{term_guid}/assignedEntities'
-        self.model_class.data_class = AtlasRelatedObjectId
-        return self.update(data=data)
+        path = f'{BASE_URL_GLOSSARY}/terms/{term_guid}/assignedEntities'
+        return self._endpoint(path, AtlasRelatedObjectId).update(data=data)
 
 
 class GlossaryTerms(base.QueryableModelV2):
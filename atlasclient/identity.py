@@ -0,0 +1,85 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+An identity map, so that each GUID is represented by a single model.
+
+Without it, every search result, bulk fetch or relationship expansion
+returning an entity creates a new model object with its own copy of the
+data, and each copy inflates separately.  With it, the models of a client
+are looked up by class and GUID: the first one becomes canonical, and the
+fields loaded later for the same GUID are merged into it.
+
+Models are only referenced weakly, they leave the map as soon as the
+application drops them.
+"""
+
+import threading
+import weakref
+
+
+def merge_data(data, new_data):
+    """Merge newly loaded fields into the data of a model.
+
+    Nested dictionaries such as 'attributes' are merged one level deep, as
+    a partial result (i.e. a search returning a few attributes) must not
+    hide the attributes loaded before.  They are copied, never modified in
+    place, since they belong to the response they came from.
+    """
+    for key, value in new_data.items():
+        current = data.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            merged = dict(current)
+            merged.update(value)
+            value = merged
+        data[key] = value
+
+
+class IdentityMap(object):
+    """A thread-safe map from (model class, GUID) to the canonical model."""
+
+    def __init__(self):
+        self._models = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        # a copy starts empty, the models it gets copied with are not canonical in it
+        return self.__class__, ()
+
+    def __len__(self):
+        return len(self._models)
+
+    def get(self, model_class, guid):
+        return self._models.get((model_class, guid))
+
+    def model(self, model_class, parent, data=None, **kwargs):
+        """Return the canonical model for the data, creating it or merging the data into it.
+
+        Models without a GUID are always created anew.
+        """
+        guid = data.get('guid') if data and (model_class.primary_key or 'guid') == 'guid' else None
+        if guid is None:
+            return model_class(parent, data=data, **kwargs)
+
+        with self._lock:
+            model = self._models.get((model_class, guid))
+            if model is None:
+                model = model_class(parent, data=data, **kwargs)
+                self._models[(model_class, guid)] = model
+            else:
+                fields = model.fields
+                merge_data(model._data, {field: value for field, value in data.items() if field in fields})
+        return model
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
@@ -13,39 +13,52 @@
 """
 Defines all the model classes for the various parts of the API.
 """
+import collections
 import json
 import logging
+from concurrent import futures
 
 import itertools
 import six
 
-from atlasclient import base, exceptions, events
+from atlasclient import base, exceptions, events, utils
+from atlasclient.bulk import EntityBulkWriter
+from atlasclient.typeregistry import TypeRegistry
 
 LOG = logging.getLogger('pyatlasclient')
 
 
 class EntityCollection(base.DependentModelCollection):
+    """The entities of a response, as a lazy sequence over the raw list.
+
+    Entity models are only built when accessed, by index, slice or
+    iteration, so reading len() or a few entities of a large search page
+    does not allocate a model per entity.
+    """
+
     def __init__(self, client, model_class, parent=None):
-        LOG.debug(f"Generating the EntityCollection Model with following entities: "
-                  f"{parent._data.get('entities') if parent else None}")
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("Generating the EntityCollection Model with following entities: %s",
+                      parent._data.get('entities') if parent else None)
         self.client = client
         self.model_class = model_class
         self.parent = parent
         self._is_inflated = True
-        self._models = []
-        for entity in self.parent._data.get('entities') or []:
-            model = self.model_class(self, data=entity)
-            self._models.append(model)
+        self._models = base.LazyModelList(self.parent._data.get('entities') or [], self._model)
         self._iter_marker = 0
 
     def __call__(self, *args):
         self._is_inflated = True
-        self._models = []
-        for entity in self.parent._data.get('entities') or []:
-            model = self.model_class(self, data=entity)
-            self._models.append(model)
+        self._models = base.LazyModelList(self.parent._data.get('entities') or [], self._model)
         return self
 
+    def __getitem__(self, index):
+        return self._models[index]
+
+    def guids(self):
+        """The GUIDs of the entities, read from the raw data without building any model."""
+        return [entity.get('guid') for entity in self.parent._data.get('entities') or []]
+
 
 class Entity(base.DependentModel):
     collection_class = EntityCollection
@@ -75,7 +88,7 @@ class EntityPostCollection(base.QueryableModelCollection):
         """
         Update a resource by passing in modifications via keyword arguments.
         """
-        LOG.debug(f"Trying to create {self.__class__.__name__} with the data {data}")
+        LOG.debug("Trying to create %s with the data %s", self.__class__.__name__, data)
         return self.client.post(self.url, data=data)
 
 
@@ -144,7 +157,7 @@ class Classification(base.QueryableModel):
         if self.primary_key in kwargs:
             del kwargs[self.primary_key]
         data = self._generate_input_dict(**kwargs)
-        LOG.debug(f"Trying to create {self.__class__.__name__} with the data {data}")
+        LOG.debug("Trying to create %s with the data %s", self.__class__.__name__, data)
         self.load(self.client.post('/'.join(self.url.split('/')[:-1]) + 's', data=data))
         return self
 
@@ -154,7 +167,7 @@ class Classification(base.QueryableModel):
         Update a resource by passing in modifications via keyword arguments.
         """
         data = self._generate_input_dict(**kwargs)
-        LOG.debug(f"Trying to update {self.__class__.__name__} with the data {data}")
+        LOG.debug("Trying to update %s with the data %s", self.__class__.__name__, data)
         self.load(self.client.put('/'.join(self.url.split('/')[:-1]) + 's', data=data))
         return self
 
@@ -188,7 +201,7 @@ class EntityGuidClassificationCollection(base.QueryableModelCollection):
                 for field in classification_item.fields:
                     class_item_dict[field] = getattr(classification_item, field)
                 data.append(class_item_dict)
-        LOG.debug(f"Trying to update {self.__class__.__name__} with the data {data}")
+        LOG.debug("Trying to update %s with the data %s", self.__class__.__name__, data)
         self.load(self.client.put(self.url, data=data))
         return self
 
@@ -196,7 +209,7 @@ class EntityGuidClassificationCollection(base.QueryableModelCollection):
         """ 
         Create classifitions for specific entity
         """
-        LOG.debug(f"Trying to create {self.__class__.__name__} with the data {data}")
+        LOG.debug("Trying to create %s with the data %s", self.__class__.__name__, data)
         return self.client.post(self.url, data=data)
 
 
@@ -208,7 +221,119 @@ class EntityGuidClassification(base.QueryableModel):
     collection_class = EntityGuidClassificationCollection
 
 
+def _parallel_map(function, items, max_workers):
+    """Return [function(item) for item in items], computed by up to max_workers threads."""
+    if len(items) <= 1 or max_workers <= 1:
+        return [function(item) for item in items]
+    with futures.ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(function, items))
+
+
+# the result of EntityGuidCollection.fetch_many()
+FetchedEntities = collections.namedtuple('FetchedEntities', ['entities', 'not_found'])
+
+
+class EntityGuidCollection(base.QueryableModelCollection):
+
+    def __call__(self, *args, **kwargs):
+        result = super(EntityGuidCollection, self).__call__(*args, **kwargs)
+        if isinstance(result, EntityGuid) and not result._is_inflated:
+            batcher = self.client.batcher()
+            guid = result.guid_from_url()
+            if batcher is not None and batcher.scoped and guid is not None:
+                # fetched along with the first entity inflated, even after the end of the batch block
+                result._batcher = batcher
+                batcher.defer(guid)
+        return result
+
+    def fetch_many(self, guids, max_workers=None, chunk_size=100, max_url_length=4096, **params):
+        """Fetch many entities by GUID, several requests at a time.
+
+        The GUIDs are fetched from entity/bulk, in chunks of at most chunk_size
+        GUIDs with URLs of at most max_url_length characters, by max_workers
+        threads: by default 4 with a client created with thread_safe=True, and
+        a single one otherwise.  As Atlas fails
+        a whole bulk request when one of its GUIDs does not exist, the GUIDs
+        of a failed or incomplete chunk are then fetched one by one.  The
+        referredEntities of a model fetched in bulk are those of its chunk.
+
+            client = Atlas(host, username='admin', password='admin', thread_safe=True)
+            entities, not_found = client.entity_guid.fetch_many(guids, max_workers=8)
+
+        :param params: the parameters of both endpoints, i.e. minExtInfo or ignoreRelationships.
+        :return: FetchedEntities, with the EntityGuid models in the order of guids (None for the
+            entities not found) and the GUIDs which were not found.
+        """
+        unique = list(dict.fromkeys(guids))
+        responses = self._fetch_responses(unique, max_workers=max_workers, chunk_size=chunk_size,
+                                          max_url_length=max_url_length, params=params)
+        return self._fetched(guids, responses)
+
+    def _fetch_responses(self, guids, max_workers=None, chunk_size=100, max_url_length=4096, params=None):
+        """Return the entity/guid responses of the GUIDs which exist, by GUID, see fetch_many()."""
+        max_workers = utils.worker_count(self.client, max_workers)
+        params = params or {}
+        responses = {}
+        if len(guids) == 1:
+            # a single GUID does not need the bulk endpoint
+            remaining = list(guids)
+        else:
+            bulk_url, chunks = self._bulk_chunks(guids, chunk_size, max_url_length)
+            remaining = []
+            for chunk, response in zip(chunks, _parallel_map(
+                    lambda chunk: self._fetch_chunk(bulk_url, chunk, params), chunks, max_workers)):
+                remaining.extend(self._add_bulk_response(responses, chunk, response))
+        for guid, response in zip(remaining, _parallel_map(
+                lambda guid: self._fetch_one(guid, params), remaining, max_workers)):
+            if response is not None:
+                responses[guid] = response
+        return responses
+
+    def _bulk_chunks(self, guids, chunk_size, max_url_length):
+        """Return the entity/bulk URL and the chunks of guids fitting into it."""
+        bulk_url = self.client.entity_bulk.url
+        chunks = list(utils.chunk_query_values(guids, 'guid', max_url_length - len(bulk_url) - 1,
+                                               max_count=chunk_size))
+        LOG.debug("Fetching %s entities in %s chunks", len(guids), len(chunks))
+        return bulk_url, chunks
+
+    @staticmethod
+    def _add_bulk_response(responses, chunk, response):
+        """Add the entities of the entity/bulk response of a chunk, return the GUIDs left to fetch one by one."""
+        if response is None:
+            return chunk
+        referred_entities = response.get('referredEntities') or {}
+        for entity in response.get('entities') or ():
+            responses[entity['guid']] = {'entity': entity, 'referredEntities': referred_entities}
+        return [guid for guid in chunk if guid not in responses]
+
+    def _fetched(self, guids, responses):
+        """Return the FetchedEntities of fetch_many() from the responses by GUID."""
+        models = {}
+        for guid, response in responses.items():
+            model = self._model({self.model_class.primary_key: guid}, href='/'.join([self.url, guid]))
+            model.load(response)
+            model._is_inflated = True
+            models[guid] = model
+        return FetchedEntities([models.get(guid) for guid in guids],
+                               [guid for guid in dict.fromkeys(guids) if guid not in models])
+
+    def _fetch_chunk(self, url, guids, params):
+        """Return the entity/bulk response for guids, or None if one of them does not exist."""
+        try:
+            return self.client.get(url, params=dict(params, guid=guids))
+        except exceptions.NotFound:
+            return None
+
+    def _fetch_one(self, guid, params):
+        try:
+            return self.client.get('/'.join([self.url, guid]), params=params)
+        except exceptions.NotFound:
+            return None
+
+
 class EntityGuid(base.QueryableModel):
+    collection_class = EntityGuidCollection
     path = 'entity/guid'
     data_key = 'entity_guid'
     primary_key = 'guid'
@@ -219,14 +344,37 @@ class EntityGuid(base.QueryableModel):
     def _generate_input_dict(self, **kwargs):
         return self._data
 
+    def guid_from_url(self):
+        """Return the GUID of the model, which is only kept in its URL, None for another URL."""
+        prefix = self.client.entity_guid.url + '/'
+        url = self._url or self._href
+        if url and url.startswith(prefix) and '/' not in url[len(prefix):]:
+            return url[len(prefix):]
+        return None
+
+    def _inflate(self, url=None):
+        batcher = self.__dict__.get('_batcher') or self.client.batcher()
+        guid = self.guid_from_url() if batcher is not None and url is None else None
+        if guid is None:
+            return super(EntityGuid, self)._inflate(url)
+        try:
+            response = batcher.load(guid)
+        except Exception:
+            LOG.debug("Batch fetch failed, inflating the entity %s on its own", guid)
+            return super(EntityGuid, self)._inflate(url)
+        if response is not None:
+            self.load(response)
+        # as for a single request, an entity not found is left with the data it has
+        self._is_inflated = True
+
     def update(self, attribute):
         if attribute not in self.entity['attributes']:
             raise exceptions.BadRequest(method=self.update,
                                         details='The attribute {} does not exist for {}'.format(attribute,
                                                                                                 self.entity[
                                                                                                     'typeName']))
-        LOG.debug(f"Trying to update the attribute '{attribute}' of {self.entity['typeName']} "
-                  f"with the value {self.entity['attributes'][attribute]}")
+        LOG.debug("Trying to update the attribute '%s' of %s with the value %s",
+                  attribute, self.entity['typeName'], self.entity['attributes'][attribute])
         self.load(self.client.put(self.url + '?name={}'.format(attribute),
                                   data=self.entity['attributes'][attribute]))
         return self._data
@@ -276,16 +424,41 @@ class EntityBulkCollection(base.QueryableModelCollection):
         """
         Create classifitions for specific entity
         """
-        LOG.debug(f"Trying to create {self.__class__.__name__} with the data {data}")
+        LOG.debug("Trying to create %s with the data %s", self.__class__.__name__, data)
         self.client.post(self.url, data=data)
 
     def delete(self, guid):
         """
         Delete guid
         """
-        LOG.debug(f"Trying to delete {self.__class__.__name__} with the GUID {guid}")
+        LOG.debug("Trying to delete %s with the GUID %s", self.__class__.__name__, guid)
         return self.client.delete(self.url, params={'guid': guid})
 
+    def write(self, entities, **kwargs):
+        """Create or update any number of entities, in chunks sent concurrently.
+
+            result = client.entity_bulk.write(iter_entities(), max_workers=8)
+            print(result.guidAssignments)
+
+        :param kwargs: the parameters of EntityBulkWriter, i.e. max_entities or max_bytes.
+        :return: the BulkWriteResult merging the responses.
+        """
+        return EntityBulkWriter(self.client, **kwargs).write(entities)
+
+    def iter_entities(self):
+        """Yield the fetched entities one by one, as they are read off the socket.
+
+        Unlike iterating over the collection, the response is never held in
+        memory as a whole, which matters for bulk GETs of many large entities.
+        Requires ijson.
+
+            for entity in client.entity_bulk(guid=guids).iter_entities():
+                print(entity.typeName)
+        """
+        self._prepare_filter()
+        for item in self.client.iter_items('get', self.url, prefix='entities.item', params=self._filter):
+            yield self._model(item, model_class=Entity)
+
 
 class EntityBulk(base.QueryableModel):
     collection_class = EntityBulkCollection
@@ -307,7 +480,7 @@ class EntityBulkClassification(base.QueryableModel):
         """
         Create classifitions for specific entity
         """
-        LOG.debug(f"Trying to create {self.__class__.__name__} with the data {data}")
+        LOG.debug("Trying to create %s with the data %s", self.__class__.__name__, data)
         self.client.post(self.url, data=data)
 
 
@@ -453,27 +626,47 @@ class TypeDefHeader(base.QueryableModel):
 
 
 class TypeDefs(base.QueryableModelCollection):
+    def inflate(self):
+        """Load all the type definitions, from the persistent typedef cache if there is one."""
+        typedef_cache = getattr(self.client, 'typedef_cache', None)
+        if typedef_cache is None or self._filter or self._is_inflated:
+            return super(TypeDefs, self).inflate()
+        with self._lock:
+            if not self._is_inflated:
+                self.check_version()
+                self.load(typedef_cache.load(self.client))
+                self._is_inflated = True
+        return self
+
     def load(self, response):
         model = self.model_class(self, href=self.url)
         model.load(response)
         self._models.append(model)
 
+    def _invalidate_typedef_cache(self):
+        typedef_cache = getattr(self.client, 'typedef_cache', None)
+        if typedef_cache is not None:
+            typedef_cache.invalidate(self.client.base_url)
+
     @events.evented
     def create(self, data, **kwargs):
-        LOG.debug(f"Trying to create entity definitions with the data {data}")
+        LOG.debug("Trying to create entity definitions with the data %s", data)
         self.client.post(self.url, data=data)
+        self._invalidate_typedef_cache()
         return self
 
     @events.evented
     def update(self, data, **kwargs):
-        LOG.debug(f"Trying to update entity definitions with the data {data}")
+        LOG.debug("Trying to update entity definitions with the data %s", data)
         self.client.put(self.url, data=data)
+        self._invalidate_typedef_cache()
         return self
 
     @events.evented
     def delete(self, data, **kwargs):
-        LOG.debug(f"Trying to delete entity definitions with the data {data}")
+        LOG.debug("Trying to delete entity definitions with the data %s", data)
         self.client.delete(self.url, data=data)
+        self._invalidate_typedef_cache()
         return self
 
 
@@ -488,16 +681,27 @@ class TypeDef(base.QueryableModel):
                      'classificationDefs': ClassificationDef,
                      'entityDefs': EntityDef, }
 
+    _registry = None
+
     def load(self, response):
         self._data.update(response)
+        self._registry = None
         for rel in [x for x in response if x in self.relationships]:
             rel_class = self.relationships[rel]
             collection = rel_class.collection_class(self.client, rel_class, parent=self)
             self._relationship_cache[rel] = collection(response[rel])
 
+    @property
+    def registry(self):
+        """An index of these type definitions, see TypeRegistry."""
+        if self._registry is None:
+            self._registry = TypeRegistry(self._data)
+        return self._registry
+
     def delete(self):
         self.client.delete(self.url, data=self._data)
         self._data = {}
+        self._registry = None
         return self
 
 
@@ -723,7 +927,7 @@ class RelationshipGuid(base.QueryableModel):
         """
         data = self._generate_input_dict(**kwargs)
         url = self.parent.url + '/relationship'
-        LOG.debug(f"Trying to update relationship  with the data {data}")
+        LOG.debug("Trying to update relationship  with the data %s", data)
         self.load(self.client.put(url, data=data))
         return self
 
@@ -770,7 +974,7 @@ class Relationship(base.QueryableModel):
 
         """
         data = self._generate_input_dict(**kwargs)
-        LOG.debug(f"Trying to update relationship with the data {data}")
+        LOG.debug("Trying to update relationship with the data %s", data)
         self.client.put(self.url, data=data)
         return self
 
@@ -780,7 +984,7 @@ class Relationship(base.QueryableModel):
 
         """
         data = self._generate_input_dict(**kwargs)
-        LOG.debug(f"Trying to create relationship with the data {data}")
+        LOG.debug("Trying to create relationship with the data %s", data)
         self.client.post(self.url, data=data)
         return self
 
@@ -795,12 +999,105 @@ class FullTextResult(base.DependentModel):
     fields = ('entity', 'score')
 
 
-class SearchAttributeCollection(base.QueryableModelCollection):
+class SearchCollection(base.QueryableModelCollection):
+    """Common base for the search collections, which return a single result page."""
+    default_page_size = 100
+
     def load(self, response):
         model = self.model_class(self, href=self.url)
         model.load(response)
         self._models.append(model)
 
+    def stream(self, page_size=None, prefetch=0, incremental=False):
+        """Yield the matching entities one by one, walking the result pages lazily.
+
+        Pages are requested with increasing 'offset' and a 'limit' of page_size,
+        starting from the offset given when calling the collection (if any).
+        Only the page being consumed is kept in memory, and the first page with
+        fewer than page_size entities ends the iteration.
+
+            for entity in client.search_basic(typeName='hive_table').stream(page_size=500):
+                print(entity.guid)
+
+        With prefetch=k, pages N+1..N+k are fetched by a pool of k threads while
+        page N is being consumed.  Up to k requests past the last page may be
+        issued; their results are discarded.  Prefetching more than one page
+        requires a client created with thread_safe=True.
+
+        With incremental=True, each page is parsed while it is read off the
+        socket (see HttpClient.iter_items), so not even a whole page is held
+        in memory.  This cannot be combined with prefetching.
+        """
+        page_size = page_size or self.default_page_size
+        self._prepare_filter()
+        params = dict(self._filter)
+        offset = int(params.get('offset') or 0)
+        if incremental:
+            if prefetch:
+                raise ValueError("Prefetching cannot be combined with incremental parsing")
+            for entity in self._streamed_entities(params, offset, page_size):
+                yield entity
+            return
+
+        if prefetch:
+            responses = self._prefetched_pages(params, offset, page_size, utils.worker_count(self.client, prefetch))
+        else:
+            responses = self._pages(params, offset, page_size)
+
+        for response in responses:
+            page = self.model_class(self, href=self.url)
+            page.load(response)
+            for entity in page.entities:
+                yield entity
+
+    def _streamed_entities(self, params, offset, page_size):
+        while True:
+            count = 0
+            for item in self.client.iter_items('get', self.url, prefix='entities.item',
+                                               params=dict(params, offset=offset, limit=page_size)):
+                count += 1
+                yield self._model(item, model_class=Entity)
+            if count < page_size:
+                return
+            offset += page_size
+
+    def _fetch_page(self, params, offset, page_size):
+        LOG.debug("Fetching search page at offset %s for %s", offset, self.__class__.__name__)
+        return self.client.get(self.url, params=dict(params, offset=offset, limit=page_size))
+
+    @staticmethod
+    def _is_last_page(response, page_size):
+        return len(response.get('entities') or []) < page_size
+
+    def _pages(self, params, offset, page_size):
+        while True:
+            response = self._fetch_page(params, offset, page_size)
+            yield response
+            if self._is_last_page(response, page_size):
+                return
+            offset += page_size
+
+    def _prefetched_pages(self, params, offset, page_size, prefetch):
+        with futures.ThreadPoolExecutor(max_workers=prefetch) as executor:
+            pending = collections.deque()
+            try:
+                while True:
+                    # keep the page being consumed plus `prefetch` pages ahead in flight
+                    while len(pending) <= prefetch:
+                        pending.append(executor.submit(self._fetch_page, params, offset, page_size))
+                        offset += page_size
+                    response = pending.popleft().result()
+                    yield response
+                    if self._is_last_page(response, page_size):
+                        return
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+class SearchAttributeCollection(SearchCollection):
+    pass
+
 
 class SearchAttribute(base.QueryableModel):
     collection_class = SearchAttributeCollection
@@ -814,11 +1111,8 @@ class SearchAttribute(base.QueryableModel):
                      'fullTextResults': FullTextResult}
 
 
-class SearchBasicCollection(base.QueryableModelCollection):
-    def load(self, response):
-        model = self.model_class(self, href=self.url)
-        model.load(response)
-        self._models.append(model)
+class SearchBasicCollection(SearchCollection):
+    pass
 
 
 class SearchBasic(base.QueryableModel):
@@ -839,16 +1133,13 @@ class SearchBasic(base.QueryableModel):
         (POST) /v2/search/basic
         Please note that this DOES NOT create any entity.
         """
-        LOG.debug(f"Search using Basic Search POST with the following search parameters: {data}")
+        LOG.debug("Search using Basic Search POST with the following search parameters: %s", data)
         self.load(self.client.post(self.url, data=data))
         return self
 
 
-class SearchDslCollection(base.QueryableModelCollection):
-    def load(self, response):
-        model = self.model_class(self, href=self.url)
-        model.load(response)
-        self._models.append(model)
+class SearchDslCollection(SearchCollection):
+    pass
 
 
 class SearchDsl(base.QueryableModel):
@@ -872,11 +1163,8 @@ class SearchDsl(base.QueryableModel):
         return list(itertools.chain.from_iterable(attributes))
 
 
-class SearchFulltextCollection(base.QueryableModelCollection):
-    def load(self, response):
-        model = self.model_class(self, href=self.url)
-        model.load(response)
-        self._models.append(model)
+class SearchFulltextCollection(SearchCollection):
+    pass
 
 
 class SearchFulltext(base.QueryableModel):
@@ -908,29 +1196,25 @@ class SearchSaved(base.QueryableModel):
     primary_key = 'guid'
     fields = ('name', 'searchParameters', 'ownerName', 'searchType', 'uiParameters')
 
-    def inflate(self):
-        """Load the resource from the server, if not already loaded. Removed params check for searchParameters"""
-        if not self._is_inflated:
-            if self._is_inflating:
-                #  catch infinite recursion when attempting to inflate
-                #  an object that doesn't have enough data to inflate
-                msg = ("There is not enough data to inflate this object.  "
-                       "Need either an href: {} or a {}: {}")
-                msg = msg.format(self._href, self.primary_key, self._data.get(self.primary_key))
-                raise exceptions.ClientError(msg)
-
-            self._is_inflating = True
+    def _inflate(self, url=None):
+        """Load the resource from the server. Removed params check for searchParameters"""
+        if self._is_inflating:
+            #  catch infinite recursion when attempting to inflate
+            #  an object that doesn't have enough data to inflate
+            msg = ("There is not enough data to inflate this object.  "
+                   "Need either an href: {} or a {}: {}")
+            msg = msg.format(self._href, self.primary_key, self._data.get(self.primary_key))
+            raise exceptions.ClientError(msg)
 
-            try:
-                params = {}
-                # To keep the method same as the original request. The default is GET
-                self.load(self.client.request(self.method, self.url, **params))
-            except Exception:
-                self.load(self._data)
-
-            self._is_inflated = True
-            self._is_inflating = False
-        return self
+        self._is_inflating = True
+
+        try:
+            self.load(self.client.request(self.method, self.url))
+        except Exception:
+            self.load(self._data)
+
+        self._is_inflated = True
+        self._is_inflating = False
 
     @events.evented
     def create(self, data, **kwargs):
@@ -944,7 +1228,6 @@ class SearchSaved(base.QueryableModel):
         """
         This is override method
         """
-        self.method = 'put'
         self.load(self.client.put(self.parent.url, data=data))
         return self
 
@@ -0,0 +1,117 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Defines the HTTP transport adapter used by the Atlas client.
+
+It is a regular requests HTTPAdapter whose connection pools also keep
+statistics (connections created, reused, waited for, discarded and evicted)
+and can close keep-alive connections which have been idle for too long,
+before the server or a load balancer drops them underneath us.
+"""
+
+import threading
+import time
+
+from requests.adapters import HTTPAdapter, DEFAULT_POOLBLOCK
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class PoolStats(object):
+    """Thread-safe counters describing the usage of the connection pools.
+
+    created:   new connections opened
+    reused:    requests served by an existing keep-alive connection
+    waits:     requests which had to wait for a free connection (pool_block=True)
+    discarded: connections closed because the pool was already full
+    evicted:   keep-alive connections closed for being idle too long
+    """
+    counters = ('created', 'reused', 'waits', 'discarded', 'evicted')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.counters, 0)
+
+    def incr(self, counter):
+        with self._lock:
+            self._counts[counter] += 1
+
+    def as_dict(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts = dict.fromkeys(self.counters, 0)
+
+    def __getstate__(self):
+        return self.as_dict()
+
+    def __setstate__(self, counts):
+        self._lock = threading.Lock()
+        self._counts = dict(dict.fromkeys(self.counters, 0), **counts)
+
+
+def tracked_pool_class(pool_class, stats, idle_timeout=None):
+    """Subclass an urllib3 connection pool to record stats and evict idle connections."""
+
+    class TrackedConnectionPool(pool_class):
+        def _new_conn(self):
+            stats.incr('created')
+            return super(TrackedConnectionPool, self)._new_conn()
+
+        def _get_conn(self, timeout=None):
+            if self.block and self.pool is not None and self.pool.empty():
+                stats.incr('waits')
+            conn = super(TrackedConnectionPool, self)._get_conn(timeout=timeout)
+            last_used = getattr(conn, '_atlas_last_used', None)
+            if last_used is not None:
+                if idle_timeout is not None and time.monotonic() - last_used > idle_timeout:
+                    # the connection reconnects lazily on its next request
+                    conn.close()
+                    stats.incr('evicted')
+                else:
+                    stats.incr('reused')
+            return conn
+
+        def _put_conn(self, conn):
+            if conn is not None:
+                conn._atlas_last_used = time.monotonic()
+                if self.pool is not None and self.pool.full():
+                    stats.incr('discarded')
+            super(TrackedConnectionPool, self)._put_conn(conn)
+
+    TrackedConnectionPool.__name__ = 'Tracked' + pool_class.__name__
+    return TrackedConnectionPool
+
+
+class AtlasHTTPAdapter(HTTPAdapter):
+    """An HTTPAdapter with pool statistics and idle connection eviction.
+
+    pool_connections, pool_maxsize, pool_block and max_retries behave as in
+    requests.  Keep-alive connections idle for more than idle_timeout seconds
+    are closed instead of being reused, None keeps them forever.
+    """
+    # the attributes kept when pickling, i.e. by copy.deepcopy() of a model and its client
+    __attrs__ = HTTPAdapter.__attrs__ + ['idle_timeout', 'stats']
+
+    def __init__(self, idle_timeout=None, **kwargs):
+        self.stats = PoolStats()
+        self.idle_timeout = idle_timeout
+        super(AtlasHTTPAdapter, self).__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=DEFAULT_POOLBLOCK, **pool_kwargs):
+        super(AtlasHTTPAdapter, self).init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': tracked_pool_class(HTTPConnectionPool, self.stats, self.idle_timeout),
+            'https': tracked_pool_class(HTTPSConnectionPool, self.stats, self.idle_timeout),
+        }
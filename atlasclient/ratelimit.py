@@ -0,0 +1,137 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Client-side rate limiting, adapting to what Atlas can sustain.
+
+Requests take a token from a bucket refilled at the current rate.  The rate
+follows an AIMD scheme: every successful request increases it slightly,
+while a 429 or 503 response cuts it by a factor and pauses all requests for
+the duration given by the Retry-After header.  A single limiter is meant to
+be shared by all the threads using a client, or even by several clients
+talking to the same Atlas.
+"""
+
+import email.utils
+import logging
+import threading
+import time
+
+LOG = logging.getLogger('pyatlasclient')
+
+
+def parse_retry_after(value):
+    """Return the number of seconds to wait from a Retry-After header, or None.
+
+    The header holds either a number of seconds or an HTTP date.
+    """
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter(object):
+    """A thread-safe token bucket whose rate adapts to overload responses.
+
+    rate is the initial number of requests per second, kept between min_rate
+    and max_rate.  Up to burst requests can be sent at once after an idle
+    period.  While requests succeed, the rate grows by increase requests per
+    second, every second; on overload it is multiplied by decrease, at most
+    once per second so that a wave of rejected concurrent requests counts as
+    a single overload.  backoff is the pause used when Atlas does not send a
+    Retry-After header.
+    """
+
+    def __init__(self, rate=50.0, min_rate=1.0, max_rate=1000.0, burst=None,
+                 increase=1.0, decrease=0.5, backoff=1.0):
+        if not 0 < min_rate <= rate <= max_rate:
+            raise ValueError("Expected 0 < min_rate <= rate <= max_rate")
+        if not 0 < decrease < 1:
+            raise ValueError("Expected 0 < decrease < 1")
+        self.rate = float(rate)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate)
+        self.burst = float(burst) if burst is not None else max(self.rate, 1.0)
+        self.increase = increase
+        self.decrease = decrease
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        # the monotonic clock times only make sense in this process: a copy starts with a full bucket
+        self._tokens = self.burst
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+
+    def _refill(self, now):
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def acquire(self):
+        """Wait until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._paused_until:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    delay = (1 - self._tokens) / self.rate
+                else:
+                    delay = self._paused_until - now
+            time.sleep(delay)
+
+    def success(self):
+        """Record a successful request, ramping the rate up."""
+        with self._lock:
+            if self.rate < self.max_rate:
+                # increase / rate per request adds up to increase per second at the current rate
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def overloaded(self, retry_after=None):
+        """Record a 429 or 503 response, backing off."""
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = self.backoff
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + delay)
+            # the paused time must not be refilled as a burst
+            self._last_refill = max(self._last_refill, self._paused_until)
+            self._tokens = min(self._tokens, 1.0)
+            if now - self._last_decrease >= 1.0:
+                self._last_decrease = now
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                LOG.info("Atlas is overloaded, slowing down to %.1f requests per second "
+                         "after a pause of %.1f seconds", self.rate, delay)
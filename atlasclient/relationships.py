@@ -0,0 +1,131 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Replace the relationship attributes of entities by the related entities.
+
+Atlas only returns the ids of the related entities, along with some of them
+in referredEntities.  The missing ones are fetched from 'entity/bulk', in
+chunks small enough for the URL to stay under a safe length, several chunks
+at a time.  The entities fetched are remembered, so that resolving the next
+page of a search only fetches the entities not seen yet.
+"""
+
+import logging
+import threading
+
+from atlasclient import utils
+
+LOG = logging.getLogger('pyatlasclient')
+
+
+class RelationshipResolver(object):
+    """Resolve the relationship attributes of the entities of an Atlas client.
+
+    The entities are fetched with URLs of at most max_url_length characters,
+    by up to max_workers threads: by default 4 with a client created with
+    thread_safe=True, and a single one otherwise.  A resolver is thread-safe,
+    and can be shared to keep the fetched entities across calls; they are
+    then never fetched again, use clear() to forget them.
+    """
+
+    def __init__(self, client, max_url_length=4096, max_workers=None):
+        self.client = client
+        self.max_url_length = max_url_length
+        self.max_workers = utils.worker_count(client, max_workers)
+        # entity data by guid, None for the entities Atlas did not return
+        self._entities = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entities)
+
+    def clear(self):
+        with self._lock:
+            self._entities.clear()
+
+    def resolve(self, entities, attributes=None, depth=1, referred_entities=None):
+        """Replace the related entity ids of entities by the data of the related entities.
+
+        :param entities: the entity models whose relationshipAttributes are resolved, in place.
+        :param attributes: the relationship attributes to resolve, all of them when not given.
+        :param depth: how many levels of relationships to resolve: with 2, the related
+            entities get their own relationship attributes resolved, on copies of their data.
+        :param referred_entities: the referredEntities returned along with entities.
+        :return: entities
+        """
+        if referred_entities:
+            self._remember(referred_entities)
+        level = [entity.relationshipAttributes for entity in entities]
+        for remaining in range(depth - 1, -1, -1):
+            references = [(relationship_attrs, attribute)
+                          for relationship_attrs in level if relationship_attrs
+                          for attribute in (attributes or list(relationship_attrs))]
+            self._fetch({guid for relationship_attrs, attribute in references
+                         for guid in _guids(relationship_attrs.get(attribute))})
+            level = []
+            for relationship_attrs, attribute in references:
+                value = relationship_attrs.get(attribute)
+                if isinstance(value, list):
+                    for index, item in enumerate(value):
+                        value[index] = self._related(item, remaining, level)
+                elif isinstance(value, dict):
+                    relationship_attrs[attribute] = self._related(value, remaining, level)
+        return entities
+
+    def _related(self, item, remaining, level):
+        """Return the data of the entity an item refers to, or the item when unknown."""
+        data = self._entities.get(_guid(item))
+        if data is None:
+            return item
+        if remaining:
+            # a copy, the relationships of an entity depend on where it is found
+            relationship_attrs = {attribute: list(value) if isinstance(value, list) else value
+                                  for attribute, value in (data.get('relationshipAttributes') or {}).items()}
+            data = dict(data, relationshipAttributes=relationship_attrs)
+            level.append(relationship_attrs)
+        return data
+
+    def _remember(self, entities):
+        with self._lock:
+            self._entities.update(entities)
+
+    def _fetch(self, guids):
+        with self._lock:
+            missing = sorted(guid for guid in guids if guid not in self._entities)
+        if not missing:
+            return
+        LOG.debug("Fetching %s related entities", len(missing))
+        # as Atlas fails a whole bulk request for one deleted entity, such chunks are
+        # fetched again one by one, and the entities gone are left unresolved
+        responses = self.client.entity_guid._fetch_responses(
+            missing, max_workers=self.max_workers, chunk_size=None, max_url_length=self.max_url_length)
+
+        fetched = dict.fromkeys(missing)
+        for response in responses.values():
+            fetched.update(response.get('referredEntities') or {})
+        fetched.update((guid, response['entity']) for guid, response in responses.items())
+        self._remember(fetched)
+
+
+def _guid(item):
+    return item.get('guid') if isinstance(item, dict) else getattr(item, 'guid', None)
+
+
+def _guids(value):
+    """Yield the guids of the entities a relationship attribute refers to."""
+    items = value if isinstance(value, list) else [value] if isinstance(value, dict) else ()
+    for item in items:
+        guid = _guid(item)
+        # some items have no guid, i.e. in test cases
+        if guid:
+            yield guid
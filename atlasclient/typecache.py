@@ -0,0 +1,164 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+A persistent cache of the Atlas type definitions, shared by the processes of a host.
+
+Downloading all of 'types/typedefs' takes seconds on large installations.
+The definitions are instead kept in an SQLite database, one row per type,
+and revalidated against 'types/typedefs/headers', which only lists the guid,
+name and category of each type:
+
+* types whose guid is new are fetched one by one, unless there are too many,
+* types which disappeared are dropped,
+* as the headers do not tell when a type was updated, everything is
+  downloaded again once the cache is older than max_age seconds.
+
+Writes take the SQLite write lock before downloading anything, so a host
+starting many workers at once downloads the type definitions only once.
+"""
+
+import contextlib
+import logging
+import sqlite3
+import time
+
+LOG = logging.getLogger('pyatlasclient')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS servers (server TEXT PRIMARY KEY, loaded_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS typedefs (server TEXT NOT NULL, guid TEXT NOT NULL, category TEXT NOT NULL,
+                                     body BLOB NOT NULL, PRIMARY KEY (server, guid));
+"""
+
+# the list holding each category of type in the 'types/typedefs' response
+CATEGORY_KEYS = {'ENUM': 'enumDefs',
+                 'STRUCT': 'structDefs',
+                 'CLASSIFICATION': 'classificationDefs',
+                 'ENTITY': 'entityDefs',
+                 'RELATIONSHIP': 'relationshipDefs',
+                 'BUSINESS_METADATA': 'businessMetadataDefs',
+                 }
+KEY_CATEGORIES = {key: category for category, key in CATEGORY_KEYS.items()}
+
+
+class TypeDefCache(object):
+    """Keep the type definitions of Atlas servers in an SQLite database.
+
+    max_age is the number of seconds after which all the definitions are
+    downloaded again.  When more than max_fetch types are missing from the
+    cache, they are downloaded all at once instead of one by one.
+    """
+
+    def __init__(self, path, max_age=3600, max_fetch=20, timeout=60):
+        self.path = path
+        self.max_age = max_age
+        self.max_fetch = max_fetch
+        self.timeout = timeout
+        self.stats = {'cached': 0, 'incremental': 0, 'full': 0}
+        with contextlib.closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # autocommit, the transactions are handled explicitly
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+    def load(self, atlas):
+        """Return the 'types/typedefs' response of an Atlas server, from the cache when valid."""
+        server = atlas.base_url
+        url = '/'.join([server, 'api', 'atlas', 'v2', 'types', 'typedefs'])
+        headers = {header['guid']: header for header in atlas.client.get(url + '/headers')}
+
+        with contextlib.closing(self._connect()) as conn:
+            loaded_at, typedefs = self._cached(conn, server)
+            if not self._is_valid(loaded_at, typedefs, headers):
+                # only one process refreshes, the others wait for the lock and find it done
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    loaded_at, typedefs = self._cached(conn, server)
+                    if not self._is_valid(loaded_at, typedefs, headers):
+                        typedefs = self._refresh(conn, atlas, url, server, headers, loaded_at, typedefs)
+                    conn.execute('COMMIT')
+                except BaseException:
+                    conn.execute('ROLLBACK')
+                    raise
+            else:
+                self.stats['cached'] += 1
+        return self._response(typedefs, atlas.json_codec)
+
+    def _cached(self, conn, server):
+        """Return when the definitions of a server were downloaded, and their (category, body) by guid."""
+        row = conn.execute('SELECT loaded_at FROM servers WHERE server = ?', (server,)).fetchone()
+        typedefs = {guid: (category, body) for guid, category, body in conn.execute(
+            'SELECT guid, category, body FROM typedefs WHERE server = ?', (server,))}
+        return (row[0] if row else None), typedefs
+
+    def _is_expired(self, loaded_at):
+        return loaded_at is None or time.time() - loaded_at > self.max_age
+
+    def _is_valid(self, loaded_at, typedefs, headers):
+        return not self._is_expired(loaded_at) and typedefs.keys() == headers.keys()
+
+    def _refresh(self, conn, atlas, url, server, headers, loaded_at, typedefs):
+        missing = [guid for guid in headers if guid not in typedefs]
+        encode = atlas.json_codec.dumps
+
+        if self._is_expired(loaded_at) or len(missing) > self.max_fetch:
+            LOG.debug("Downloading all the type definitions of %s", server)
+            self.stats['full'] += 1
+            typedefs = {}
+            for key, defs in atlas.client.get(url).items():
+                if key in KEY_CATEGORIES:
+                    for typedef in defs:
+                        typedefs[typedef['guid']] = (KEY_CATEGORIES[key], _to_bytes(encode(typedef)))
+            conn.execute('DELETE FROM typedefs WHERE server = ?', (server,))
+            updated = typedefs
+            loaded_at = time.time()
+        else:
+            LOG.debug("Updating %s type definitions of %s", len(missing), server)
+            self.stats['incremental'] += 1
+            removed = [guid for guid in typedefs if guid not in headers]
+            conn.executemany('DELETE FROM typedefs WHERE server = ? AND guid = ?',
+                             [(server, guid) for guid in removed])
+            for guid in removed:
+                del typedefs[guid]
+            updated = {}
+            for guid in missing:
+                typedef = atlas.client.get('/'.join([server, 'api', 'atlas', 'v2', 'types', 'typedef', 'guid', guid]))
+                updated[guid] = (headers[guid]['category'], _to_bytes(encode(typedef)))
+            typedefs.update(updated)
+            # the age is kept, types updated in place are only seen by the next full download
+
+        conn.executemany('INSERT OR REPLACE INTO typedefs (server, guid, category, body) VALUES (?, ?, ?, ?)',
+                         [(server, guid, category, body) for guid, (category, body) in updated.items()])
+        conn.execute('INSERT OR REPLACE INTO servers (server, loaded_at) VALUES (?, ?)', (server, loaded_at))
+        return typedefs
+
+    def _response(self, typedefs, json_codec):
+        response = {key: [] for key in CATEGORY_KEYS.values()}
+        for category, body in typedefs.values():
+            response.setdefault(CATEGORY_KEYS.get(category, category.lower() + 'Defs'), []).append(
+                json_codec.loads(body))
+        return response
+
+    def invalidate(self, server=None):
+        """Force a full download on the next load, for a server or for all of them."""
+        with contextlib.closing(self._connect()) as conn:
+            if server is None:
+                conn.execute('DELETE FROM servers')
+            else:
+                conn.execute('DELETE FROM servers WHERE server = ?', (server,))
+
+
+def _to_bytes(encoded):
+    return encoded.encode('utf-8') if isinstance(encoded, str) else encoded
@@ -0,0 +1,132 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+An in-memory index of the type definitions returned by 'types/typedefs'.
+
+Everything is computed once, when the registry is built: types by name and
+by guid, the transitive super and sub types of every entity and
+classification type, and their attribute definitions including the
+inherited ones.  Lookups then never call the server.
+"""
+
+from atlasclient import exceptions
+
+# the lists of the 'types/typedefs' response
+TYPEDEF_KEYS = ('enumDefs', 'structDefs', 'classificationDefs', 'entityDefs',
+                'relationshipDefs', 'businessMetadataDefs')
+
+
+class TypeRegistry(object):
+    """Index a 'types/typedefs' response.
+
+    The type definitions are returned as the dictionaries found in the
+    response, they are shared and must not be modified.
+    """
+
+    def __init__(self, response):
+        self._by_name = {}
+        self._by_guid = {}
+        for key in TYPEDEF_KEYS:
+            for typedef in response.get(key) or ():
+                self._by_name[typedef['name']] = typedef
+                if typedef.get('guid'):
+                    self._by_guid[typedef['guid']] = typedef
+
+        self._supertypes = {}
+        for name in self._by_name:
+            self._resolve_supertypes(name, ())
+        subtypes = {name: set() for name in self._by_name}
+        for name, supertypes in self._supertypes.items():
+            for supertype in supertypes:
+                subtypes.setdefault(supertype, set()).add(name)
+        self._subtypes = {name: frozenset(names) for name, names in subtypes.items()}
+
+        self._attribute_defs = {}
+        for name in self._by_name:
+            self._resolve_attribute_defs(name)
+
+    def _resolve_supertypes(self, name, path):
+        supertypes = self._supertypes.get(name)
+        if supertypes is None:
+            if name in path:
+                raise exceptions.ClientError(message="Circular superTypes for type %s" % name)
+            resolved = set()
+            typedef = self._by_name.get(name) or {}
+            for supertype in typedef.get('superTypes') or ():
+                resolved.add(supertype)
+                resolved.update(self._resolve_supertypes(supertype, path + (name,)))
+            supertypes = self._supertypes[name] = frozenset(resolved)
+        return supertypes
+
+    def _resolve_attribute_defs(self, name):
+        attribute_defs = self._attribute_defs.get(name)
+        if attribute_defs is None:
+            attribute_defs = {}
+            typedef = self._by_name.get(name) or {}
+            # the attributes of the super types first, so that redefinitions win
+            for supertype in typedef.get('superTypes') or ():
+                attribute_defs.update(self._resolve_attribute_defs(supertype))
+            for attribute_def in typedef.get('attributeDefs') or ():
+                attribute_defs[attribute_def['name']] = attribute_def
+            self._attribute_defs[name] = attribute_defs
+        return attribute_defs
+
+    def __len__(self):
+        return len(self._by_name)
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def __iter__(self):
+        return iter(self._by_name.values())
+
+    def __getitem__(self, name):
+        self._require(name)
+        return self._by_name[name]
+
+    def _require(self, name):
+        if name not in self._by_name:
+            raise exceptions.NotFound(details="No type named %s" % name)
+
+    def get(self, name, default=None):
+        return self._by_name.get(name, default)
+
+    def by_guid(self, guid):
+        try:
+            return self._by_guid[guid]
+        except KeyError:
+            raise exceptions.NotFound(details="No type with guid %s" % guid)
+
+    def names(self, category=None):
+        """Return the names of all the types, or of the types of a category (i.e. 'ENTITY')."""
+        return [name for name, typedef in self._by_name.items()
+                if category is None or typedef.get('category') == category]
+
+    def supertypes(self, name):
+        """Return the names of all the super types of a type, transitively."""
+        self._require(name)
+        return self._supertypes[name]
+
+    def subtypes(self, name):
+        """Return the names of all the sub types of a type, transitively."""
+        self._require(name)
+        return self._subtypes[name]
+
+    def is_a(self, name, supertype):
+        """Whether a type is supertype or inherits from it."""
+        return name == supertype or supertype in self.supertypes(name)
+
+    def attribute_defs(self, name):
+        """Return the attribute definitions of a type by attribute name, inherited ones included."""
+        self._require(name)
+        return self._attribute_defs[name]
@@ -14,6 +14,9 @@ from typing import List
 import base64
 
 import re
+from urllib.parse import quote
+
+from atlasclient import exceptions
 
 try:
     from logging import NullHandler  # pylint: disable=unused-import
@@ -193,3 +196,42 @@ def extract_entities(collections):
         entities.extend(collection.entities)
 
     return entities
+
+
+def chunk_query_values(values, name, max_length, max_count=None):
+    """
+    Split the values of a repeated query parameter, i.e. the GUIDs of entity/bulk,
+    so that the query string of each chunk ('guid=...&guid=...') fits in max_length
+    characters and holds at most max_count values.
+
+    :return: a generator of lists of values
+    """
+    chunk = []
+    length = 0
+    for value in values:
+        parameter_length = len(name) + 1 + len(quote(str(value), safe=''))
+        if chunk and (length + 1 + parameter_length > max_length or len(chunk) == max_count):
+            yield chunk
+            chunk = []
+            length = 0
+        length += parameter_length + (1 if chunk else 0)
+        chunk.append(value)
+    if chunk:
+        yield chunk
+
+
+def worker_count(client, max_workers, default=4):
+    """
+    Return the number of threads sending the requests of an Atlas client at a time.
+
+    The threads share the session of the client, so that several of them
+    require a client created with thread_safe=True: max_workers=None is then
+    default threads, and a single one otherwise.
+    """
+    thread_safe = getattr(client.client, 'thread_safe', False)
+    if max_workers is None:
+        return default if thread_safe else 1
+    if max_workers > 1 and not thread_safe:
+        raise exceptions.ClientError("Sending requests with several threads requires an Atlas client "
+                                     "created with thread_safe=True")
+    return max_workers
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""\
+Measure the cost of building glossary data classes from an Atlas response.
+
+A term assigned to many entities is built from a canned response, validated
+by pydantic as by default, and trusted as with Atlas(validate_responses=False).
+It is then serialized, as the items of bulk requests are.
+
+usage: bench_glossary.py [entities]
+"""
+
+import sys
+import timeit
+
+from atlasclient.data_types import construct
+from atlasclient.glossary.data_types import AtlasGlossaryTerm
+
+
+def term(count):
+    related = [{'termGuid': str(i), 'displayText': 'term %s' % i, 'relationGuid': 'r%s' % i} for i in range(10)]
+    return {
+        'guid': '8bbea92b-d98c-4613-ae6e-1a9d0b4f344b',
+        'qualifiedName': 'customer@sales',
+        'name': 'customer',
+        'shortDescription': 'A person or company buying from us',
+        'anchor': {'glossaryGuid': 'e3a1bd8b-ed4a-4d2d-b0c2-0d2b5e0c8f11', 'displayText': 'sales'},
+        'assignedEntities': [{'guid': str(i), 'typeName': 'hive_column', 'displayText': 'customer_id',
+                              'entityStatus': 'ACTIVE', 'relationshipType': 'AtlasGlossarySemanticAssignment',
+                              'relationshipGuid': 'r%s' % i, 'relationshipStatus': 'ACTIVE',
+                              'relationshipAttributes': {'typeName': 'AtlasGlossarySemanticAssignment',
+                                                         'attributes': {'confidence': 100}}}
+                             for i in range(count)],
+        'synonyms': related,
+        'seeAlso': related,
+        'categories': [{'categoryGuid': 'c1', 'displayText': 'parties', 'relationGuid': 'r'}],
+    }
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    response = term(count)
+    instance = AtlasGlossaryTerm(**response)
+    cases = [
+        ('validated', lambda: AtlasGlossaryTerm(**response)),
+        ('trusted', lambda: construct(AtlasGlossaryTerm, response)),
+        ('to_dict', lambda: instance.to_dict(ignore_falsy=True)),
+    ]
+    for name, call in cases:
+        number = max(1, 20000 // count)
+        seconds = min(timeit.repeat(call, number=number, repeat=3))
+        print("%-10s %10.2f ms/term %8.2f us/assigned entity" % (
+            name, seconds / number * 1e3, seconds / number / count * 1e6))
+
+
+if __name__ == '__main__':
+    main()
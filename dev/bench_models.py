@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+"""\
+Measure the cost of building models from an Atlas response.
+
+No request is made: a search result page is built from canned entities, to
+time the work done by the models themselves, with DEBUG logging disabled as
+it is in production.
+
+usage: bench_models.py [entities]
+"""
+
+import logging
+import sys
+import timeit
+
+from atlasclient.client import Atlas
+from atlasclient.models import Entity
+
+ENTITY = {
+    'guid': '8bbea92b-d98c-4613-ae6e-1a9d0b4f344b',
+    'typeName': 'hive_table',
+    'status': 'ACTIVE',
+    'displayText': 'customers',
+    'classificationNames': ['PII'],
+    'attributes': {'name': 'customers', 'owner': 'etl', 'qualifiedName': 'sales.customers@prod',
+                   'createTime': 1580000000000, 'description': 'All the customers, one row per account'},
+    'meaningNames': [],
+    'meanings': [],
+}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    logging.basicConfig(level=logging.WARNING)
+    atlas = Atlas('localhost', port=21000, username='admin', password='admin')
+    search = atlas.search_basic
+    page = search.model_class(search, href=search.url)
+    page.load({'queryType': 'BASIC', 'entities': [dict(ENTITY, guid=str(i)) for i in range(count)]})
+
+    cases = [
+        ('Entity()', 1, lambda: Entity(search, data=ENTITY)),
+        ('iterate page', count, lambda: [entity.guid for entity in page.entities()]),
+    ]
+    for name, per_call, call in cases:
+        number = max(1, 100000 // per_call)
+        seconds = min(timeit.repeat(call, number=number, repeat=3))
+        print("%-14s %8.2f us/entity" % (name, seconds / number / per_call * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+"""\
+Measure the client-side overhead of HttpClient.request.
+
+The session is replaced by a stub returning a canned response, so only the
+work done by the client itself is timed: preparing headers and parameters,
+encoding the body, logging, error checking and decoding the response.
+
+usage: bench_request.py [iterations]
+"""
+
+import sys
+import timeit
+
+from atlasclient.client import Atlas
+
+URL = 'http://localhost:21000/api/atlas/v2/entity/guid/8bbea92b-d98c-4613-ae6e-1a9d0b4f344b'
+BODY = b'{"entity": {"guid": "8bbea92b-d98c-4613-ae6e-1a9d0b4f344b", "typeName": "hive_table"}}'
+
+
+class StubResponse(object):
+    status_code = 200
+    headers = {'content-type': 'application/json', 'content-length': str(len(BODY))}
+    content = BODY
+
+
+def stub_method(url, **kwargs):
+    return StubResponse()
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    atlas = Atlas('localhost', port=21000, username='admin', password='admin', json_codec='json')
+    http_client = atlas.client
+    http_client.session.get = stub_method
+    http_client.session.post = stub_method
+    payload = {'entity': {'typeName': 'hive_table', 'attributes': {'qualifiedName': 'db.table@cluster'}}}
+
+    cases = [
+        ('GET', lambda: http_client.request('get', URL)),
+        ('GET with params', lambda: http_client.request('get', URL, params={'minExtInfo': 'true'})),
+        ('POST with body', lambda: http_client.request('post', URL, data=payload)),
+    ]
+    for name, call in cases:
+        seconds = min(timeit.repeat(call, number=iterations, repeat=3))
+        print("%-16s %8.2f us/request" % (name, seconds / iterations * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+import asyncio
+import json
+
+import pytest
+from pkg_resources import resource_filename
+
+from atlasclient import exceptions, models
+from atlasclient.aio import AsyncAtlas, async_model_class, flatten_params
+from atlasclient.bulk import EntityBulkWriter
+from atlasclient.glossary.data_types import AtlasGlossaryExtInfo
+
+try:
+    from unittest.mock import AsyncMock
+except ImportError:
+    from mock import AsyncMock
+
+try:
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+except ImportError:
+    web = None
+
+GUID = '8bbea92b-d98c-4613-ae6e-1a9d0b4f344b'
+RESPONSE_JSON_DIR = 'response_json'
+
+
+def load_response(name):
+    with open('{}/{}'.format(resource_filename(__name__, RESPONSE_JSON_DIR), name)) as json_data:
+        return json.load(json_data)
+
+
+@pytest.fixture(scope='function')
+def async_atlas_client():
+    return AsyncAtlas('localhost', port=21000, username='admin', password='admin')
+
+
+class TestAsyncAtlas():
+    def test_async_atlas_client(self, async_atlas_client):
+        assert async_atlas_client.base_url == 'http://localhost:21000'
+        assert 'X-Requested-By' in async_atlas_client.client.headers
+        assert 'entity_guid' in dir(async_atlas_client)
+
+    def test_entry_points_reuse_models(self, async_atlas_client):
+        collection = async_atlas_client.entity_guid
+        assert issubclass(collection.model_class, models.EntityGuid)
+        assert isinstance(collection, models.EntityGuid.collection_class)
+        assert async_model_class(models.EntityGuid) is collection.model_class
+
+    def test_entity_guid_inflate(self, mocker, async_atlas_client):
+        mocker.patch.object(async_atlas_client.client, 'request', new_callable=AsyncMock)
+        async_atlas_client.client.request.return_value = load_response('entityguid_get.json')
+        entity = async_atlas_client.entity_guid(GUID)
+        with pytest.raises(exceptions.ClientError):
+            entity.entity
+        asyncio.run(entity.inflate())
+        assert entity.entity['guid'] == GUID
+        async_atlas_client.client.request.assert_called_once_with('get', entity.url)
+
+    def test_search_basic_async_iteration(self, mocker, async_atlas_client):
+        mocker.patch.object(async_atlas_client.client, 'request', new_callable=AsyncMock)
+        response = load_response('search_attribute_get.json')
+        async_atlas_client.client.request.return_value = response
+        params = {'typeName': 'hive_table', 'limit': '1'}
+
+        async def search():
+            return [s async for s in async_atlas_client.search_basic(**params)]
+
+        results = asyncio.run(search())
+        async_atlas_client.client.request.assert_called_once_with('get', results[0].url, params=params)
+        for s in results:
+            for e in s.entities:
+                assert e.attributes['property1'] == {}
+
+    def test_entity_post_create(self, mocker, async_atlas_client):
+        mocker.patch.object(async_atlas_client.client, 'request', new_callable=AsyncMock)
+        async_atlas_client.client.request.return_value = load_response('entity_post.json')
+        data = load_response('entityguid_get.json')
+        collection = async_atlas_client.entity_post
+        asyncio.run(collection.create(data=data))
+        async_atlas_client.client.request.assert_called_once_with('post', collection.url, data=data)
+
+    def test_blocking_methods_unavailable(self, mocker, async_atlas_client):
+        request = mocker.patch.object(async_atlas_client.client, 'request', new_callable=AsyncMock)
+        with pytest.raises(exceptions.ClientError):
+            next(async_atlas_client.search_basic(typeName='hive_table').stream())
+        with pytest.raises(exceptions.ClientError):
+            next(async_atlas_client.entity_bulk(guid=[GUID]).iter_entities())
+        with pytest.raises(exceptions.ClientError):
+            async_atlas_client.entity_bulk.write([{'typeName': 'hive_table'}])
+        with pytest.raises(exceptions.ClientError):
+            EntityBulkWriter(async_atlas_client)
+        assert not request.called
+
+    def test_entity_guid_fetch_many(self, mocker, async_atlas_client):
+        bulk_url = async_atlas_client.entity_bulk.url
+        existing = {'g%s' % i: {'guid': 'g%s' % i, 'typeName': 'hive_table'} for i in range(6)}
+
+        async def request(method, url, params=None):
+            if url == bulk_url:
+                if 'missing' in params['guid']:
+                    raise exceptions.NotFound()
+                return {'entities': [existing[guid] for guid in params['guid']], 'referredEntities': {}}
+            guid = url.rsplit('/', 1)[1]
+            if guid not in existing:
+                raise exceptions.NotFound()
+            return {'entity': existing[guid], 'referredEntities': {}}
+
+        mocker.patch.object(async_atlas_client.client, 'request', side_effect=request)
+        guids = ['g0', 'missing', 'g1', 'g2', 'g3', 'g4', 'g5', 'g0']
+        entities, not_found = asyncio.run(async_atlas_client.entity_guid.fetch_many(guids, chunk_size=3))
+        assert not_found == ['missing']
+        assert [e.entity['guid'] if e else None for e in entities] == [None if g == 'missing' else g for g in guids]
+        assert isinstance(entities[0], async_model_class(models.EntityGuid))
+        urls = [call[0][1] for call in async_atlas_client.client.request.call_args_list]
+        # 7 GUIDs in 3 chunks, the one with the missing GUID is fetched again one by one
+        assert urls.count(bulk_url) == 3
+        assert sorted(url.rsplit('/', 1)[1] for url in urls if url != bulk_url) == ['g0', 'g1', 'missing']
+
+    def test_glossary_detailed_and_partial_update(self, mocker, async_atlas_client):
+        request = mocker.patch.object(async_atlas_client.client, 'request', new_callable=AsyncMock)
+        request.return_value = {'guid': 'g1', 'termInfo': {}}
+        glossary = asyncio.run(async_atlas_client.glossary('g1').detailed())
+        url = async_atlas_client.glossary.url + '/g1'
+        request.assert_called_with('get', url + '/detailed')
+        assert isinstance(glossary.data_class_data, AtlasGlossaryExtInfo)
+        request.return_value = {'guid': 'g1', 'language': 'English'}
+        assert asyncio.run(glossary.partial_update(language='English')) is glossary
+        request.assert_called_with('put', url + '/partial', data={'language': 'English'})
+        assert glossary.language == 'English'
+
+    def test_entity_guid_update(self, mocker, async_atlas_client):
+        request = mocker.patch.object(async_atlas_client.client, 'request', new_callable=AsyncMock)
+        request.return_value = load_response('entityguid_get.json')
+        entity = asyncio.run(async_atlas_client.entity_guid(GUID).inflate())
+        entity.entity['attributes']['name'] = 'new name'
+        asyncio.run(entity.update('name'))
+        request.assert_called_with('put', entity.url + '?name=name', data='new name')
+        with pytest.raises(exceptions.BadRequest):
+            asyncio.run(entity.update('unknown'))
+
+    def test_search_basic_create(self, mocker, async_atlas_client):
+        request = mocker.patch.object(async_atlas_client.client, 'request', new_callable=AsyncMock)
+        request.return_value = load_response('search_attribute_get.json')
+        data = {'typeName': 'hive_table', 'limit': 1}
+        for search in (async_atlas_client.search_basic.create(data),
+                       async_atlas_client.search_basic.create(data=data)):
+            search = asyncio.run(search)
+            request.assert_called_with('post', async_atlas_client.search_basic.url, data=data)
+            assert search.entities[0].attributes['property1'] == {}
+
+    def test_search_saved_create_and_update(self, mocker, async_atlas_client):
+        request = mocker.patch.object(async_atlas_client.client, 'request', new_callable=AsyncMock)
+        url = async_atlas_client.search_saved.url
+        data = load_response('search_saved_update.json')
+        request.return_value = data
+        asyncio.run(async_atlas_client.search_saved.create(data=data))
+        request.assert_called_with('post', url, data=data)
+        request.return_value = [data]
+        searches = async_atlas_client.search_saved()
+        asyncio.run(searches.inflate())
+        request.return_value = data
+        asyncio.run(searches.update(data=data))
+        request.assert_called_with('put', url, data=data)
+
+    def test_flatten_params(self):
+        params = {'guid': ['a', 'b'], 'limit': 10, 'query': None}
+        assert flatten_params(params) == [('guid', 'a'), ('guid', 'b'), ('limit', '10')]
+
+
+async def atlas_handler(request, requests):
+    """Enough of Atlas for the HTTP client: entities by guid and in bulk, and entity creation."""
+    requests.append((request.method, request.path, request.query.getall('guid', []),
+                                    request.headers.get('Content-type')))
+    path = request.path[len('/api/atlas/v2/'):]
+    if path == 'entity/guid/missing':
+        return web.Response(status=404, text='{"errorCode": "ATLAS-404-00-005"}', content_type='application/json')
+    if path.startswith('entity/guid/'):
+        return web.json_response({'entity': {'guid': path.rsplit('/', 1)[1]}, 'referredEntities': {}})
+    if path == 'entity/bulk':
+        return web.json_response({'entities': [{'guid': guid} for guid in request.query.getall('guid')]})
+    if path == 'entity' and request.method == 'POST':
+        return web.json_response({'received': await request.json()})
+    if path == 'admin/version':
+        # a JSON body with the wrong content type is parsed all the same
+        return web.Response(text='{"Version": "2.1.0"}', content_type='text/plain')
+    if path == 'admin/status':
+        return web.Response(status=204)
+    return web.Response(status=500, text='unexpected')
+
+
+def run_with_atlas(test):
+    """Run test(atlas, requests) against a local aiohttp server, with a closed client at the end."""
+    requests = []
+
+    async def handler(request):
+        return await atlas_handler(request, requests)
+
+    async def main():
+        app = web.Application()
+        app.router.add_route('*', '/api/atlas/v2/{tail:.*}', handler)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            async with AsyncAtlas('localhost', port=server.port, username='admin', password='admin') as atlas:
+                return await test(atlas, requests)
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+
+@pytest.mark.skipif(web is None, reason='requires aiohttp')
+class TestAsyncHttpClient():
+    def test_error_status(self):
+        async def test(atlas, requests):
+            with pytest.raises(exceptions.NotFound) as error:
+                await atlas.entity_guid('missing').inflate()
+            assert error.value.code == 404
+            assert error.value.method == 'GET'
+            assert 'ATLAS-404-00-005' in error.value.details
+            entity = await atlas.entity_guid('found').inflate()
+            return entity.entity['guid']
+
+        assert run_with_atlas(test) == 'found'
+
+    def test_list_params_are_repeated(self):
+        async def test(atlas, requests):
+            response = await atlas.client.get(atlas.entity_bulk.url, params={'guid': ['a', 'b', 'c'], 'x': None})
+            return response, list(requests)
+
+        response, sent = run_with_atlas(test)
+        assert response == {'entities': [{'guid': 'a'}, {'guid': 'b'}, {'guid': 'c'}]}
+        assert sent == [('GET', '/api/atlas/v2/entity/bulk', ['a', 'b', 'c'], 'application/json')]
+
+    def test_json_body(self):
+        entity = {'entity': {'typeName': 'hive_table', 'attributes': {'name': 'table'}}}
+
+        async def test(atlas, requests):
+            return await atlas.entity_post.create(data=entity)
+
+        assert run_with_atlas(test) == {'received': entity}
+
+    def test_content_types(self):
+        async def test(atlas, requests):
+            version = await atlas.client.get(atlas.base_url + '/api/atlas/v2/admin/version')
+            status = await atlas.client.get(atlas.base_url + '/api/atlas/v2/admin/status')
+            return version, status
+
+        assert run_with_atlas(test) == ({'Version': '2.1.0'}, {})
+
+    def test_session_lifecycle(self):
+        async def test(atlas, requests):
+            http_client = atlas.client
+            assert http_client._session is None
+            await atlas.entity_guid('a').inflate()
+            session = http_client._session
+            assert not session.closed
+            await atlas.entity_guid('b').inflate()
+            assert http_client._session is session
+            await atlas.close()
+            assert session.closed and http_client._session is None
+            # a closed client opens a new session when used again
+            await atlas.entity_guid('c').inflate()
+            assert http_client._session is not session
+            return len(requests)
+
+        assert run_with_atlas(test) == 3
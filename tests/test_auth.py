@@ -0,0 +1,125 @@
+import base64
+import copy
+import itertools
+import json
+import threading
+import time
+
+import pytest
+
+from atlasclient import exceptions
+from atlasclient.auth import TokenRefresher, token_expiry
+from atlasclient.client import Atlas
+from tests.test_client import make_response
+
+
+def make_jwt(claims):
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b'=').decode()
+    return 'eyJhbGciOiJub25lIn0.{}.signature'.format(payload)
+
+
+class TestTokenRefresher():
+
+    def test_token_expiry(self):
+        assert token_expiry(make_jwt({'sub': 'admin', 'exp': 1700000000})) == 1700000000
+        assert token_expiry(make_jwt({'sub': 'admin'})) is None
+        assert token_expiry('opaque-token') is None
+
+    def test_refresh_before_expiry(self):
+        counter = itertools.count()
+        tokens = []
+        refreshed = threading.Event()
+
+        def provider():
+            return 'token-%d' % next(counter), time.time() + 0.1
+
+        def on_refresh(token):
+            tokens.append(token)
+            if len(tokens) == 3:
+                refreshed.set()
+
+        refresher = TokenRefresher(provider, on_refresh, refresh_margin=0.05, retry_interval=0.01)
+        try:
+            assert tokens[0] == 'token-0'
+            assert refreshed.wait(5)
+            assert tokens[:3] == ['token-0', 'token-1', 'token-2']
+        finally:
+            refresher.close()
+
+    def test_refresh_once_for_stale_token(self):
+        counter = itertools.count()
+        refresher = TokenRefresher(lambda: 'token-%d' % next(counter), lambda token: None)
+        try:
+            threads = [threading.Thread(target=refresher.refresh, kwargs={'stale_token': 'token-0'})
+                       for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert refresher.token == 'token-1'
+        finally:
+            refresher.close()
+
+    def test_failed_refresh_keeps_token(self):
+        calls = []
+
+        def provider():
+            calls.append(None)
+            if len(calls) > 1:
+                raise RuntimeError('identity provider unavailable')
+            return 'token-0', time.time()
+
+        refresher = TokenRefresher(provider, lambda token: None, refresh_margin=0, retry_interval=0.01)
+        try:
+            time.sleep(0.1)
+            assert len(calls) > 2
+            assert refresher.token == 'token-0'
+        finally:
+            refresher.close()
+
+
+class TestClientTokenProvider():
+
+    def test_authorization_header(self, mocker):
+        client = Atlas('localhost', port=21000, token_provider=lambda: 'token-0')
+        mocker.patch.object(client.client.session, 'get', return_value=make_response())
+        client.client.get('http://localhost:21000/api/atlas/v2/entity/guid/1234')
+        assert client.client.session.get.call_args[1]['headers']['Authorization'] == 'Bearer token-0'
+        client.close()
+
+    def test_refresh_on_unauthorized(self, mocker):
+        counter = itertools.count()
+        client = Atlas('localhost', port=21000, token_provider=lambda: 'token-%d' % next(counter))
+        mocker.patch.object(client.client.session, 'get',
+                            side_effect=[make_response(status_code=401), make_response(b'{"guid": "1234"}')])
+        assert client.client.get('http://localhost:21000/api/atlas/v2/entity/guid/1234') == {'guid': '1234'}
+        sent = [call[1]['headers']['Authorization'] for call in client.client.session.get.call_args_list]
+        assert sent == ['Bearer token-0', 'Bearer token-1']
+        client.close()
+
+    def test_deepcopy(self, mocker):
+        counter = itertools.count()
+        client = Atlas('localhost', port=21000, token_provider=lambda: 'token-%d' % next(counter),
+                       token_refresh_margin=30)
+        copied = copy.deepcopy(client.entity_guid('1234')).client.client
+        refresher = copied.token_refresher
+        assert refresher is not client.client.token_refresher
+        assert refresher._thread is not client.client.token_refresher._thread
+        assert refresher.refresh_margin == 30
+        mocker.patch.object(copied.session, 'get', return_value=make_response())
+        copied.get('http://localhost:21000/api/atlas/v2/entity/guid/1234')
+        assert copied.session.get.call_args[1]['headers']['Authorization'] == 'Bearer token-1'
+        # the original keeps its own token
+        assert client.client.token_refresher.token == 'token-0'
+        client.close()
+        copied.close()
+        refresher._thread.join(5)
+        assert not refresher._thread.is_alive()
+
+    def test_unauthorized_after_refresh(self, mocker):
+        client = Atlas('localhost', port=21000, token_provider=lambda: 'token')
+        mocker.patch.object(client.client.session, 'get', return_value=make_response(status_code=401))
+        with pytest.raises(exceptions.Unauthorized):
+            client.client.get('http://localhost:21000/api/atlas/v2/entity/guid/1234')
+        assert client.client.session.get.call_count == 2
+        client.close()
@@ -3,7 +3,10 @@ try:
 except ImportError: 
     from unittest.mock import MagicMock
 
-from atlasclient.base import Model, QueryableModel
+import copy
+import threading
+
+from atlasclient.base import LoadLock, Model, QueryableModel
 from atlasclient.client import HttpClient
 
 class TestBase():
@@ -18,3 +21,32 @@ class TestBase():
         model = Model(parent=queryablemodel, data=data) 
         assert 'parent' in dir(model)
         assert model.identifier is None
+
+    def test_compiled_schema(self):
+        from atlasclient.client import Atlas
+        from atlasclient.models import Entity, TypeDef
+        atlas = Atlas('localhost', port=21000, username='admin', password='admin')
+        assert Entity._field_set == frozenset(Entity.fields)
+        assert TypeDef._field_set == frozenset(['empty'])
+        entity = Entity(atlas.search_basic, data={'guid': '1', 'typeName': 'hive_table', 'unknown': 1})
+        assert entity._data == {'guid': '1', 'typeName': 'hive_table'}
+        assert entity.typeName == 'hive_table'
+        # dependent models are slotted, queryable ones keep a __dict__
+        assert not hasattr(entity, '__dict__')
+        assert 'parent' in dir(entity) and 'guid' in dir(entity)
+        entity_guid = atlas.entity_guid('1')
+        entity_guid.searchParameters = {}
+        assert 'searchParameters' in dir(entity_guid)
+
+    def test_load_lock_copies_as_a_new_lock(self):
+        lock = LoadLock()
+        with lock:
+            copied = copy.deepcopy(lock)
+            assert copied is not lock
+            # not held by the copy, another thread can take it
+            thread = threading.Thread(target=lambda: copied.__enter__() and copied.__exit__())
+            thread.start()
+            thread.join(1)
+            assert not thread.is_alive()
+            with lock:
+                pass
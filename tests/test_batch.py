@@ -0,0 +1,124 @@
+import copy
+import threading
+from concurrent import futures
+
+import pytest
+
+from atlasclient import exceptions
+from atlasclient.batch import EntityBatcher
+from atlasclient.client import Atlas
+
+
+@pytest.fixture
+def entities():
+    return {'g%s' % i: {'guid': 'g%s' % i, 'typeName': 'hive_table', 'attributes': {'name': 'table %s' % i}}
+            for i in range(20)}
+
+
+def fake_get(client, entities, calls):
+    bulk_url = client.entity_bulk.url
+    lock = threading.Lock()
+
+    def get(url, params=None):
+        with lock:
+            calls.append((url, list(params['guid']) if url == bulk_url else None))
+        if url == bulk_url:
+            if any(guid not in entities for guid in params['guid']):
+                raise exceptions.NotFound()
+            return {'entities': [entities[guid] for guid in params['guid']], 'referredEntities': {}}
+        guid = url.rsplit('/', 1)[1]
+        if guid not in entities:
+            raise exceptions.NotFound()
+        return {'entity': entities[guid], 'referredEntities': {}}
+    return get
+
+
+class TestBatch(object):
+    def test_batch_block(self, mocker, atlas_client, entities):
+        calls = []
+        mocker.patch.object(atlas_client.client, 'get', side_effect=fake_get(atlas_client, entities, calls))
+        request = mocker.patch.object(atlas_client.client, 'request')
+        guids = ['g%s' % i for i in range(10)]
+        with atlas_client.batch():
+            models = [atlas_client.entity_guid(guid) for guid in guids]
+            names = [model.entity['attributes']['name'] for model in models]
+        assert names == ['table %s' % i for i in range(10)]
+        assert calls == [(atlas_client.entity_bulk.url, guids)]
+        assert not request.called
+        assert atlas_client.batcher() is None
+
+    def test_batch_block_not_found(self, mocker, atlas_client, entities):
+        calls = []
+        mocker.patch.object(atlas_client.client, 'get', side_effect=fake_get(atlas_client, entities, calls))
+        with atlas_client.batch(max_size=2):
+            models = [atlas_client.entity_guid(guid) for guid in ('g1', 'missing', 'g2', 'g3')]
+            assert models[0].entity['guid'] == 'g1'
+            assert models[1].entity is None
+        # the chunk with the missing entity is fetched again GUID by GUID
+        assert [call[1] for call in calls if call[1]] == [['g1', 'missing'], ['g2', 'g3']]
+        assert sorted(url.rsplit('/', 1)[1] for url, guids in calls if guids is None) == ['g1', 'missing']
+        assert models[2].entity['guid'] == 'g2'
+        assert len(calls) == 4
+
+    def test_batch_failure_falls_back(self, mocker, atlas_client, entities):
+        mocker.patch.object(atlas_client.client, 'get', side_effect=exceptions.ServerError())
+        request = mocker.patch.object(atlas_client.client, 'request',
+                                      return_value={'entity': entities['g4'], 'referredEntities': {}})
+        with atlas_client.batch():
+            model = atlas_client.entity_guid('g4')
+            assert model.entity['guid'] == 'g4'
+        request.assert_called_once_with('get', atlas_client.entity_guid.url + '/g4')
+
+    def test_batch_window(self, mocker, entities):
+        client = Atlas('localhost', port=21000, username='admin', password='admin', batch_window=0.5)
+        calls = []
+        mocker.patch.object(client.client, 'get', side_effect=fake_get(client, entities, calls))
+        barrier = threading.Barrier(20)
+
+        def name(guid):
+            model = client.entity_guid(guid)
+            barrier.wait()
+            return model.entity['attributes']['name']
+
+        with futures.ThreadPoolExecutor(max_workers=20) as executor:
+            names = list(executor.map(name, sorted(entities)))
+        assert names == ['table %s' % guid[1:] for guid in sorted(entities)]
+        # all of them within the window, unless the machine is very slow
+        assert len(calls) < 5
+        assert sorted(guid for url, guids in calls for guid in guids or [url.rsplit('/', 1)[1]]) == sorted(entities)
+        assert len(client.batcher()) == 0
+
+    def test_batcher_max_size(self, mocker, atlas_client, entities):
+        calls = []
+        mocker.patch.object(atlas_client.client, 'get', side_effect=fake_get(atlas_client, entities, calls))
+        # a full batch is sent without waiting for the end of the window
+        batcher = EntityBatcher(atlas_client, window=60, max_size=2)
+        loaded = []
+        thread = threading.Thread(target=lambda: loaded.append(batcher.load('g1')))
+        thread.start()
+        while not len(batcher):
+            pass
+        assert batcher.load('g2')['entity']['guid'] == 'g2'
+        thread.join()
+        assert loaded[0]['entity']['guid'] == 'g1'
+        assert calls == [(atlas_client.entity_bulk.url, ['g1', 'g2'])]
+
+    def test_workers_require_thread_safe_client(self, atlas_client):
+        assert EntityBatcher(atlas_client).max_workers == 1
+        with pytest.raises(exceptions.ClientError):
+            with atlas_client.batch(max_workers=4):
+                pass
+        client = Atlas('localhost', port=21000, username='admin', password='admin', thread_safe=True)
+        assert EntityBatcher(client).max_workers == 4
+
+    def test_deepcopy(self, mocker, entities):
+        client = Atlas('localhost', port=21000, username='admin', password='admin', batch_window=0.01)
+        mocker.patch.object(client.client, 'request', return_value={'entity': entities['g1'], 'referredEntities': {}})
+        model = client.entity_guid('g1')
+        assert model.entity['guid'] == 'g1'
+        with client.batch():
+            copied = copy.deepcopy(model)
+        assert copied.entity == model.entity
+        assert copied.client is not client
+        assert copied.client.batcher().window == 0.01
+        assert copy.deepcopy(client.entity_guid).url == client.entity_guid.url
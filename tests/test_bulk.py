@@ -0,0 +1,115 @@
+import json
+import threading
+
+import pytest
+import requests
+
+from atlasclient import exceptions
+from atlasclient.bulk import EntityBulkWriter
+from atlasclient.client import Atlas
+
+
+def entity(i, size=10):
+    return {'guid': '-%s' % (i + 1), 'typeName': 'hive_table',
+            'attributes': {'qualifiedName': 'table%s@cluster' % i, 'description': 'x' * size}}
+
+
+def fake_post(bodies, fail=None):
+    lock = threading.Lock()
+
+    def post(url, data=None, params=None):
+        entities = json.loads(data)['entities']
+        with lock:
+            bodies.append(data)
+        if fail is not None:
+            error = fail(entities)
+            if error is not None:
+                raise error
+        return {'mutatedEntities': {'CREATE': [{'guid': 'g' + e['guid'], 'typeName': e['typeName']}
+                                               for e in entities]},
+                'guidAssignments': {e['guid']: 'g' + e['guid'] for e in entities}}
+    return post
+
+
+class TestEntityBulkWriter(object):
+    def test_write_chunks_by_count(self, mocker, atlas_client):
+        bodies = []
+        mocker.patch.object(atlas_client.client, 'post', side_effect=fake_post(bodies))
+        result = atlas_client.entity_bulk.write((entity(i) for i in range(25)), max_entities=10)
+        assert sorted(len(json.loads(body)['entities']) for body in bodies) == [5, 10, 10]
+        assert result.entities == 25
+        assert result.requests == 3
+        assert result.failed == []
+        assert len(result.mutatedEntities['CREATE']) == 25
+        assert result.guidAssignments == {'-%s' % i: 'g-%s' % i for i in range(1, 26)}
+        url = atlas_client.client.post.call_args[0][0]
+        assert url == atlas_client.entity_bulk.url
+
+    def test_write_chunks_by_size(self, mocker, atlas_client):
+        bodies = []
+        mocker.patch.object(atlas_client.client, 'post', side_effect=fake_post(bodies))
+        entities = [entity(i, size=100 * (i % 7)) for i in range(50)] + [entity(50, size=5000)]
+        result = EntityBulkWriter(atlas_client, max_bytes=2000).write(entities)
+        assert result.entities == 51
+        # only the entity larger than the limit goes over it, on its own
+        assert [len(json.loads(body)['entities']) for body in bodies if len(body) > 2000] == [1]
+        assert sorted(e['guid'] for body in bodies for e in json.loads(body)['entities']) == \
+            sorted(e['guid'] for e in entities)
+        # the encoded entities are joined into the body as-is
+        assert json.loads(bodies[0])['entities'][0] == entities[0]
+
+    def test_write_back_pressure(self, mocker, atlas_client):
+        release = threading.Event()
+        read = []
+
+        def post(url, data=None, params=None):
+            release.wait(5)
+            return {}
+
+        def entities():
+            for i in range(100):
+                read.append(i)
+                yield entity(i)
+
+        client = Atlas('localhost', port=21000, username='admin', password='admin', thread_safe=True)
+        mocker.patch.object(client.client, 'post', side_effect=post)
+        writer = EntityBulkWriter(client, max_entities=5, max_workers=2, max_pending=3)
+        thread = threading.Thread(target=writer.write, args=(entities(),))
+        thread.start()
+        thread.join(0.3)
+        # 3 chunks waiting, the last one closed by reading the first entity of the next one
+        assert len(read) == 16
+        release.set()
+        thread.join()
+        assert len(read) == 100
+
+    def test_write_splits_and_fails(self, mocker, atlas_client):
+        bodies = []
+
+        def fail(entities):
+            if len(entities) > 4:
+                return exceptions.HttpError(code=504)
+            if any(e['guid'] == '-3' for e in entities):
+                return exceptions.BadRequest()
+            if any(e['guid'] == '-20' for e in entities) and len(entities) > 1:
+                return requests.exceptions.ReadTimeout()
+            return None
+
+        mocker.patch.object(atlas_client.client, 'post', side_effect=fake_post(bodies, fail))
+        result = atlas_client.entity_bulk.write([entity(i) for i in range(20)], max_entities=10, max_workers=1)
+        # the chunk with -3 is split down to 3 entities, which fail together
+        assert len(result.failed) == 1
+        failed_entities, error = result.failed[0]
+        assert isinstance(error, exceptions.BadRequest)
+        assert [e['guid'] for e in failed_entities] == ['-3', '-4', '-5']
+        assert result.entities == 17
+        assert sorted(result.guidAssignments) == sorted('-%s' % i for i in range(1, 21) if not 3 <= i <= 5)
+        # -18 to -20 timed out, and then -19 and -20, before being sent one by one
+        assert [len(json.loads(body)['entities']) for body in bodies].count(1) == 3
+
+    def test_workers_require_thread_safe_client(self, atlas_client):
+        assert EntityBulkWriter(atlas_client).max_workers == 1
+        with pytest.raises(exceptions.ClientError):
+            EntityBulkWriter(atlas_client, max_workers=4)
+        client = Atlas('localhost', port=21000, username='admin', password='admin', thread_safe=True)
+        assert EntityBulkWriter(client).max_workers == 4
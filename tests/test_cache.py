@@ -0,0 +1,103 @@
+import copy
+import pickle
+import time
+
+import pytest
+
+from atlasclient import exceptions
+from atlasclient.cache import ResponseCache, resource_family
+from atlasclient.client import Atlas
+from tests.test_client import make_response
+
+BASE = 'http://localhost:21000/api/atlas/v2/'
+
+
+class TestResponseCache():
+
+    def test_resource_family(self):
+        assert resource_family(BASE + 'entity/guid/1234') == BASE + 'entity'
+        assert resource_family(BASE + 'types/typedefs?type=entity') == BASE + 'types'
+        assert resource_family('http://localhost:21000/api/atlas/admin/version') == \
+            'http://localhost:21000/api/atlas/admin'
+
+    def test_key_ignores_param_order(self):
+        assert ResponseCache.key('get', BASE, {'a': 1, 'b': [1, 2]}) == \
+            ResponseCache.key('get', BASE, [('b', [1, 2]), ('a', 1)])
+
+    def test_ttl(self):
+        cache = ResponseCache(ttl=0.05, ttls={'types/': 10, 'types/typedefs/headers': 0})
+        assert cache.ttl_for(BASE + 'types/typedef/name/hive_table') == 10
+        assert cache.ttl_for(BASE + 'types/typedefs/headers') == 0
+        key = cache.key('get', BASE + 'entity/guid/1')
+        cache.put(key, BASE + 'entity/guid/1', b'{}', 'application/json')
+        assert cache.get(key) == (b'{}', 'application/json')
+        time.sleep(0.06)
+        assert cache.get(key) is None
+        assert cache.stats() == {'hits': 1, 'misses': 1, 'evictions': 0, 'entries': 0, 'bytes': 0}
+
+    def test_lru(self):
+        cache = ResponseCache(max_bytes=10)
+        for guid in ('1', '2', '3'):
+            cache.put(cache.key('get', BASE + guid), BASE + guid, b'1234', 'application/json')
+        assert cache.get(cache.key('get', BASE + '1')) is None
+        assert cache.get(cache.key('get', BASE + '3')) is not None
+        assert cache.stats()['evictions'] == 1
+        assert cache.stats()['bytes'] == 8
+
+    def test_stale_generation(self):
+        cache = ResponseCache()
+        key = cache.key('get', BASE + 'entity/guid/1')
+        generation = cache.generation
+        cache.invalidate_written(BASE + 'entity/guid/1')
+        cache.put(key, BASE + 'entity/guid/1', b'{}', 'application/json', generation=generation)
+        assert cache.get(key) is None
+
+    def test_pickle(self):
+        cache = ResponseCache(max_bytes=100, ttl=10, ttls={'types/': 3600, 'search/': 0})
+        cache.put(cache.key('get', BASE + '1'), BASE + '1', b'1234', 'application/json')
+        copied = pickle.loads(pickle.dumps(cache))
+        assert copied.ttl_for(BASE + 'types/typedefs') == 3600
+        assert copied.ttl_for(BASE + 'search/basic') == 0
+        assert copied.max_bytes == 100
+        # the entries are not copied
+        assert copied.stats()['entries'] == 0
+        assert cache.stats()['entries'] == 1
+
+
+class TestClientCache():
+
+    def test_cached_get(self, mocker):
+        client = Atlas('localhost', port=21000, username='admin', password='admin', cache=True)
+        mocker.patch.object(client.client.session, 'get', return_value=make_response(b'{"guid": "1"}'))
+        first = client.client.get(BASE + 'entity/guid/1', params={'minExtInfo': 'true'})
+        first['guid'] = 'modified'
+        assert client.client.get(BASE + 'entity/guid/1', params={'minExtInfo': 'true'}) == {'guid': '1'}
+        assert client.client.session.get.call_count == 1
+        client.client.get(BASE + 'entity/guid/1')
+        assert client.client.session.get.call_count == 2
+        assert client.cache.stats()['hits'] == 1
+
+    def test_deepcopy_client(self):
+        client = Atlas('localhost', port=21000, username='admin', password='admin', cache=True)
+        copied = copy.deepcopy(client.entity_guid('1'))
+        assert copied.client.client.cache is not client.client.cache
+        assert copied.client.client.cache.ttl == client.client.cache.ttl
+
+    def test_write_invalidates(self, mocker):
+        client = Atlas('localhost', port=21000, username='admin', password='admin', cache=True)
+        mocker.patch.object(client.client.session, 'get', return_value=make_response(b'{"guid": "1"}'))
+        mocker.patch.object(client.client.session, 'put', return_value=make_response())
+        client.client.get(BASE + 'entity/guid/1')
+        client.client.get(BASE + 'types/typedef/name/hive_table')
+        client.client.put(BASE + 'entity/guid/1', data={'guid': '1'})
+        client.client.get(BASE + 'entity/guid/1')
+        client.client.get(BASE + 'types/typedef/name/hive_table')
+        assert client.client.session.get.call_count == 3
+
+    def test_errors_are_not_cached(self, mocker):
+        client = Atlas('localhost', port=21000, username='admin', password='admin', cache=True)
+        mocker.patch.object(client.client.session, 'get', return_value=make_response(status_code=404))
+        for _ in range(2):
+            with pytest.raises(exceptions.NotFound):
+                client.client.get(BASE + 'entity/guid/1')
+        assert client.client.session.get.call_count == 2
@@ -1,4 +1,27 @@
-from atlasclient.client import Atlas
+try:
+    from mock import MagicMock
+except ImportError:
+    from unittest.mock import MagicMock
+
+import copy
+import io
+import json
+import pickle
+
+import pytest
+import requests
+
+from atlasclient import codec, exceptions
+from atlasclient.client import Atlas, AtlasJsonEncoder
+from atlasclient.models import Entity
+
+
+def make_response(content=b'', status_code=200, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = content
+    response.headers = headers if headers is not None else {'content-type': 'application/json'}
+    return response
 
 
 class TestClient():
@@ -12,3 +35,152 @@ class TestClient():
 
     def test_http_client(self):
         pass
+
+    def test_forwarded_attributes(self):
+        client = Atlas('localhost', port=21000, username='admin', password='admin', cache=True)
+        assert client.json_codec is client.client.json_codec
+        assert client.cache is client.client.cache
+        assert client.pool_stats() == client.client.pool_stats()
+        assert client.get.func == client.client.request
+        for attr in ('session', 'request_params', 'set_header', '_session_id'):
+            with pytest.raises(AttributeError):
+                getattr(client, attr)
+
+    def test_response_parsed_once_from_bytes(self, mocker):
+        client = Atlas('localhost', port=21000, username='admin', password='admin')
+        response = make_response(b'{"guid": "1234"}')
+        mocker.patch.object(client.client.session, 'get', return_value=response)
+        assert client.client.get('http://localhost:21000/api/atlas/v2/entity/guid/1234') == {'guid': '1234'}
+        response.json.assert_not_called()
+
+    def test_empty_response(self, mocker):
+        client = Atlas('localhost', port=21000, username='admin', password='admin')
+        mocker.patch.object(client.client.session, 'delete', return_value=make_response(status_code=204))
+        assert client.client.delete('http://localhost:21000/api/atlas/v2/entity/guid/1234') == {}
+
+    def test_bytes_payload_sent_unchanged(self, mocker):
+        client = Atlas('localhost', port=21000, username='admin', password='admin', json_codec='json')
+        mocker.patch.object(client.client.session, 'post', return_value=make_response())
+        client.client.post('http://localhost:21000/api/atlas/v2/entity', data=b'{"entity": {}}')
+        assert client.client.session.post.call_args[1]['data'] == b'{"entity": {}}'
+
+    def test_per_request_headers_do_not_leak(self, mocker):
+        client = Atlas('localhost', port=21000, username='admin', password='admin')
+        mocker.patch.object(client.client.session, 'get', return_value=make_response())
+        url = 'http://localhost:21000/api/atlas/v2/entity/guid/1234'
+        client.client.get(url, headers={'X-Trace': '1'}, content_type='text/plain')
+        headers = client.client.session.get.call_args[1]['headers']
+        assert headers['X-Trace'] == '1'
+        assert headers['Content-type'] == 'text/plain'
+        client.client.get(url)
+        headers = client.client.session.get.call_args[1]['headers']
+        assert 'X-Trace' not in headers
+        assert headers['Content-type'] == 'application/json'
+        assert 'Content-type' not in client.client.request_params['headers']
+
+    def test_set_header(self, mocker):
+        client = Atlas('localhost', port=21000, username='admin', password='admin')
+        mocker.patch.object(client.client.session, 'get', return_value=make_response())
+        url = 'http://localhost:21000/api/atlas/v2/entity/guid/1234'
+        client.client.get(url)
+        client.client.set_header('Authorization', 'Bearer token')
+        client.client.get(url)
+        assert client.client.session.get.call_args[1]['headers']['Authorization'] == 'Bearer token'
+
+    def test_session_auth(self, mocker):
+        client = Atlas('localhost', port=21000, username='admin', password='admin', session_auth=True)
+        session = client.client.session
+        responses = [make_response(), make_response(), make_response(status_code=401),
+                     make_response(), make_response()]
+
+        def get(url, **kwargs):
+            response = responses.pop(0)
+            if 'Authorization' in kwargs['headers']:
+                session.cookies.set('ATLASSESSIONID', 'session-%d' % len(responses))
+            return response
+
+        mocker.patch.object(session, 'get', side_effect=get)
+        url = 'http://localhost:21000/api/atlas/v2/entity/guid/1234'
+        client.client.get(url)
+        client.client.get(url)
+        sent = [call[1]['headers'] for call in session.get.call_args_list]
+        assert 'Authorization' in sent[0]
+        assert 'Authorization' not in sent[1]
+        # the session expired: authenticate again, then go back to the new cookie
+        client.client.get(url)
+        client.client.get(url)
+        sent = [call[1]['headers'] for call in session.get.call_args_list]
+        assert 'Authorization' not in sent[2]
+        assert 'Authorization' in sent[3]
+        assert 'Authorization' not in sent[4]
+        assert client.client._session_id == 'session-1'
+
+    def test_session_auth_unauthorized(self, mocker):
+        client = Atlas('localhost', port=21000, username='admin', password='wrong', session_auth=True)
+        mocker.patch.object(client.client.session, 'get', return_value=make_response(status_code=401))
+        with pytest.raises(exceptions.Unauthorized):
+            client.client.get('http://localhost:21000/api/atlas/v2/entity/guid/1234')
+        assert client.client.session.get.call_count == 1
+
+    @pytest.mark.parametrize('thread_safe', [False, True])
+    def test_pickle_http_client(self, thread_safe):
+        client = Atlas('localhost', port=21000, username='admin', password='admin',
+                       session_auth=True, thread_safe=thread_safe)
+        client.client._session_id = 'session-1'
+        http_client = pickle.loads(pickle.dumps(client.client))
+        assert http_client._session_id == 'session-1'
+        assert http_client.request_params == client.client.request_params
+        with http_client._session_lock:
+            http_client._header_templates = {}
+        assert http_client.session.get_adapter(client.base_url) is http_client.adapter
+        assert copy.deepcopy(client.client).session is not client.client.session
+
+    @pytest.mark.parametrize('thread_safe', [False, True])
+    def test_set_session(self, mocker, thread_safe):
+        client = Atlas('localhost', port=21000, username='admin', password='admin', thread_safe=thread_safe)
+        previous = client.client.session
+        session = requests.Session()
+        session.verify = '/path/to/ca.pem'
+        client.client.session = session
+        assert client.client.session is not previous
+        assert client.client.session.verify == '/path/to/ca.pem'
+        mocker.patch.object(client.client.session, 'get', return_value=make_response())
+        client.entity_guid('g1').entity
+        assert client.client.session.get.called
+
+    def test_iter_items(self, mocker):
+        pytest.importorskip('ijson')
+        client = Atlas('localhost', port=21000, username='admin', password='admin')
+        response = make_response()
+        response.raw = io.BytesIO(b'{"entities": [{"guid": "1"}, {"guid": "2", "version": 1.5}], '
+                                  b'"referredEntities": {}}')
+        response.__enter__.return_value = response
+        mocker.patch.object(client.client.session, 'get', return_value=response)
+        items = client.iter_items('get', 'http://localhost:21000/api/atlas/v2/entity/bulk',
+                                  params={'guid': ['1', '2']})
+        assert list(items) == [{'guid': '1'}, {'guid': '2', 'version': 1.5}]
+        assert client.client.session.get.call_args[1]['stream'] is True
+        response.json.assert_not_called()
+
+
+class TestCodec():
+
+    @pytest.mark.parametrize('name', [name for name, (_, library) in codec.CODECS.items() if library])
+    def test_round_trip(self, name):
+        json_codec = codec.get_codec(name)
+        data = {'entities': [{'guid': '1234', 'attributes': {'name': u'näme'}}]}
+        assert json_codec.loads(json_codec.dumps(data)) == data
+
+    def test_atlas_json_encoder(self):
+        client = Atlas('localhost', port=21000, username='admin', password='admin', json_codec='json')
+        entity = Entity(client.entity_bulk, data={'guid': '1234', 'typeName': 'hive_table'})
+        assert json.dumps({'entity': entity}, cls=AtlasJsonEncoder) == client.json_codec.dumps({'entity': entity})
+        with pytest.raises(TypeError):
+            json.dumps(object(), cls=AtlasJsonEncoder)
+
+    def test_default_codec(self):
+        assert codec.get_codec().name in codec.CODECS
+
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError):
+            codec.get_codec('yaml')
@@ -0,0 +1,79 @@
+from dataclasses import asdict
+
+from atlasclient.client import Atlas
+from atlasclient.data_types import AtlasRelatedObjectId, AtlasStruct, construct, serialize
+from atlasclient.glossary.data_types import AtlasGlossaryExtInfo, AtlasGlossaryHeader, AtlasGlossaryTerm
+
+TERM = {
+    'guid': '1',
+    'qualifiedName': 'customer@sales',
+    'name': 'customer',
+    'anchor': {'glossaryGuid': '2', 'relationGuid': '3'},
+    'assignedEntities': [{'guid': '4', 'typeName': 'hive_table', 'displayText': 'customers',
+                          'relationshipAttributes': {'typeName': 'AtlasGlossarySemanticAssignment',
+                                                     'attributes': {'confidence': 100}}}],
+    'synonyms': [{'termGuid': '5', 'displayText': 'client'}],
+    'examples': ['ACME'],
+}
+
+
+class TestConstruct():
+
+    def test_same_as_validated(self):
+        term = construct(AtlasGlossaryTerm, TERM)
+        assert term == AtlasGlossaryTerm(**TERM)
+        assert isinstance(term.anchor, AtlasGlossaryHeader)
+        assert isinstance(term.assignedEntities[0], AtlasRelatedObjectId)
+        assert isinstance(term.assignedEntities[0].relationshipAttributes, AtlasStruct)
+        assert term.abbreviation is None
+        assert term.to_dict() == AtlasGlossaryTerm(**TERM).to_dict()
+
+    def test_mapping_and_unknown_keys(self):
+        glossary = {'guid': '2', 'name': 'sales', 'termInfo': {'1': TERM}}
+        ext_info = construct(AtlasGlossaryExtInfo, dict(glossary, unknown='ignored'))
+        assert isinstance(ext_info.termInfo['1'], AtlasGlossaryTerm)
+        assert ext_info == AtlasGlossaryExtInfo(**glossary)
+        assert not hasattr(ext_info, 'unknown')
+
+    def test_load_without_validation(self, mocker):
+        atlas = Atlas('localhost', port=21000, username='admin', password='admin', validate_responses=False)
+        validate = mocker.patch('atlasclient.glossary.data_types.AtlasGlossaryTerm.__post_init__')
+        mocker.patch.object(atlas.client, 'request', return_value=dict(TERM))
+        term = atlas.glossary_term('1')
+        assert term.name == 'customer'
+        assert term.assignedEntities[0].guid == '4'
+        validate.assert_not_called()
+
+
+def reference_to_dict(instance, ignore_falsy):
+    """What to_dict returned when it was built on dataclasses.asdict()."""
+    def drop_falsy(data):
+        return {key: drop_falsy(value) if isinstance(value, dict) else value
+                for key, value in data.items()
+                if isinstance(value, dict) or not ignore_falsy or value}
+    return drop_falsy(asdict(instance))
+
+
+class TestSerialize():
+
+    def test_same_as_asdict(self):
+        term = AtlasGlossaryTerm(**dict(TERM, additionalAttributes={'owner': None, 'nested': {'empty': ''}},
+                                        synonyms=[{'termGuid': '5', 'displayText': ''}], isA=[]))
+        for ignore_falsy in (False, True):
+            assert serialize(term, ignore_falsy) == reference_to_dict(term, ignore_falsy)
+
+    def test_ignore_falsy(self):
+        term = AtlasGlossaryTerm(**TERM)
+        data = term.to_dict(data_key='term', ignore_falsy=True)
+        assert data['term']['anchor'] == {'glossaryGuid': '2', 'relationGuid': '3'}
+        assert 'abbreviation' not in data['term']
+        # the items of lists are kept whole
+        assert data['term']['synonyms'][0]['status'] is None
+
+    def test_copies(self):
+        term = AtlasGlossaryTerm(**dict(TERM, additionalAttributes={'tags': ['a']}))
+        data = term.to_dict()
+        data['additionalAttributes']['tags'].append('b')
+        data['examples'].append('other')
+        assert term.additionalAttributes == {'tags': ['a']}
+        assert term.examples == ['ACME']
@@ -0,0 +1,83 @@
+import threading
+import time
+from concurrent import futures
+
+from atlasclient.client import Atlas
+from atlasclient.data_types import AtlasRelatedTermHeader
+from atlasclient.glossary.data_types import AtlasGlossary, AtlasGlossaryExtInfo, AtlasGlossaryTerm
+from atlasclient.glossary.models import Glossary, GlossaryTerms
+
+BASE_URL = 'http://localhost:21000/api/atlas/v2/glossary'
+
+
+def make_atlas():
+    return Atlas('localhost', port=21000, username='admin', password='admin')
+
+
+class TestGlossary():
+
+    def test_fetch_terms(self, mocker):
+        atlas = make_atlas()
+        mocker.patch.object(atlas.client, 'get', return_value=[{'guid': 't1', 'name': 'customer'}])
+        terms = atlas.glossary.fetch_terms(glossary_guid='g1')
+        atlas.client.get.assert_called_with(BASE_URL + '/g1/terms', params={})
+        term = list(terms)[0]
+        assert isinstance(term.data_class_data, AtlasGlossaryTerm)
+        assert term.name == 'customer'
+        # the model class is left alone
+        assert Glossary.path == 'glossary'
+        assert Glossary.data_class is AtlasGlossary
+
+    def test_fetch_terms_headers(self, mocker):
+        atlas = make_atlas()
+        mocker.patch.object(atlas.client, 'get', return_value=[{'termGuid': 't1', 'displayText': 'customer'}])
+        terms = atlas.glossary.fetch_terms_headers(glossary_guid='g1')
+        atlas.client.get.assert_called_with(BASE_URL + '/g1/terms/headers', params={})
+        assert isinstance(list(terms)[0].data_class_data, AtlasRelatedTermHeader)
+        assert Glossary.data_class is AtlasGlossary
+
+    def test_assign_entities(self, mocker):
+        atlas = make_atlas()
+        mocker.patch.object(atlas.client, 'post', return_value=[])
+        atlas.glossary_terms.assign_entities(term_guid='t1', data=[{'guid': 'e1', 'typeName': 'hive_table'}])
+        atlas.client.post.assert_called_with(BASE_URL + '/terms/t1/assignedEntities',
+                                             data=[{'guid': 'e1', 'typeName': 'hive_table'}])
+        assert GlossaryTerms.path == 'glossary/terms'
+        assert GlossaryTerms.data_class is AtlasGlossaryTerm
+
+    def test_detailed_and_partial_update(self, mocker):
+        atlas = make_atlas()
+        mocker.patch.object(atlas.client, 'get', return_value={'guid': 'g1', 'termInfo': {}})
+        mocker.patch.object(atlas.client, 'put', return_value={'guid': 'g1', 'language': 'English'})
+        glossary = atlas.glossary('g1').detailed()
+        atlas.client.get.assert_called_with(BASE_URL + '/g1/detailed')
+        assert isinstance(glossary.data_class_data, AtlasGlossaryExtInfo)
+        glossary.partial_update(language='English')
+        atlas.client.put.assert_called_with(BASE_URL + '/g1/partial', data={'language': 'English'})
+        assert glossary.url == BASE_URL + '/g1'
+
+    def test_concurrent_fetches(self, mocker):
+        atlas = make_atlas()
+        lock = threading.Lock()
+        requested = []
+
+        def get(url, params=None):
+            time.sleep(0.001)
+            with lock:
+                requested.append(url)
+            guid = url[len(BASE_URL) + 1:].split('/')[0]
+            return [{'termGuid': guid}] if url.endswith('/headers') else [{'guid': guid}]
+
+        mocker.patch.object(atlas.client, 'get', side_effect=get)
+
+        def crawl(index):
+            guid = 'g%s' % index
+            if index % 2:
+                return guid, [t.termGuid for t in atlas.glossary.fetch_terms_headers(glossary_guid=guid)]
+            return guid, [t.guid for t in atlas.glossary.fetch_terms(glossary_guid=guid)]
+
+        with futures.ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(crawl, range(200)))
+        assert all(terms == [guid] for guid, terms in results)
+        assert sorted(requested) == sorted(BASE_URL + '/g%s/terms%s' % (i, '/headers' if i % 2 else '')
+                                           for i in range(200))
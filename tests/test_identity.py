@@ -0,0 +1,77 @@
+import copy
+import gc
+import pickle
+
+from atlasclient.client import Atlas
+from atlasclient.identity import IdentityMap, merge_data
+from atlasclient.models import Entity
+
+
+def search_response(*entities):
+    return {'queryType': 'BASIC', 'entities': list(entities)}
+
+
+class TestIdentityMap():
+
+    def test_merge_data(self):
+        attributes = {'name': 'table', 'owner': 'admin'}
+        data = {'guid': '1', 'attributes': attributes, 'version': 1}
+        merge_data(data, {'attributes': {'owner': 'etl'}, 'version': 2})
+        assert data == {'guid': '1', 'attributes': {'name': 'table', 'owner': 'etl'}, 'version': 2}
+        # the dictionaries of the responses are left alone
+        assert attributes == {'name': 'table', 'owner': 'admin'}
+
+    def test_one_entity_per_guid(self, mocker):
+        atlas = Atlas('localhost', port=21000, username='admin', password='admin', identity_map=True)
+        mocker.patch.object(atlas, 'get', side_effect=[
+            search_response({'guid': '1', 'typeName': 'hive_table', 'attributes': {'name': 'a'}}),
+            search_response({'guid': '1', 'attributes': {'owner': 'etl'}}, {'guid': '2'}),
+        ])
+        mocker.patch('atlasclient.base.QueryableModelCollection.check_version')
+        first = [e for s in atlas.search_basic(typeName='hive_table') for e in s.entities]
+        second = [e for s in atlas.search_basic(query='etl') for e in s.entities]
+        assert second[0] is first[0]
+        assert first[0].typeName == 'hive_table'
+        assert first[0].attributes == {'name': 'a', 'owner': 'etl'}
+        assert second[1] is not first[0]
+
+    def test_entity_guid_inflates_once(self, mocker):
+        atlas = Atlas('localhost', port=21000, username='admin', password='admin', identity_map=True)
+        mocker.patch.object(atlas.client, 'request', return_value={'entity': {'guid': '1'}, 'referredEntities': {}})
+        entity = atlas.entity_guid('1')
+        assert atlas.entity_guid('1') is entity
+        entity.entity
+        atlas.entity_guid('1').entity
+        assert atlas.client.request.call_count == 1
+
+    def test_without_identity_map(self, mocker):
+        atlas = Atlas('localhost', port=21000, username='admin', password='admin')
+        assert atlas.entity_guid('1') is not atlas.entity_guid('1')
+
+    def test_weak_references(self):
+        atlas = Atlas('localhost', port=21000, username='admin', password='admin')
+        identity_map = IdentityMap()
+        entity = identity_map.model(Entity, atlas.search_basic, {'guid': '1'})
+        assert identity_map.get(Entity, '1') is entity
+        del entity
+        gc.collect()
+        assert len(identity_map) == 0
+
+    def test_deepcopy(self, mocker):
+        atlas = Atlas('localhost', port=21000, username='admin', password='admin', identity_map=True)
+        mocker.patch.object(atlas.client, 'request', return_value={'entity': {'guid': '1'}, 'referredEntities': {}})
+        entity = atlas.entity_guid('1')
+        entity.entity
+        copied = copy.deepcopy(entity)
+        assert copied.entity == {'guid': '1'}
+        identity_map = copied.client.identity_map
+        assert identity_map is not atlas.identity_map
+        assert len(identity_map) == 0
+        assert copied.client.entity_guid('1') is copied.client.entity_guid('1')
+        assert len(pickle.loads(pickle.dumps(atlas.identity_map))) == 0
+
+    def test_shared_identity_map(self):
+        identity_map = IdentityMap()
+        first = Atlas('localhost', port=21000, username='admin', password='admin', identity_map=identity_map)
+        second = Atlas('localhost', port=21000, username='admin', password='admin', identity_map=identity_map)
+        assert first.entity_guid('1') is second.entity_guid('1')
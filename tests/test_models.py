@@ -1,9 +1,10 @@
 from pytest_mock import mocker
 from pkg_resources import resource_filename
 import json
+import threading
 import pytest
 
-from atlasclient import client
+from atlasclient import client, models
 from atlasclient import exceptions
 GUID = '8bbea92b-d98c-4613-ae6e-1a9d0b4f344b'
 RESPONSE_JSON_DIR = 'response_json'
@@ -145,6 +146,16 @@ class TestEntityREST():
             for entity in bulk.entities:
                 assert entity.version == 12345
 
+    def test_entity_bulk_iter_entities(self, mocker, atlas_client, entity_bulk_response):
+        mocker.patch.object(atlas_client.client, 'iter_items')
+        atlas_client.client.iter_items.return_value = iter(entity_bulk_response['entities'])
+        params = {'guid': [GUID, '92b3a92b-d98c-4613-ae6e-1a9d0b4f344b']}
+        bulk_collection = atlas_client.entity_bulk(**params)
+        for entity in bulk_collection.iter_entities():
+            assert entity.version == 12345
+        atlas_client.client.iter_items.assert_called_with('get', bulk_collection.url,
+                                                          prefix='entities.item', params=params)
+
     def test_entity_bulk_get_with_relationships(self, mocker, atlas_client, entity_bulk_response):
         mocker.patch.object(atlas_client.client, 'get')
         atlas_client.entity_bulk.client.get.return_value =  entity_bulk_response
@@ -237,7 +248,58 @@ class TestEntityREST():
         entity_guid.classifications.client.put.assert_called_with(entity_guid.classifications.url, 
                                                                   data=[{'typeName': 'Confidential'}, {'typeName': None}])
         
-         
+    def test_entity_guid_fetch_many(self, mocker, atlas_client):
+        bulk_url = atlas_client.entity_bulk.url
+        existing = {'g%s' % i: {'guid': 'g%s' % i, 'typeName': 'hive_table'} for i in range(10)}
+
+        def get(url, params=None):
+            if url == bulk_url:
+                if 'missing' in params['guid']:
+                    raise exceptions.NotFound()
+                # deleted entities can be left out of the response
+                return {'entities': [existing[guid] for guid in params['guid'] if guid != 'g7'],
+                        'referredEntities': {}}
+            guid = url.rsplit('/', 1)[1]
+            if guid not in existing:
+                raise exceptions.NotFound()
+            return {'entity': existing[guid], 'referredEntities': {}}
+
+        mocker.patch.object(atlas_client.client, 'get', side_effect=get)
+        guids = ['g3', 'missing', 'g0', 'g7'] + ['g%s' % i for i in range(10)] + ['g3']
+        entities, not_found = atlas_client.entity_guid.fetch_many(guids, chunk_size=4)
+        assert not_found == ['missing']
+        assert entities[1] is None
+        assert [e.entity['guid'] for e in entities if e is not None] == [g for g in guids if g != 'missing']
+        assert entities[0] is entities[-1]
+        assert entities[0].url == atlas_client.entity_guid.url + '/g3'
+
+        calls = [call[0][0] for call in atlas_client.client.get.call_args_list]
+        # 11 unique GUIDs in 3 chunks, the one with the missing GUID and the deleted one fetched one by one
+        assert calls.count(bulk_url) == 3
+        assert sorted(url.rsplit('/', 1)[1] for url in calls if url != bulk_url) == ['g0', 'g3', 'g7', 'missing']
+
+    def test_entity_guid_fetch_many_threads(self, mocker, atlas_client):
+        threads = set()
+
+        def get(url, params=None):
+            threads.add(threading.get_ident())
+            return {'entities': [{'guid': guid} for guid in params['guid']], 'referredEntities': {}}
+
+        mocker.patch.object(atlas_client.client, 'get', side_effect=get)
+        guids = ['g%s' % i for i in range(10)]
+        entities, not_found = atlas_client.entity_guid.fetch_many(guids, chunk_size=2)
+        assert not not_found
+        # the session of a client which is not thread-safe is only used by the calling thread
+        assert threads == {threading.get_ident()}
+        with pytest.raises(exceptions.ClientError):
+            atlas_client.entity_guid.fetch_many(guids, max_workers=4)
+
+        thread_safe_client = client.Atlas('localhost', port=21000, username='admin', password='admin', thread_safe=True)
+        mocker.patch.object(thread_safe_client.client, 'get', side_effect=get)
+        entities, not_found = thread_safe_client.entity_guid.fetch_many(guids, chunk_size=2, max_workers=8)
+        assert [e.entity['guid'] for e in entities] == guids
+
+
 class TestTypeDefs():
     def test_typedefs_get(self, mocker, atlas_client, typedefs_response):
         mocker.patch.object(atlas_client.client, 'request')
@@ -499,6 +561,56 @@ class TestDiscoveryREST():
                 assert e.attributes['property1'] == {}
             assert s.flatten_attrs() == ['12', '34', '56']
 
+    def test_search_entities_lazy(self, mocker, atlas_client, search_attribute_response):
+        mocker.patch.object(atlas_client.search_basic.client, 'get')
+        atlas_client.search_basic.client.get.return_value = dict(
+            search_attribute_response, entities=[{'guid': str(g), 'typeName': 'hive_table'} for g in range(1000)])
+        build = mocker.spy(models.Entity, '__init__')
+        for s in atlas_client.search_basic(typeName='hive_table'):
+            entities = s.entities
+            assert len(entities) == 1000
+            assert entities.guids()[:3] == ['0', '1', '2']
+            assert build.call_count == 0
+            assert entities[-1].guid == '999'
+            assert [e.guid for e in entities[10:13]] == ['10', '11', '12']
+            assert build.call_count == 4
+            first = entities[0]
+            assert entities[0] is first
+            assert sum(1 for _ in entities) == 1000
+
+    def test_search_basic_stream(self, mocker, atlas_client, search_attribute_response):
+        mocker.patch.object(atlas_client.search_basic.client, 'get')
+        first_page = dict(search_attribute_response,
+                          entities=[{'guid': '1'}, {'guid': '2'}])
+        last_page = dict(search_attribute_response, entities=[{'guid': '3'}])
+        atlas_client.search_basic.client.get.side_effect = [first_page, last_page]
+        search_results = atlas_client.search_basic(typeName='hive_table', offset='10')
+        guids = [e.guid for e in search_results.stream(page_size=2)]
+        assert guids == ['1', '2', '3']
+        assert atlas_client.search_basic.client.get.call_count == 2
+        atlas_client.search_basic.client.get.assert_called_with(
+            search_results.url, params={'typeName': 'hive_table', 'offset': 12, 'limit': 2})
+        assert search_results._models == []
+
+    def test_search_dsl_stream_prefetch(self, mocker, atlas_client, search_attribute_response):
+        def search_page(url, params):
+            offset = params['offset']
+            total = 7
+            guids = range(offset, min(offset + params['limit'], total))
+            return dict(search_attribute_response, entities=[{'guid': str(g)} for g in guids])
+
+        # the pages are fetched by several threads sharing the session of the client
+        with pytest.raises(exceptions.ClientError):
+            next(atlas_client.search_dsl(query='hive_table').stream(page_size=2, prefetch=3))
+        thread_safe_client = client.Atlas('localhost', port=21000, username='admin', password='admin',
+                                          thread_safe=True)
+        mocker.patch.object(thread_safe_client.client, 'get', side_effect=search_page)
+        search_results = thread_safe_client.search_dsl(query='hive_table')
+        guids = [e.guid for e in search_results.stream(page_size=2, prefetch=3)]
+        assert guids == [str(g) for g in range(7)]
+        # 4 pages are needed, at most 3 more may be requested past the end
+        assert 4 <= thread_safe_client.client.get.call_count <= 7
+
     def test_search_fulltext_get(self, mocker, atlas_client, search_attribute_response):
         mocker.patch.object(atlas_client.search_fulltext.client, 'get')
         search_attribute_response['queryType'] = 'ATTRIBUTE'
@@ -0,0 +1,72 @@
+import copy
+import pickle
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from atlasclient.client import Atlas
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"guid": "1234"}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def atlas_server():
+    server = ThreadingHTTPServer(('localhost', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield 'http://localhost:{}'.format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+class TestPool():
+    def test_pool_settings(self):
+        client = Atlas('localhost', port=21000, username='admin', password='admin',
+                       pool_connections=4, pool_maxsize=64, pool_block=True)
+        adapter = client.client.session.get_adapter('http://localhost:21000/api/atlas/v2')
+        assert adapter is client.client.adapter
+        assert adapter._pool_maxsize == 64
+        assert adapter._pool_block is True
+
+    def test_pickle_adapter(self):
+        client = Atlas('localhost', port=21000, username='admin', password='admin',
+                       pool_maxsize=64, pool_idle_timeout=30)
+        client.client.adapter.stats.incr('created')
+        adapter = pickle.loads(pickle.dumps(client.client.adapter))
+        assert adapter.idle_timeout == 30
+        assert adapter._pool_maxsize == 64
+        assert adapter.stats.as_dict()['created'] == 1
+        session = copy.deepcopy(client.client.session)
+        assert isinstance(session.get_adapter('http://localhost:21000/api/atlas/v2'), type(adapter))
+
+    def test_connections_are_reused(self, atlas_server):
+        client = Atlas(atlas_server, username='admin', password='admin')
+        for _ in range(5):
+            assert client.client.get(atlas_server + '/api/atlas/v2/entity/guid/1234') == {'guid': '1234'}
+        stats = client.pool_stats()
+        assert stats['created'] == 1
+        assert stats['reused'] == 4
+
+    def test_idle_connections_are_evicted(self, atlas_server):
+        client = Atlas(atlas_server, username='admin', password='admin', pool_idle_timeout=0.01)
+        client.client.get(atlas_server + '/api/atlas/v2/entity/guid/1234')
+        time.sleep(0.05)
+        assert client.client.get(atlas_server + '/api/atlas/v2/entity/guid/1234') == {'guid': '1234'}
+        stats = client.pool_stats()
+        assert stats['evicted'] == 1
+        assert stats['reused'] == 0
@@ -0,0 +1,98 @@
+import copy
+import pickle
+import time
+from email.utils import formatdate
+
+import pytest
+
+from atlasclient import exceptions
+from atlasclient.client import Atlas
+from atlasclient.ratelimit import AdaptiveRateLimiter, parse_retry_after
+from tests.test_client import make_response
+
+URL = 'http://localhost:21000/api/atlas/v2/entity/guid/1234'
+
+
+class TestRateLimiter():
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after('3') == 3.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after('soon') is None
+        assert 8 < parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+
+    def test_acquire_limits_rate(self):
+        limiter = AdaptiveRateLimiter(rate=100, burst=1)
+        start = time.monotonic()
+        for _ in range(11):
+            limiter.acquire()
+        assert time.monotonic() - start >= 0.09
+
+    def test_aimd(self):
+        limiter = AdaptiveRateLimiter(rate=10, min_rate=1, max_rate=20, increase=1)
+        for _ in range(10):
+            limiter.success()
+        assert 10.9 < limiter.rate < 11
+        limiter.overloaded('0')
+        assert 5.4 < limiter.rate < 5.5
+        # concurrent rejections are a single overload
+        limiter.overloaded('0')
+        assert 5.4 < limiter.rate < 5.5
+
+    def test_overloaded_pauses(self):
+        limiter = AdaptiveRateLimiter(rate=1000)
+        limiter.overloaded('0.1')
+        start = time.monotonic()
+        limiter.acquire()
+        assert time.monotonic() - start >= 0.09
+
+    def test_pickle(self):
+        limiter = AdaptiveRateLimiter(rate=10, max_rate=20)
+        limiter.overloaded('60')
+        copied = pickle.loads(pickle.dumps(limiter))
+        assert copied.rate == limiter.rate == 5
+        assert copied.max_rate == 20
+        # the pause of the original is not copied
+        start = time.monotonic()
+        copied.acquire()
+        assert time.monotonic() - start < 1
+
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError):
+            AdaptiveRateLimiter(rate=10, max_rate=5)
+
+
+class TestClientRateLimit():
+
+    def test_retry_after_overload(self, mocker):
+        client = Atlas('localhost', port=21000, username='admin', password='admin', rate_limit=100)
+        mocker.patch.object(client.client.session, 'get', side_effect=[
+            make_response(status_code=429, headers={'retry-after': '0'}),
+            make_response(status_code=503),
+            make_response(b'{"guid": "1234"}'),
+        ])
+        client.client.rate_limiter.backoff = 0
+        assert client.client.get(URL) == {'guid': '1234'}
+        assert client.client.session.get.call_count == 3
+        assert client.client.rate_limiter.rate < 100
+
+    def test_give_up_after_retries(self, mocker):
+        client = Atlas('localhost', port=21000, username='admin', password='admin',
+                       rate_limit=AdaptiveRateLimiter(rate=100, backoff=0), rate_limit_retries=1)
+        mocker.patch.object(client.client.session, 'get', return_value=make_response(status_code=429))
+        with pytest.raises(exceptions.RateLimitExceeded):
+            client.client.get(URL)
+        assert client.client.session.get.call_count == 2
+
+    def test_deepcopy_client(self):
+        client = Atlas('localhost', port=21000, username='admin', password='admin', rate_limit=100)
+        copied = copy.deepcopy(client.entity_guid('1234'))
+        assert copied.client.client.rate_limiter is not client.client.rate_limiter
+        assert copied.client.client.rate_limiter.rate == 100
+
+    def test_no_limiter(self, mocker):
+        client = Atlas('localhost', port=21000, username='admin', password='admin')
+        mocker.patch.object(client.client.session, 'get', return_value=make_response(status_code=429))
+        with pytest.raises(exceptions.RateLimitExceeded):
+            client.client.get(URL)
+        assert client.client.session.get.call_count == 1
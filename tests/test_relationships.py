@@ -0,0 +1,132 @@
+from urllib.parse import urlencode
+
+import pytest
+
+from atlasclient import exceptions
+from atlasclient.client import Atlas
+from atlasclient.models import Entity
+from atlasclient.relationships import RelationshipResolver
+
+
+def column(guid, table_guid):
+    return {'guid': guid, 'typeName': 'hive_column',
+            'relationshipAttributes': {'table': {'guid': table_guid, 'typeName': 'hive_table'}}}
+
+
+def table(guid, db_guid, column_guids=()):
+    return {'guid': guid, 'typeName': 'hive_table',
+            'relationshipAttributes': {'db': {'guid': db_guid, 'typeName': 'hive_db'},
+                                       'columns': [{'guid': g, 'typeName': 'hive_column'} for g in column_guids]}}
+
+
+class FakeServer(object):
+    """Answer the entity/bulk and entity/guid requests from a dictionary of entities, as Atlas does."""
+
+    def __init__(self, entities):
+        self.entities = entities
+        self.requests = []
+
+    def get(self, url, params=None):
+        guids = params['guid'] if 'guid' in params else [url.rsplit('/', 1)[1]]
+        self.requests.append(guids)
+        if any(guid not in self.entities for guid in guids):
+            # a single entity missing fails the whole request
+            raise exceptions.NotFound()
+        if 'guid' not in params:
+            return {'entity': self.entities[guids[0]], 'referredEntities': {}}
+        return {'entities': [self.entities[guid] for guid in guids]}
+
+
+def make_atlas(mocker, entities, thread_safe=False):
+    atlas = Atlas('localhost', port=21000, username='admin', password='admin', thread_safe=thread_safe)
+    server = FakeServer(entities)
+    mocker.patch.object(atlas.client, 'get', side_effect=server.get)
+    return atlas, server
+
+
+class TestRelationshipResolver():
+
+    def test_resolve(self, mocker):
+        atlas, server = make_atlas(mocker, {'t1': table('t1', 'd1'), 'd1': {'guid': 'd1', 'typeName': 'hive_db'}})
+        entities = [Entity(atlas.entity_bulk, data=column('c%s' % i, 't1')) for i in range(3)]
+        RelationshipResolver(atlas).resolve(entities)
+        assert server.requests == [['t1']]
+        assert entities[2].relationshipAttributes['table']['typeName'] == 'hive_table'
+        # one level only by default
+        assert entities[2].relationshipAttributes['table']['relationshipAttributes']['db'] == {
+            'guid': 'd1', 'typeName': 'hive_db'}
+
+    def test_depth(self, mocker):
+        atlas, server = make_atlas(mocker, {'t1': table('t1', 'd1', ['c1', 'c2']),
+                                            'd1': {'guid': 'd1', 'typeName': 'hive_db', 'attributes': {'name': 'db'}},
+                                            'c2': column('c2', 't1')})
+        entity = Entity(atlas.entity_bulk, data=column('c1', 't1'))
+        RelationshipResolver(atlas).resolve([entity], depth=2, referred_entities={'c1': entity._data})
+        assert server.requests == [['t1'], ['c2', 'd1']]
+        resolved = entity.relationshipAttributes['table']
+        assert resolved['relationshipAttributes']['db']['attributes'] == {'name': 'db'}
+        assert [c['guid'] for c in resolved['relationshipAttributes']['columns']] == ['c1', 'c2']
+        # the data of the related entities is left alone
+        assert server.entities['t1']['relationshipAttributes']['db'] == {'guid': 'd1', 'typeName': 'hive_db'}
+
+    def test_attributes(self, mocker):
+        atlas, server = make_atlas(mocker, {'t1': table('t1', 'd1'), 'd1': {'guid': 'd1', 'typeName': 'hive_db'}})
+        entity = Entity(atlas.entity_bulk, data=table('t0', 'd1', ['c1']))
+        RelationshipResolver(atlas).resolve([entity], attributes=['db'])
+        assert server.requests == [['d1']]
+        assert entity.relationshipAttributes['columns'] == [{'guid': 'c1', 'typeName': 'hive_column'}]
+
+    def test_chunks(self, mocker):
+        guids = ['%036d' % i for i in range(500)]
+        atlas, server = make_atlas(mocker, {guid: {'guid': guid} for guid in guids}, thread_safe=True)
+        entity = Entity(atlas.entity_bulk, data=table('t0', 'd1', guids))
+        resolver = RelationshipResolver(atlas, max_url_length=2048, max_workers=8)
+        resolver.resolve([entity], attributes=['columns'])
+        assert len(server.requests) > 1
+        for chunk in server.requests:
+            assert len(atlas.entity_bulk.url) + 1 + len(urlencode({'guid': chunk}, doseq=True)) <= 2048
+        assert sorted(guid for chunk in server.requests for guid in chunk) == guids
+        assert entity.relationshipAttributes['columns'] == [{'guid': guid} for guid in guids]
+
+    def test_workers_require_thread_safe_client(self, mocker):
+        atlas, server = make_atlas(mocker, {})
+        assert RelationshipResolver(atlas).max_workers == 1
+        with pytest.raises(exceptions.ClientError):
+            RelationshipResolver(atlas, max_workers=8)
+        atlas, server = make_atlas(mocker, {}, thread_safe=True)
+        assert RelationshipResolver(atlas).max_workers == 4
+
+    def test_memo(self, mocker):
+        atlas, server = make_atlas(mocker, {'t1': table('t1', 'd1')})
+        resolver = RelationshipResolver(atlas)
+        resolver.resolve([Entity(atlas.entity_bulk, data=column('c1', 't1'))])
+        # the entities which were not found are not requested again either
+        entity = Entity(atlas.entity_bulk, data=column('c2', 't1'))
+        resolver.resolve([entity, Entity(atlas.entity_bulk, data=column('c3', 'missing'))])
+        resolver.resolve([Entity(atlas.entity_bulk, data=column('c4', 'missing'))])
+        assert server.requests == [['t1'], ['missing']]
+        assert entity.relationshipAttributes['table']['guid'] == 't1'
+        resolver.clear()
+        resolver.resolve([Entity(atlas.entity_bulk, data=column('c5', 't1'))])
+        assert server.requests[-1] == ['t1']
+
+    def test_deleted_entity(self, mocker):
+        atlas, server = make_atlas(mocker, {'t1': table('t1', 'd1')})
+        entities = [Entity(atlas.entity_bulk, data=column('c1', 't1')),
+                    Entity(atlas.entity_bulk, data=column('c2', 'gone'))]
+        RelationshipResolver(atlas).resolve(entities)
+        # the bulk request fails, its GUIDs are fetched one by one
+        assert server.requests[0] == ['gone', 't1']
+        assert sorted(server.requests[1:]) == [['gone'], ['t1']]
+        assert entities[0].relationshipAttributes['table']['typeName'] == 'hive_table'
+        assert entities[0].relationshipAttributes['table']['relationshipAttributes']
+        assert entities[1].relationshipAttributes['table'] == {'guid': 'gone', 'typeName': 'hive_table'}
+
+    def test_entities_with_relationships(self, mocker):
+        atlas, server = make_atlas(mocker, {'t1': table('t1', 'd1')})
+        bulk = atlas.entity_bulk.model_class(atlas.entity_bulk, href=atlas.entity_bulk.url)
+        bulk.load({'entities': [column('c1', 't1'), column('c2', 't2')],
+                   'referredEntities': {'t2': {'guid': 't2', 'typeName': 'hive_table'}}})
+        entities = bulk.entities_with_relationships()
+        assert server.requests == [['t1']]
+        assert [e.relationshipAttributes['table']['guid'] for e in entities] == ['t1', 't2']
@@ -0,0 +1,164 @@
+import collections
+import json
+import threading
+import time
+from concurrent import futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import pytest
+
+from atlasclient.client import Atlas
+
+THREADS = 32
+SEARCH_RESULTS = 50
+
+
+class AtlasHandler(BaseHTTPRequestHandler):
+    """Enough of Atlas for the client: entities by guid and a basic search, behind a session cookie."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        path = urlparse(self.path).path
+        with server.lock:
+            server.requests[path] += 1
+        headers = {}
+        if 'ATLASSESSIONID=session-1' not in (self.headers.get('Cookie') or ''):
+            if not self.headers.get('Authorization'):
+                return self._reply(401, {})
+            with server.lock:
+                server.logins += 1
+            headers['Set-Cookie'] = 'ATLASSESSIONID=session-1; Path=/'
+
+        if path.startswith('/api/atlas/v2/entity/guid/'):
+            # long enough for the threads inflating the same entity to overlap
+            time.sleep(0.05)
+            guid = path.rsplit('/', 1)[1]
+            body = {'entity': {'guid': guid, 'typeName': 'hive_table', 'attributes': {'name': 'table ' + guid}},
+                    'referredEntities': {}}
+        elif path == '/api/atlas/v2/search/basic':
+            time.sleep(0.05)
+            body = {'queryType': 'BASIC', 'entities': [{'guid': str(i)} for i in range(SEARCH_RESULTS)]}
+        else:
+            return self._reply(404, {})
+        self._reply(200, body, headers)
+
+    def _reply(self, status, body, headers=None):
+        content = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def atlas_server():
+    server = ThreadingHTTPServer(('localhost', 0), AtlasHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = collections.Counter()
+    server.logins = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_atlas(server):
+    return Atlas('http://localhost:%s' % server.server_address[1], username='admin', password='admin',
+                 thread_safe=True, session_auth=True, pool_maxsize=THREADS)
+
+
+def run_threads(function):
+    barrier = threading.Barrier(THREADS)
+
+    def call(index):
+        barrier.wait()
+        return function(index)
+
+    with futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
+        return list(executor.map(call, range(THREADS)))
+
+
+class TestThreadSafety():
+
+    def test_entities(self, atlas_server):
+        atlas = make_atlas(atlas_server)
+        # authenticate first, the threads then all share the session
+        assert atlas.entity_guid('0').entity['guid'] == '0'
+
+        def fetch(index):
+            return [atlas.entity_guid('%s-%s' % (index, i)).entity['attributes']['name'] for i in range(5)]
+
+        results = run_threads(fetch)
+        assert results == [['table %s-%s' % (index, i) for i in range(5)] for index in range(THREADS)]
+        assert atlas_server.logins == 1
+        stats = atlas.pool_stats()
+        assert stats['created'] <= THREADS
+        atlas.close()
+
+    def test_shared_model(self, atlas_server):
+        atlas = make_atlas(atlas_server)
+        entity = atlas.entity_guid('shared')
+        results = run_threads(lambda index: entity.entity['attributes']['name'])
+        assert results == ['table shared'] * THREADS
+        # loaded once, the other threads waited for it
+        assert atlas_server.requests['/api/atlas/v2/entity/guid/shared'] == 1
+        atlas.close()
+
+    def test_shared_collection(self, atlas_server):
+        atlas = make_atlas(atlas_server)
+        search = atlas.search_basic(query='table')
+
+        def iterate(index):
+            return [entity.guid for page in search for entity in page.entities]
+
+        results = run_threads(iterate)
+        assert results == [[str(i) for i in range(SEARCH_RESULTS)]] * THREADS
+        assert atlas_server.requests['/api/atlas/v2/search/basic'] == 1
+        atlas.close()
+
+    def test_sessions_per_thread(self, atlas_server):
+        atlas = make_atlas(atlas_server)
+        sessions = run_threads(lambda index: atlas.client.session)
+        assert len(set(map(id, sessions))) == THREADS
+        assert all(session.get_adapter(atlas.base_url) is atlas.client.adapter for session in sessions)
+        atlas.close()
+
+    def test_header_template_built_during_session_expiry(self):
+        atlas = Atlas('localhost', port=21000, username='admin', password='admin', session_auth=True)
+        client = atlas.client
+        expiries = []
+
+        class RacingClient(client.__class__):
+            """Expires the session from another thread right after a template reads it."""
+
+            @property
+            def _session_id(self):
+                session_id = self.__dict__['racing_session_id']
+                if session_id is not None and not expiries:
+                    expiry = threading.Thread(target=self._expire_session, args=(session_id,))
+                    expiries.append(expiry)
+                    expiry.start()
+                    expiry.join(0.2)
+                return session_id
+
+            @_session_id.setter
+            def _session_id(self, value):
+                self.__dict__['racing_session_id'] = value
+
+        client.__class__ = RacingClient
+        client._session_id = 'session-1'
+        assert 'Authorization' not in client._headers('application/json')
+        expiries[0].join()
+        # the template of the expired session must not outlive it
+        assert client._session_id is None
+        assert client._headers('application/json')['Authorization'].startswith('Basic ')
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+from atlasclient.client import Atlas
+from atlasclient.typecache import TypeDefCache
+
+BASE = 'http://localhost:21000/api/atlas/v2/'
+
+
+def entity_def(guid):
+    return {'guid': guid, 'name': 'type_' + guid, 'category': 'ENTITY', 'attributeDefs': []}
+
+
+class FakeAtlas(object):
+    """Serves the typedefs endpoints from a dictionary of entity definitions."""
+
+    def __init__(self, typedefs):
+        self.typedefs = typedefs
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append(url)
+        path = url[len(BASE):]
+        if path == 'types/typedefs/headers':
+            return [{'guid': guid, 'name': typedef['name'], 'category': 'ENTITY'}
+                    for guid, typedef in self.typedefs.items()]
+        if path == 'types/typedefs':
+            return {'enumDefs': [], 'structDefs': [], 'classificationDefs': [],
+                    'entityDefs': list(self.typedefs.values())}
+        if path.startswith('types/typedef/guid/'):
+            return self.typedefs[path.rsplit('/', 1)[1]]
+        raise AssertionError(url)
+
+
+@pytest.fixture
+def fake_atlas(mocker):
+    def make(typedefs, path):
+        atlas = Atlas('localhost', port=21000, username='admin', password='admin', typedef_cache=path)
+        fake = FakeAtlas(typedefs)
+        mocker.patch.object(atlas.client, 'request', side_effect=fake.request)
+        mocker.patch('atlasclient.base.QueryableModelCollection.check_version')
+        return atlas, fake
+    return make
+
+
+class TestTypeDefCache():
+
+    def test_shared_warm_start(self, tmp_path, fake_atlas):
+        path = str(tmp_path / 'typedefs.db')
+        typedefs = {'1': entity_def('1'), '2': entity_def('2')}
+        atlas, fake = fake_atlas(typedefs, path)
+        names = [e.name for t in atlas.typedefs for e in t.entityDefs]
+        assert sorted(names) == ['type_1', 'type_2']
+        assert atlas.typedef_cache.stats['full'] == 1
+
+        # another process using the same database only checks the headers
+        other, fake = fake_atlas(typedefs, path)
+        names = [e.name for t in other.typedefs for e in t.entityDefs]
+        assert sorted(names) == ['type_1', 'type_2']
+        assert fake.requests == [BASE + 'types/typedefs/headers']
+        assert other.typedef_cache.stats == {'cached': 1, 'incremental': 0, 'full': 0}
+
+    def test_cold_start_downloads_once(self, tmp_path, fake_atlas):
+        path = str(tmp_path / 'typedefs.db')
+        workers = [fake_atlas({'1': entity_def('1')}, path) for _ in range(8)]
+        threads = [threading.Thread(target=atlas.typedef_cache.load, args=(atlas,)) for atlas, _ in workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sum(atlas.typedef_cache.stats['full'] for atlas, _ in workers) == 1
+
+    def test_incremental_update(self, tmp_path, fake_atlas):
+        path = str(tmp_path / 'typedefs.db')
+        atlas, fake = fake_atlas({'1': entity_def('1'), '2': entity_def('2')}, path)
+        atlas.typedef_cache.load(atlas)
+        del fake.typedefs['1']
+        fake.typedefs['3'] = entity_def('3')
+        fake.requests = []
+        response = atlas.typedef_cache.load(atlas)
+        assert sorted(e['name'] for e in response['entityDefs']) == ['type_2', 'type_3']
+        assert fake.requests == [BASE + 'types/typedefs/headers', BASE + 'types/typedef/guid/3']
+        assert atlas.typedef_cache.stats['incremental'] == 1
+
+    def test_expired(self, tmp_path, fake_atlas):
+        atlas, fake = fake_atlas({'1': entity_def('1')}, str(tmp_path / 'typedefs.db'))
+        atlas.typedef_cache.load(atlas)
+        atlas.typedef_cache.max_age = 0
+        time.sleep(0.01)
+        atlas.typedef_cache.load(atlas)
+        assert atlas.typedef_cache.stats['full'] == 2
+
+    def test_write_invalidates(self, tmp_path, fake_atlas):
+        atlas, fake = fake_atlas({'1': entity_def('1')}, str(tmp_path / 'typedefs.db'))
+        atlas.typedef_cache.load(atlas)
+        atlas.typedef_cache.invalidate(atlas.base_url)
+        atlas.typedef_cache.load(atlas)
+        assert atlas.typedef_cache.stats['full'] == 2
+
+    def test_typedef_cache_path(self, tmp_path):
+        atlas = Atlas('localhost', port=21000, username='admin', password='admin',
+                      typedef_cache=str(tmp_path / 'typedefs.db'))
+        assert isinstance(atlas.typedef_cache, TypeDefCache)
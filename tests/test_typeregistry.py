@@ -0,0 +1,82 @@
+import pytest
+
+from atlasclient import exceptions
+from atlasclient.client import Atlas
+from atlasclient.typeregistry import TypeRegistry
+
+
+def attribute(name, type_name='string'):
+    return {'name': name, 'typeName': type_name, 'isOptional': True}
+
+
+TYPEDEFS = {
+    'enumDefs': [{'guid': 'e1', 'name': 'file_action', 'category': 'ENUM', 'elementDefs': []}],
+    'structDefs': [],
+    'classificationDefs': [
+        {'guid': 'c1', 'name': 'PII', 'category': 'CLASSIFICATION', 'superTypes': [],
+         'attributeDefs': [attribute('level')]},
+        {'guid': 'c2', 'name': 'PII_email', 'category': 'CLASSIFICATION', 'superTypes': ['PII'],
+         'attributeDefs': []},
+    ],
+    'entityDefs': [
+        {'guid': '1', 'name': 'Referenceable', 'category': 'ENTITY', 'superTypes': [],
+         'attributeDefs': [attribute('qualifiedName')]},
+        {'guid': '2', 'name': 'Asset', 'category': 'ENTITY', 'superTypes': ['Referenceable'],
+         'attributeDefs': [attribute('name'), attribute('description')]},
+        {'guid': '3', 'name': 'DataSet', 'category': 'ENTITY', 'superTypes': ['Asset'],
+         'attributeDefs': []},
+        {'guid': '4', 'name': 'Process', 'category': 'ENTITY', 'superTypes': ['Asset'],
+         'attributeDefs': [attribute('inputs', 'array<DataSet>')]},
+        {'guid': '5', 'name': 'hive_table', 'category': 'ENTITY', 'superTypes': ['DataSet'],
+         'attributeDefs': [attribute('description', 'text'), attribute('owner')]},
+    ],
+}
+
+
+class TestTypeRegistry():
+
+    def test_lookups(self):
+        registry = TypeRegistry(TYPEDEFS)
+        assert len(registry) == 8
+        assert registry['hive_table']['guid'] == '5'
+        assert registry.by_guid('c2')['name'] == 'PII_email'
+        assert 'Process' in registry
+        assert registry.get('missing') is None
+        assert sorted(registry.names('CLASSIFICATION')) == ['PII', 'PII_email']
+        with pytest.raises(exceptions.NotFound):
+            registry['missing']
+        with pytest.raises(exceptions.NotFound):
+            registry.by_guid('missing')
+
+    def test_hierarchy(self):
+        registry = TypeRegistry(TYPEDEFS)
+        assert registry.supertypes('hive_table') == {'DataSet', 'Asset', 'Referenceable'}
+        assert registry.subtypes('Asset') == {'DataSet', 'Process', 'hive_table'}
+        assert registry.subtypes('DataSet') == {'hive_table'}
+        assert registry.subtypes('PII') == {'PII_email'}
+        assert registry.is_a('hive_table', 'Referenceable')
+        assert registry.is_a('hive_table', 'hive_table')
+        assert not registry.is_a('Process', 'DataSet')
+
+    def test_inherited_attribute_defs(self):
+        registry = TypeRegistry(TYPEDEFS)
+        attribute_defs = registry.attribute_defs('hive_table')
+        assert sorted(attribute_defs) == ['description', 'name', 'owner', 'qualifiedName']
+        # redefined attributes override the inherited ones
+        assert attribute_defs['description']['typeName'] == 'text'
+        assert registry.attribute_defs('PII_email') == {'level': attribute('level')}
+
+    def test_circular_supertypes(self):
+        typedefs = {'entityDefs': [{'name': 'a', 'superTypes': ['b']}, {'name': 'b', 'superTypes': ['a']}]}
+        with pytest.raises(exceptions.ClientError):
+            TypeRegistry(typedefs)
+
+    def test_atlas_type_registry(self, mocker):
+        atlas = Atlas('localhost', port=21000, username='admin', password='admin')
+        mocker.patch.object(atlas.client, 'request', return_value=TYPEDEFS)
+        mocker.patch('atlasclient.base.QueryableModelCollection.check_version')
+        registry = atlas.type_registry()
+        assert registry.subtypes('DataSet') == {'hive_table'}
+        assert atlas.type_registry() is registry
+        assert atlas.client.request.call_count == 1
+        assert atlas.type_registry(refresh=True) is not registry
@@ -1,5 +1,7 @@
+from urllib.parse import urlencode
+
 from atlasclient.utils import (parse_table_qualified_name, make_table_qualified_name,
-                               DEFAULT_DB_CLUSTER)
+                               DEFAULT_DB_CLUSTER, chunk_query_values)
 
 DB = 'database_name'
 CL = 'cluster_name'
@@ -62,3 +64,11 @@ class TestUtils():
     def test_make_table_qn_only_table(self):
         qn = make_table_qualified_name(TB)
         assert qn == '{}'.format(TB)
+
+    def test_chunk_query_values(self):
+        guids = ['%036d' % i for i in range(100)]
+        chunks = list(chunk_query_values(guids, 'guid', 500))
+        assert [guid for chunk in chunks for guid in chunk] == guids
+        assert all(len(urlencode({'guid': chunk}, doseq=True)) <= 500 for chunk in chunks)
+        assert len(urlencode({'guid': chunks[0] + chunks[1][:1]}, doseq=True)) > 500
+        assert [len(chunk) for chunk in chunk_query_values(guids[:5], 'guid', 500, max_count=2)] == [2, 2, 1]